@@ -3,11 +3,13 @@
 from __future__ import annotations
 
 import logging
+import shutil
 import time as time_module
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import Platform
 from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import STORAGE_DIR
 
 from .const import DOMAIN
 from .coordinator import DreameVacuumDataUpdateCoordinator
@@ -87,6 +89,11 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     return unload_ok
 
 
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove cached cloud objects of a removed config entry."""
+    await hass.async_add_executor_job(shutil.rmtree, hass.config.path(STORAGE_DIR, DOMAIN, entry.entry_id), True)
+
+
 async def update_listener(hass: HomeAssistant, config_entry: ConfigEntry) -> None:
     """Handle options update."""
     await hass.config_entries.async_reload(config_entry.entry_id)
@@ -56,6 +56,7 @@ from .dreame.map import (
     DreameVacuumMapDataJsonRenderer,
     DreameVacuumMapRenderer,
 )
+from .dreame.types import MapData
 from .entity import DreameVacuumEntity, DreameVacuumEntityDescription
 from .recorder import CAMERA_UNRECORDED_ATTRIBUTES
 
@@ -236,7 +237,7 @@ class CameraRecoveryView(CameraView):
             data = False
             file = file and (file or file == "true" or file == "1")
             if file:
-                result, map_url, object_name = await camera.recovery_map_file(index)
+                result, _, object_name = await camera.recovery_map_file(index)
             else:
                 data = request.query.get("data")
                 data = data and (data or data == "true" or data == "1")
@@ -491,7 +492,7 @@ class DreameVacuumCameraEntity(DreameVacuumEntity, Camera):
         self.content_type = PNG_CONTENT_TYPE
         self.stream = None
         self._access_token_update_counter = 0
-        self.access_tokens = collections.deque([], 2)
+        self.access_tokens = collections.deque(maxlen=2)
         self.async_update_token()
         self._rtsp_to_webrtc = False
         self._should_poll = True
@@ -505,6 +506,8 @@ class DreameVacuumCameraEntity(DreameVacuumEntity, Camera):
         self._error = None
         self._proxy_renderer = None
         self._color_scheme = color_scheme
+        # Last built state attributes with the key and the map attributes they are built from
+        self._attributes_cache: tuple[tuple, dict[str, Any] | None, dict[str, Any]] | None = None
 
         if description.map_type == DreameVacuumMapType.JSON_MAP_DATA:
             self._renderer = DreameVacuumMapDataJsonRenderer()
@@ -911,132 +914,182 @@ class DreameVacuumCameraEntity(DreameVacuumEntity, Camera):
     @property
     def extra_state_attributes(self) -> dict[str, Any]:
         if not self.map_data_json:
-            attributes = None
             map_data = self._map_data
+            map_attributes = None
             if (
                 map_data
                 and self.device.cloud_connected
                 and not map_data.empty_map
                 and (self.map_index > 0 or self.device.status.located)
             ):
-                attributes = map_data.as_dict()
-                if not attributes:
-                    attributes = {}
+                map_attributes = map_data.as_dict()
 
-                attributes[ATTR_CALIBRATION] = (
-                    self._calibration_points if self._calibration_points else self._renderer.calibration_points
-                )
-            elif self.device.cloud_connected:
-                attributes = {ATTR_CALIBRATION: self._renderer.default_calibration_points}
+            status = self.device.status
+            selected_map = status.selected_map
+            if self.map_index == 0:
+                recovery_map_list = selected_map.recovery_map_list if selected_map else None
+                wifi_map_data = selected_map.wifi_map_data if selected_map else None
+            else:
+                recovery_map_list = map_data.recovery_map_list if map_data else None
+                wifi_map_data = map_data.wifi_map_data if map_data else None
+
+            # Map attributes are reused by the map data while its fingerprints are unchanged so state writes between
+            # map updates do not build the room, obstacle and history attributes again
+            key = (
+                self.entity_id,
+                self.access_tokens[-1],
+                self.device.cloud_connected,
+                self._calibration_points,
+                self._renderer.calibration_points,
+                selected_map.map_index if selected_map else None,
+                self._history_key(status._cleaning_history),
+                self._history_key(status._cruising_history),
+                status.ai_pet_detection,
+                status.ai_fluid_detection,
+                map_data.fingerprint(MapData.GEOMETRY) if map_data else None,
+                map_data.last_updated if map_data else None,
+                (
+                    [(v.date, v.map_id, v.object_name, v.map_type) for v in recovery_map_list]
+                    if recovery_map_list
+                    else None
+                ),
+                wifi_map_data.last_updated if wifi_map_data else None,
+            )
+            # Map attributes are compared by identity, map data returns the same dictionary while they are unchanged
+            if (
+                self._attributes_cache is None
+                or self._attributes_cache[0] != key
+                or self._attributes_cache[1] is not map_attributes
+            ):
+                self._attributes_cache = (key, map_attributes, self._build_attributes(map_data, map_attributes))
+            return self._attributes_cache[2]
+
+    @staticmethod
+    def _history_key(history: list | None) -> tuple | None:
+        # History entries are not changed once they are created, new entries are added to the list ends
+        if history is None:
+            return None
+        return (len(history), history[0].date, history[-1].date) if history else (0, None, None)
+
+    def _build_attributes(self, map_data: MapData | None, map_attributes: dict[str, Any] | None) -> dict[str, Any]:
+        attributes = None
+        if map_attributes is not None:
+            attributes = dict(map_attributes)
+
+            attributes[ATTR_CALIBRATION] = (
+                self._calibration_points if self._calibration_points else self._renderer.calibration_points
+            )
+        elif self.device.cloud_connected:
+            attributes = {ATTR_CALIBRATION: self._renderer.default_calibration_points}
 
-            if not attributes:
-                attributes = {}
+        if not attributes:
+            attributes = {}
 
-            if self.map_index:
-                attributes[ATTR_SELECTED] = (
-                    self.device.status.selected_map and self.device.status.selected_map.map_index == self.map_index
-                )
+        if self.map_index:
+            attributes[ATTR_SELECTED] = (
+                self.device.status.selected_map and self.device.status.selected_map.map_index == self.map_index
+            )
 
-            token = self.access_tokens[-1]
-            if self.map_index == 0:
-                attributes[ATTR_COLOR_SCHEME] = self._color_scheme
-
-                def get_key(index, history):
-                    return f"{index}: {time.strftime('%m/%d %H:%M', time.localtime(history.date.timestamp()))} - {'Second ' if history.second_cleaning else ''}{STATUS_CODE_TO_NAME.get(history.status, STATE_UNKNOWN).replace('_', ' ').title()} {'(Completed)' if history.completed else '(Interrupted)'}"
-
-                if self.device.status._cleaning_history is not None:
-                    cleaning_history = {}
-                    index = 1
-                    for history in self.device.status._cleaning_history:
-                        key = get_key(index, history)
-                        cleaning_history[key] = HISTORY_MAP_IMAGE_URL.format(
-                            self.entity_id,
-                            token,
-                            index,
-                            int(history.date.timestamp()),
-                        )
-                        index = index + 1
-                    attributes[ATTR_CLEANING_HISTORY_PICTURE] = cleaning_history
-
-                if self.device.status._cruising_history is not None:
-                    cruising_history = {}
-                    index = 1
-                    for history in self.device.status._cruising_history:
-                        key = get_key(index, history)
-                        cruising_history[key] = (
-                            f"{HISTORY_MAP_IMAGE_URL.format(self.entity_id, token, index, int(history.date.timestamp()))}&cruising=1"
-                        )
-                        index = index + 1
-                    attributes[ATTR_CRUISING_HISTORY_PICTURE] = cruising_history
-
-                if map_data and map_data.obstacles:
-                    obstacles = {}
-                    total = len(map_data.obstacles)
-                    if total:
-                        index = total
-                        for k in reversed(map_data.obstacles):
-                            obstacle = map_data.obstacles[k]
-                            if (
-                                (obstacle.type.value == 158 and self.device.status.ai_pet_detection == 0)
-                                or (
-                                    self.device.capability.fluid_detection
-                                    and (
-                                        obstacle.type.value == 139
-                                        or obstacle.type.value == 206
-                                        or obstacle.type.value == 202
-                                        or obstacle.type.value == 169
-                                    )
-                                    and not self.device.status.ai_fluid_detection
+        token = self.access_tokens[-1]
+        if self.map_index == 0:
+            attributes[ATTR_COLOR_SCHEME] = self._color_scheme
+
+            def get_key(index, history):
+                return f"{index}: {time.strftime('%m/%d %H:%M', time.localtime(history.date.timestamp()))} - {'Second ' if history.second_cleaning else ''}{STATUS_CODE_TO_NAME.get(history.status, STATE_UNKNOWN).replace('_', ' ').title()} {'(Completed)' if history.completed else '(Interrupted)'}"
+
+            if self.device.status._cleaning_history is not None:
+                cleaning_history = {}
+                index = 1
+                for history in self.device.status._cleaning_history:
+                    key = get_key(index, history)
+                    cleaning_history[key] = HISTORY_MAP_IMAGE_URL.format(
+                        self.entity_id,
+                        token,
+                        index,
+                        int(history.date.timestamp()),
+                    )
+                    index = index + 1
+                attributes[ATTR_CLEANING_HISTORY_PICTURE] = cleaning_history
+
+            if self.device.status._cruising_history is not None:
+                cruising_history = {}
+                index = 1
+                for history in self.device.status._cruising_history:
+                    key = get_key(index, history)
+                    cruising_history[key] = (
+                        f"{HISTORY_MAP_IMAGE_URL.format(self.entity_id, token, index, int(history.date.timestamp()))}&cruising=1"
+                    )
+                    index = index + 1
+                attributes[ATTR_CRUISING_HISTORY_PICTURE] = cruising_history
+
+            if map_data and map_data.obstacles:
+                obstacles = {}
+                total = len(map_data.obstacles)
+                if total:
+                    index = total
+                    for k in reversed(map_data.obstacles):
+                        obstacle = map_data.obstacles[k]
+                        if (
+                            (obstacle.type.value == 158 and self.device.status.ai_pet_detection == 0)
+                            or (
+                                self.device.capability.fluid_detection
+                                and (
+                                    obstacle.type.value == 139
+                                    or obstacle.type.value == 206
+                                    or obstacle.type.value == 202
+                                    or obstacle.type.value == 169
                                 )
-                                or (obstacle.picture_status is not None and obstacle.picture_status.value != 2)
-                            ):
-                                index = index - 1
-                                continue
-
-                            key = f"{index}: {obstacle.type.name.replace('_', ' ').title()}"
-                            if obstacle.possibility:
-                                key = f"{key} %{obstacle.possibility}"
-                            if obstacle.segment:
-                                key = f"{key} ({obstacle.segment})"
-                            if obstacle.ignore_status and int(obstacle.ignore_status) > 0:
-                                key = f"{key} ({obstacle.ignore_status.name.replace('_', ' ').title()})"
-
-                            obstacles[key] = OBSTACLE_IMAGE_URL.format(self.entity_id, token, k, obstacle.id)
+                                and not self.device.status.ai_fluid_detection
+                            )
+                            or (obstacle.picture_status is not None and obstacle.picture_status.value != 2)
+                        ):
                             index = index - 1
+                            continue
 
-                    attributes[ATTR_OBSTACLE_PICTURE] = obstacles
-
-            if not self.wifi_map and map_data:
-                if self.map_index == 0:
-                    selected_map = self.device.status.selected_map
-                    recovery_map_list = selected_map.recovery_map_list if selected_map else None
-                else:
-                    recovery_map_list = map_data.recovery_map_list
-
-                if recovery_map_list is not None:
-                    recovery_map = {}
-                    recovery_file = {}
-                    index = len(recovery_map_list)
-                    for map in reversed(recovery_map_list):
-                        key = f"{time.strftime('%x %X', time.localtime(map.date.timestamp()))}: Map{index} ({map.map_type.name.title()})"
-                        recovery_map[key] = RECOVERY_MAP_IMAGE_URL.format(
-                            self.entity_id, token, index, int(map.date.timestamp())
-                        )
-                        recovery_file[key] = f"{recovery_map[key]}&file=1"
+                        key = f"{index}: {obstacle.type.name.replace('_', ' ').title()}"
+                        if obstacle.possibility:
+                            key = f"{key} %{obstacle.possibility}"
+                        if obstacle.segment:
+                            key = f"{key} ({obstacle.segment})"
+                        if obstacle.ignore_status and int(obstacle.ignore_status) > 0:
+                            key = f"{key} ({obstacle.ignore_status.name.replace('_', ' ').title()})"
+
+                        obstacles[key] = OBSTACLE_IMAGE_URL.format(self.entity_id, token, k, obstacle.id)
                         index = index - 1
-                    attributes[ATTR_RECOVERY_MAP_PICTURE] = recovery_map
-                    attributes[ATTR_RECOVERY_MAP_FILE] = recovery_file
 
-                if self.map_index == 0:
-                    selected_map = self.device.status.selected_map
-                    wifi_map_data = selected_map.wifi_map_data if selected_map else None
-                else:
-                    wifi_map_data = map_data.wifi_map_data
+                attributes[ATTR_OBSTACLE_PICTURE] = obstacles
 
-                if wifi_map_data:
-                    attributes[ATTR_WIFI_MAP_PICTURE] = WIFI_MAP_IMAGE_URL.format(
-                        self.entity_id,
-                        token,
-                        int(wifi_map_data.last_updated if wifi_map_data.last_updated else map_data.last_updated),
+        if not self.wifi_map and map_data:
+            if self.map_index == 0:
+                selected_map = self.device.status.selected_map
+                recovery_map_list = selected_map.recovery_map_list if selected_map else None
+            else:
+                recovery_map_list = map_data.recovery_map_list
+
+            if recovery_map_list is not None:
+                recovery_map = {}
+                recovery_file = {}
+                index = len(recovery_map_list)
+                for map in reversed(recovery_map_list):
+                    key = f"{time.strftime('%x %X', time.localtime(map.date.timestamp()))}: Map{index} ({map.map_type.name.title()})"
+                    recovery_map[key] = RECOVERY_MAP_IMAGE_URL.format(
+                        self.entity_id, token, index, int(map.date.timestamp())
                     )
-            return attributes
+                    recovery_file[key] = f"{recovery_map[key]}&file=1"
+                    index = index - 1
+                attributes[ATTR_RECOVERY_MAP_PICTURE] = recovery_map
+                attributes[ATTR_RECOVERY_MAP_FILE] = recovery_file
+
+            if self.map_index == 0:
+                selected_map = self.device.status.selected_map
+                wifi_map_data = selected_map.wifi_map_data if selected_map else None
+            else:
+                wifi_map_data = map_data.wifi_map_data
+
+            if wifi_map_data:
+                attributes[ATTR_WIFI_MAP_PICTURE] = WIFI_MAP_IMAGE_URL.format(
+                    self.entity_id,
+                    token,
+                    int(wifi_map_data.last_updated if wifi_map_data.last_updated else map_data.last_updated),
+                )
+        return attributes
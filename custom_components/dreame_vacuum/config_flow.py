@@ -2,12 +2,9 @@
 
 from __future__ import annotations
 
-import base64
 from collections.abc import Mapping
-import json
 import re
 from typing import Any
-import zlib
 
 from homeassistant.config_entries import (
     ConfigEntry,
@@ -46,7 +43,7 @@ from .const import (
     NOTIFICATION,
     get_notification_labels,
 )
-from .dreame import DEVICE_INFO, MAP_COLOR_SCHEME_LIST, MAP_ICON_SET_LIST, VERSION, DreameVacuumProtocol
+from .dreame import MAP_COLOR_SCHEME_LIST, MAP_ICON_SET_LIST, VERSION, DreameVacuumProtocol, device_info_database
 
 # Account type constants
 # New integrations will use DREAME only, but keep others for backward compatibility
@@ -602,7 +599,7 @@ class DreameVacuumFlowHandler(ConfigFlow, domain=DOMAIN):
     def load_devices(self):
         if self.models is None:
             self.models = {}
-            device_info = json.loads(zlib.decompress(base64.b64decode(DEVICE_INFO), zlib.MAX_WBITS | 32))
+            device_info = device_info_database()
             for k in device_info[3]:
                 info = device_info[0][device_info[3][k]]
                 if info:
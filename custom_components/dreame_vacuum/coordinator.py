@@ -6,6 +6,7 @@ import math
 import time
 import traceback
 
+import aiohttp
 from homeassistant.components import persistent_notification
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import (
@@ -18,8 +19,10 @@ from homeassistant.const import (
 )
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.exceptions import ConfigEntryAuthFailed
+from homeassistant.helpers.aiohttp_client import async_create_clientsession, async_get_clientsession
 from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.entity import generate_entity_id
+from homeassistant.helpers.storage import STORAGE_DIR
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 
 from .const import (
@@ -87,6 +90,7 @@ from .const import (
     translate_description,
 )
 from .dreame import VERSION, DreameVacuumDevice, DreameVacuumProperty
+from .dreame.dispatcher import DreameVacuumChanges
 from .dreame.resources import (
     CONSUMABLE_IMAGE,
     DRAINAGE_STATUS_FAIL,
@@ -117,6 +121,10 @@ class DreameVacuumDataUpdateCoordinator(DataUpdateCoordinator[DreameVacuumDevice
         self._low_water = False
         self._drainage_status = None
         self._washing = None
+        # Background task connecting to the device when the entities are set up with the restored device state
+        self._connect_task = None
+        # Properties changed since the previous update, None when all entities need to be refreshed
+        self.changed_properties: set[int] | None = None
 
         LOGGER.info("Integration loading: %s", entry.data[CONF_NAME])
 
@@ -153,6 +161,17 @@ class DreameVacuumDataUpdateCoordinator(DataUpdateCoordinator[DreameVacuumDevice
             entry.data.get(CONF_ACCOUNT_TYPE, "mi"),
             entry.data.get(CONF_DID),
             self._auth_key,
+            hass.config.path(STORAGE_DIR, DOMAIN, entry.entry_id),
+        )
+        self._device.set_client_session(
+            async_get_clientsession(hass),
+            hass.loop,
+            # Mi cloud requests carry their own cookies that must not be stored in the shared cookie jar
+            (
+                async_create_clientsession(hass, cookie_jar=aiohttp.DummyCookieJar())
+                if entry.data.get(CONF_ACCOUNT_TYPE, "mi") == "mi"
+                else None
+            ),
         )
 
         self._device.listen(self._dust_collection_changed, DreameVacuumProperty.DUST_COLLECTION)
@@ -482,6 +501,14 @@ class DreameVacuumDataUpdateCoordinator(DataUpdateCoordinator[DreameVacuumDevice
 
     async def _async_update_data(self) -> DreameVacuumDevice:
         """Update Dreame Vacuum."""
+        if not self._ready and self._connect_task is None:
+            if await self.hass.async_add_executor_job(self._device.restore_snapshot):
+                # Entities are set up with the last known state while the device is connecting
+                self._connect_task = self._entry.async_create_background_task(
+                    self.hass, self._async_connect(), f"{DOMAIN}_connect"
+                )
+                return self._device
+
         try:
             await self.hass.async_add_executor_job(self._device.update)
 
@@ -506,6 +533,28 @@ class DreameVacuumDataUpdateCoordinator(DataUpdateCoordinator[DreameVacuumDevice
                 self._device = None
             raise UpdateFailed(ex) from ex
 
+    async def _async_connect(self) -> None:
+        """Connect to the device after the setup, device keeps retrying with its update timer when it is unreachable"""
+        try:
+            await self.hass.async_add_executor_job(self._device.update)
+        except Exception as ex:
+            if self._device and not self._device.auth_failed:
+                LOGGER.warning("Device connection failed, retrying: %s", ex)
+
+        if not self._device or self._device.disconnected:
+            return
+
+        if self._device.auth_failed:
+            self._device.listen(None)
+            self._device.disconnect()
+            self._entry.async_start_reauth(self.hass)
+            return
+
+        # Restored state is not shown anymore when the device cannot be reached
+        self._device.stale = False
+        self._device.schedule_update()
+        self.async_set_updated_data()
+
     @property
     def device(self) -> DreameVacuumDevice:
         return self._device
@@ -513,11 +562,11 @@ class DreameVacuumDataUpdateCoordinator(DataUpdateCoordinator[DreameVacuumDevice
     def set_update_error(self, ex=None) -> None:
         self.hass.loop.call_soon_threadsafe(self.async_set_update_error, ex)
 
-    def set_updated_data(self, device=None) -> None:
-        self.hass.loop.call_soon_threadsafe(self.async_set_updated_data, device)
+    def set_updated_data(self, changes: DreameVacuumChanges | None = None) -> None:
+        self.hass.loop.call_soon_threadsafe(self.async_set_updated_data, changes)
 
     @callback
-    def async_set_updated_data(self, device=None) -> None:
+    def async_set_updated_data(self, changes: DreameVacuumChanges | None = None) -> None:
         if not self._device or not self._device.status:
             return
         if self._has_temporary_map != self._device.status.has_temporary_map:
@@ -548,6 +597,7 @@ class DreameVacuumDataUpdateCoordinator(DataUpdateCoordinator[DreameVacuumDevice
             return
 
         self._available = self._device and self._device.available
+        self.changed_properties = changes.properties if changes else None
         super().async_set_updated_data(self._device)
 
     @callback
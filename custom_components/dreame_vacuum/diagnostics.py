@@ -0,0 +1,22 @@
+"""Diagnostics support for Dreame Vacuum."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+from .coordinator import DreameVacuumDataUpdateCoordinator
+
+
+async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: ConfigEntry) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    coordinator: DreameVacuumDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]
+    device = coordinator.device
+    return {
+        "poll_schedule": device.poll_schedule if device else None,
+        "connection_stats": device.connection_stats if device else None,
+        "object_cache_stats": device.object_cache_stats if device else None,
+    }
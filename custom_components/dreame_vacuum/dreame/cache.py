@@ -0,0 +1,269 @@
+"""
+Content-addressed cache for immutable cloud objects.
+
+History maps, obstacle pictures and recovery map files never change once they
+are uploaded by the device, so their contents are kept in a size bounded
+memory LRU backed by an optional directory on disk. Decoded objects (MapData)
+can be attached to an entry and are only kept in memory, callers always get
+their own copy of them since they are modified after decoding.
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+import copy
+import hashlib
+import logging
+import os
+from threading import Lock
+import time
+from typing import Any
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class DreameVacuumObjectCache:
+    """Size and age bounded memory + disk LRU for cloud object contents"""
+
+    def __init__(
+        self,
+        path: str | None = None,
+        max_memory_bytes: int = 16 * 1024 * 1024,
+        max_disk_bytes: int = 128 * 1024 * 1024,
+        max_age: int = 30 * 24 * 60 * 60,
+        max_decoded_items: int = 10,
+    ) -> None:
+        self._path = path
+        self._max_memory_bytes = max_memory_bytes
+        self._max_disk_bytes = max_disk_bytes
+        self._max_age = max_age
+        self._max_decoded_items = max_decoded_items
+        self._lock = Lock()
+        # Cache key -> (stored time, contents)
+        self._memory: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+        self._memory_bytes: int = 0
+        # Cache key -> decoded object
+        self._decoded: OrderedDict[str, Any] = OrderedDict()
+        # Cache key -> (stored time, size) of the files on disk, None until the directory is scanned
+        self._disk: OrderedDict[str, tuple[float, int]] = None
+        self._disk_bytes: int = 0
+        self._hits: int = 0
+        self._misses: int = 0
+        self._disk_hits: int = 0
+        self._evictions: int = 0
+
+    @staticmethod
+    def cache_key(object_name: str, key: str | None = None) -> str:
+        """Generate content address of an object from its name and decryption key"""
+        return hashlib.sha256(f"{object_name}|{key or ''}".encode()).hexdigest()
+
+    def _file_path(self, cache_key: str) -> str:
+        return os.path.join(self._path, cache_key)
+
+    def _load_disk_index(self) -> None:
+        if self._disk is not None:
+            return
+        self._disk = OrderedDict()
+        self._disk_bytes = 0
+        if not self._path:
+            return
+        try:
+            os.makedirs(self._path, exist_ok=True)
+            files = []
+            with os.scandir(self._path) as entries:
+                for entry in entries:
+                    if entry.is_file() and len(entry.name) == 64:
+                        stat = entry.stat()
+                        files.append((stat.st_mtime, entry.name, stat.st_size))
+            for mtime, name, size in sorted(files):
+                self._disk[name] = (mtime, size)
+                self._disk_bytes = self._disk_bytes + size
+            self._evict_disk()
+        except Exception as ex:
+            _LOGGER.warning("Object cache directory is not available: %s", ex)
+            self._path = None
+
+    def _remove_file(self, cache_key: str) -> None:
+        item = self._disk.pop(cache_key, None)
+        if item is not None:
+            self._disk_bytes = self._disk_bytes - item[1]
+            try:
+                os.remove(self._file_path(cache_key))
+            except OSError:
+                pass
+
+    def _evict_disk(self) -> None:
+        expire = time.time() - self._max_age
+        while self._disk:
+            cache_key, (stored, _) = next(iter(self._disk.items()))
+            if self._disk_bytes <= self._max_disk_bytes and stored >= expire:
+                break
+            self._remove_file(cache_key)
+            self._evictions = self._evictions + 1
+
+    def _evict_memory(self) -> None:
+        expire = time.time() - self._max_age
+        while self._memory:
+            cache_key, (stored, data) = next(iter(self._memory.items()))
+            if self._memory_bytes <= self._max_memory_bytes and stored >= expire:
+                break
+            del self._memory[cache_key]
+            self._decoded.pop(cache_key, None)
+            self._memory_bytes = self._memory_bytes - len(data)
+            self._evictions = self._evictions + 1
+
+    def _put_memory(self, cache_key: str, stored: float, data: bytes) -> None:
+        if len(data) > self._max_memory_bytes:
+            return
+        previous = self._memory.pop(cache_key, None)
+        if previous is not None:
+            self._memory_bytes = self._memory_bytes - len(previous[1])
+        self._memory[cache_key] = (stored, data)
+        self._memory_bytes = self._memory_bytes + len(data)
+        self._evict_memory()
+
+    def get(self, object_name: str, key: str | None = None) -> bytes | None:
+        """Get cached contents of an object"""
+        if not object_name:
+            return None
+        cache_key = self.cache_key(object_name, key)
+        with self._lock:
+            item = self._memory.get(cache_key)
+            if item is not None:
+                if item[0] >= time.time() - self._max_age:
+                    self._memory.move_to_end(cache_key)
+                    self._hits = self._hits + 1
+                    return item[1]
+                del self._memory[cache_key]
+                self._decoded.pop(cache_key, None)
+                self._memory_bytes = self._memory_bytes - len(item[1])
+
+            self._load_disk_index()
+            item = self._disk.get(cache_key)
+            if item is not None:
+                if item[0] >= time.time() - self._max_age:
+                    try:
+                        with open(self._file_path(cache_key), "rb") as file:
+                            data = file.read()
+                        self._disk.move_to_end(cache_key)
+                        self._put_memory(cache_key, item[0], data)
+                        self._hits = self._hits + 1
+                        self._disk_hits = self._disk_hits + 1
+                        return data
+                    except OSError:
+                        pass
+                self._remove_file(cache_key)
+
+            self._misses = self._misses + 1
+        return None
+
+    def set(self, object_name: str, data: bytes, key: str | None = None) -> None:
+        """Store contents of an object"""
+        if not object_name or not data:
+            return
+        if isinstance(data, str):
+            data = data.encode()
+        cache_key = self.cache_key(object_name, key)
+        now = time.time()
+        with self._lock:
+            self._put_memory(cache_key, now, data)
+            self._load_disk_index()
+            if self._path and len(data) <= self._max_disk_bytes:
+                try:
+                    temp_path = f"{self._file_path(cache_key)}.tmp"
+                    with open(temp_path, "wb") as file:
+                        file.write(data)
+                    os.replace(temp_path, self._file_path(cache_key))
+                    previous = self._disk.pop(cache_key, None)
+                    if previous is not None:
+                        self._disk_bytes = self._disk_bytes - previous[1]
+                    self._disk[cache_key] = (now, len(data))
+                    self._disk_bytes = self._disk_bytes + len(data)
+                    self._evict_disk()
+                except OSError as ex:
+                    _LOGGER.debug("Object cache write failed: %s", ex)
+
+    def get_decoded(self, object_name: str, key: str | None = None) -> Any:
+        """Get a copy of the decoded object attached to a cached object"""
+        if not object_name:
+            return None
+        cache_key = self.cache_key(object_name, key)
+        with self._lock:
+            if cache_key not in self._decoded or cache_key not in self._memory:
+                return None
+            self._decoded.move_to_end(cache_key)
+            self._memory.move_to_end(cache_key)
+            self._hits = self._hits + 1
+            value = self._decoded[cache_key]
+        # Stored copy is never modified so it is copied outside of the lock
+        return copy.deepcopy(value)
+
+    def set_decoded(self, object_name: str, value: Any, key: str | None = None) -> None:
+        """Attach a copy of a decoded object to a cached object"""
+        if not object_name or value is None:
+            return
+        cache_key = self.cache_key(object_name, key)
+        with self._lock:
+            if cache_key not in self._memory:
+                return
+        value = copy.deepcopy(value)
+        with self._lock:
+            if cache_key in self._memory:
+                self._decoded[cache_key] = value
+                self._decoded.move_to_end(cache_key)
+                while len(self._decoded) > self._max_decoded_items:
+                    self._decoded.popitem(last=False)
+
+    def contains(self, object_name: str, key: str | None = None, decoded: bool = False) -> bool:
+        """Check whether an object is cached without updating the statistics"""
+        if not object_name:
+            return False
+        cache_key = self.cache_key(object_name, key)
+        with self._lock:
+            if decoded:
+                return bool(cache_key in self._decoded and cache_key in self._memory)
+            if cache_key in self._memory:
+                return True
+            self._load_disk_index()
+            return cache_key in self._disk
+
+    def size(self, object_name: str, key: str | None = None) -> int:
+        """Stored size of an object without updating the statistics, 0 when it is not cached"""
+        if not object_name:
+            return 0
+        cache_key = self.cache_key(object_name, key)
+        with self._lock:
+            item = self._memory.get(cache_key)
+            if item is not None:
+                return len(item[1])
+            self._load_disk_index()
+            item = self._disk.get(cache_key)
+            return item[1] if item is not None else 0
+
+    def clear(self) -> None:
+        """Remove all cached objects from memory and disk"""
+        with self._lock:
+            self._memory.clear()
+            self._decoded.clear()
+            self._memory_bytes = 0
+            self._load_disk_index()
+            for cache_key in list(self._disk.keys()):
+                self._remove_file(cache_key)
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        """Cache usage and hit/miss statistics"""
+        with self._lock:
+            total = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "disk_hits": self._disk_hits,
+                "evictions": self._evictions,
+                "hit_rate": round(self._hits / total * 100, 1) if total else 0,
+                "memory_items": len(self._memory),
+                "memory_bytes": self._memory_bytes,
+                "decoded_items": len(self._decoded),
+                "disk_items": len(self._disk) if self._disk is not None else None,
+                "disk_bytes": self._disk_bytes if self._disk is not None else None,
+            }
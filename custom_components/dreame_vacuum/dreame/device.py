@@ -1,17 +1,18 @@
 from __future__ import annotations
 
 import base64
+from concurrent.futures import ThreadPoolExecutor
 import copy
 from datetime import datetime
 from functools import cmp_to_key
 import json
 import logging
+import os
 from random import randrange
 import re
 from threading import Timer
 import time
 from typing import Any
-import zlib
 
 from .const import (
     ATTR_AP,
@@ -110,7 +111,6 @@ from .const import (
     CONSUMABLE_TO_LIFE_WARNING_DESCRIPTION,
     CUSTOM_MOPPING_ROUTE_TO_NAME,
     DETERGENT_STATUS_TO_NAME,
-    DEVICE_INFO,
     DIRTY_WATER_TANK_STATUS_TO_NAME,
     DRAINAGE_STATUS_TO_NAME,
     DUST_BAG_STATUS_TO_NAME,
@@ -163,14 +163,18 @@ from .const import (
     WATER_VOLUME_CODE_TO_NAME,
     WIDER_CORNER_COVERAGE_TO_NAME,
 )
+from .dispatcher import CHANGE_INFO, CHANGE_MAP, CHANGE_PROPERTY, DreameVacuumChanges, DreameVacuumDispatcher
 from .exceptions import (
+    DeviceException,
     DeviceUpdateFailedException,
     InvalidActionException,
     InvalidValueException,
 )
+from .history import HISTORY_SYNC_LIMIT, DreameVacuumHistoryStore
 from .map import DreameMapVacuumMapManager, DreameVacuumMapDecoder
 from .protocol import DreameVacuumProtocol
 from .resources import ERROR_IMAGE
+from .scheduler import DreameVacuumPollScheduler
 from .types import (
     ACTION_AVAILABILITY,
     ATTR_ACTIVE_AREAS,
@@ -178,7 +182,6 @@ from .types import (
     ATTR_ACTIVE_POINTS,
     ATTR_ACTIVE_SEGMENTS,
     ATTR_PREDEFINED_POINTS,
-    DID,
     DIID,
     PIID,
     PROPERTY_AVAILABILITY,
@@ -244,11 +247,15 @@ from .types import (
     ObstacleType,
     Path,
     PathType,
+    PropertyRoute,
     RobotType,
     ScheduleTask,
     Segment,
     Shortcut,
     ShortcutTask,
+    device_capability,
+    device_info_version,
+    piid,
 )
 
 _LOGGER = logging.getLogger(__name__)
@@ -273,6 +280,7 @@ class DreameVacuumDevice:
         account_type: str = "mi",
         device_id: str | None = None,
         auth_key: str | None = None,
+        cache_path: str | None = None,
     ) -> None:
         # Used for easy filtering the device from cloud device list and generating unique ids
         self.info = None
@@ -281,10 +289,15 @@ class DreameVacuumDevice:
         self.host: str = None  # IP address or host name of the device
         # Dictionary for storing the current property values
         self.data: dict[DreameVacuumProperty, Any] = {}
+        # Bumped on every property, map or state change for invalidating memoized status values
+        self._data_generation: int = 0
+        # Batches property, map and info change notifications for the external listener
+        self._dispatcher: DreameVacuumDispatcher = DreameVacuumDispatcher(self._dispatch_changes)
         self.auto_switch_data: dict[DreameVacuumAutoSwitchProperty, Any] = None
         self.ai_data: dict[DreameVacuumStrAIProperty | DreameVacuumAIProperty, Any] = None
         self.available: bool = False  # Last update is successful or not
         self.disconnected: bool = False
+        self.stale: bool = False  # Device state is restored from the snapshot and the device is not connected yet
 
         self._update_running: bool = False  # Update is running
         # Previous cleaning mode for restoring it after water tank is installed or removed
@@ -294,11 +307,26 @@ class DreameVacuumDevice:
         self._ready: bool = False
         # Last settings properties requested time
         self._last_settings_request: float = 0
+        self._last_property_sweep: float = 0  # Last time properties are polled instead of waiting for push messages
+        self._push_mode: bool = None
+        self._push_sweep_interval: int = 300  # Reconciliation interval of the polled properties while push is healthy
+        self._push_idle_timeout: int = 120  # Maximum time without a push message while the robot is active
+        # Poll periods of the property groups learned from their change rate in each device state
+        self._poll_scheduler: DreameVacuumPollScheduler = DreameVacuumPollScheduler(
+            {"status": (3, 20), "settings": (10, 60), "map": (2.5, 30)}
+        )
         self._last_map_list_request: float = 0  # Last map list property requested time
         self._last_map_request: float = 0  # Last map request trigger time
         self._last_change: float = 0  # Last property change time
         self._last_update_failed: float = 0  # Last update failed time
         self._cleaning_history_update: float = 0  # Cleaning history update time
+        # Cleaning and cruising history events persisted for restoring the history before the cloud is queried
+        self._cleaning_history_store: DreameVacuumHistoryStore = DreameVacuumHistoryStore(
+            os.path.join(cache_path, "cleaning_history.json") if cache_path else None
+        )
+        self._cruising_history_store: DreameVacuumHistoryStore = DreameVacuumHistoryStore(
+            os.path.join(cache_path, "cruising_history.json") if cache_path else None
+        )
         self._update_fail_count: int = 0  # Update failed counter
         self._draining_complete_time: int = None
         self._map_select_time: float = None
@@ -309,8 +337,29 @@ class DreameVacuumDevice:
         self._error_callback = None  # External update failed callback
         # External update callbacks for specific device property
         self._property_update_callback = {}
+        # Property routing tables for incoming messages, built from the property mapping on first use
+        self._property_routes: dict[tuple[int, int], PropertyRoute] = None
+        self._property_routes_by_did: dict[int, PropertyRoute] = None
+        self._property_routes_mapping: dict[DreameVacuumProperty, dict[str, int]] = None
         self._update_timer: Timer = None  # Update schedule timer
-        self._callback_timer: Timer = None  # Update listener debouncing timer
+        # Resolved capability vector and key of the model, persisted for skipping the database lookup on next startups
+        self._capability_data: dict[str, Any] = None
+        self._capability_path: str = os.path.join(cache_path, "capability.json") if cache_path else None
+        # Last known device state persisted for showing it before the device is connected on next startups.
+        # Stored next to the map cache with blocking writes from the update thread since this library does not depend
+        # on Home Assistant and its storage helper can only be used from the event loop.
+        self._snapshot_path: str = os.path.join(cache_path, "snapshot.json") if cache_path else None
+        self._snapshot_interval: int = 300  # Minimum time between snapshot writes
+        self._last_snapshot: float = 0  # Last snapshot write time
+        self._snapshot_generation: int = None  # Data generation of the last written snapshot
+        # Restored properties that are not received from the device yet
+        self._stale_properties: set[int] = None
+        # Worker pool for requesting property chunks in parallel, created on first use
+        self._property_executor: ThreadPoolExecutor = None
+        self._property_executor_workers: int = 0  # Size of the property worker pool
+        self._property_chunk_size: int = 15
+        self._property_retry_count: int = 3  # Attempts per property chunk before giving up
+        self._property_retry_delay: float = 0.5  # Initial backoff between property chunk attempts
         # Used for requesting consumable properties after reset action otherwise they will only requested when cleaning completed
         self._consumable_change: bool = False
         self._remote_control: bool = False
@@ -507,7 +556,7 @@ class DreameVacuumDevice:
             auth_key,
         )
         if self._protocol.cloud:
-            self._map_manager = DreameMapVacuumMapManager(self._protocol)
+            self._map_manager = DreameMapVacuumMapManager(self._protocol, cache_path)
 
             self.listen(self._map_list_changed, DreameVacuumProperty.MAP_LIST)
             self.listen(self._recovery_map_list_changed, DreameVacuumProperty.RECOVERY_MAP_LIST)
@@ -543,21 +592,15 @@ class DreameVacuumDevice:
             if method == "properties_changed":
                 properties = []
                 map_properties = []
+                routes = self._get_property_routes()
                 for param in params:
-                    prop = DID(param["siid"], param["piid"])
-                    if prop is not None:
-                        if prop in self._default_properties:
-                            param["did"] = str(prop.value)
+                    route = routes.get((param.get("siid"), param.get("piid")))
+                    if route is not None:
+                        if route.default:
+                            param["did"] = str(route.prop.value)
                             param["code"] = 0
                             properties.append(param)
-                            continue
-
-                        if (
-                            prop is DreameVacuumProperty.OBJECT_NAME
-                            or prop is DreameVacuumProperty.MAP_DATA
-                            or prop is DreameVacuumProperty.ROBOT_TIME
-                            or prop is DreameVacuumProperty.OLD_MAP_DATA
-                        ):
+                        elif route.map:
                             map_properties.append(param)
 
                 if len(map_properties) and self._map_manager:
@@ -570,20 +613,179 @@ class DreameVacuumDevice:
                     self.info = info
                     self._last_change = time.time()
                     if self._ready:
-                        self._property_changed()
+                        self._property_changed(change_type=CHANGE_INFO)
+
+    def _load_capability(self) -> None:
+        """Load device capabilities from the persisted data or the capability database"""
+        model = self.info.model
+        if self._capability_data is None and self._capability_path:
+            try:
+                with open(self._capability_path, encoding="utf-8") as file:
+                    data = json.load(file)
+                if data.get("model") == model and data.get("version") == device_info_version():
+                    self._capability_data = data
+            except (OSError, ValueError):
+                pass
+
+        if self._capability_data is None or self._capability_data.get("model") != model:
+            capability, key = device_capability(model)
+            self._capability_data = {
+                "model": model,
+                "version": device_info_version(),
+                "capability": capability,
+                "key": key,
+            }
+            if self._capability_path:
+                try:
+                    os.makedirs(os.path.dirname(self._capability_path), exist_ok=True)
+                    temp_path = f"{self._capability_path}.tmp"
+                    with open(temp_path, "w", encoding="utf-8") as file:
+                        json.dump(self._capability_data, file)
+                    os.replace(temp_path, self._capability_path)
+                except OSError as ex:
+                    _LOGGER.debug("Device capabilities cannot be stored: %s", ex)
+
+        self.capability.load(self._capability_data["capability"], self._capability_data["key"])
+        self._data_generation = self._data_generation + 1
+
+    def restore_snapshot(self) -> bool:
+        """Restore the device state persisted on previous run, values are stale until received from the device"""
+        if self._ready or self.info is not None or not self._snapshot_path:
+            return False
+        try:
+            with open(self._snapshot_path, encoding="utf-8") as file:
+                snapshot = json.load(file)
+            if snapshot.get("version") != device_info_version() or not snapshot.get("info") or not snapshot.get("data"):
+                return False
+            self.info = DreameVacuumDeviceInfo(snapshot["info"])
+            self.data = {int(k): v for k, v in snapshot["data"].items()}
+            self.auto_switch_data = snapshot.get("auto_switch_data")
+            self.ai_data = snapshot.get("ai_data")
+            self._load_capability()
+        except (OSError, ValueError, TypeError, KeyError, AttributeError) as ex:
+            _LOGGER.debug("Device state cannot be restored: %s", ex)
+            self.info = None
+            self.data = {}
+            self.auto_switch_data = None
+            self.ai_data = None
+            return False
+
+        if self.mac is None:
+            self.mac = self.info.mac_address
+        self._stale_properties = set(self.data)
+        self._snapshot_generation = self._data_generation
+        self.stale = True
+        _LOGGER.debug(
+            "Restored %d properties stored at %s",
+            len(self.data),
+            datetime.fromtimestamp(snapshot.get("time", 0)),
+        )
+        return True
+
+    def _save_snapshot(self) -> None:
+        """Persist the current device state for restoring it on next startup"""
+        if not self._snapshot_path or not self._ready or self.info is None or not self.data:
+            return
+        if self._snapshot_generation == self._data_generation:
+            return
+        self._snapshot_generation = self._data_generation
+        self._last_snapshot = time.time()
+        auto_switch_data = self.auto_switch_data
+        ai_data = self.ai_data
+        snapshot = {
+            "version": device_info_version(),
+            "time": int(self._last_snapshot),
+            "info": self.info.data,
+            "data": {str(k): v for k, v in dict(self.data).items()},
+            "auto_switch_data": dict(auto_switch_data) if auto_switch_data else None,
+            "ai_data": dict(ai_data) if ai_data else None,
+        }
+        try:
+            os.makedirs(os.path.dirname(self._snapshot_path), exist_ok=True)
+            temp_path = f"{self._snapshot_path}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as file:
+                json.dump(snapshot, file, separators=(",", ":"))
+            os.replace(temp_path, self._snapshot_path)
+        except (OSError, TypeError, ValueError) as ex:
+            _LOGGER.debug("Device state cannot be stored: %s", ex)
+
+    def _reconcile_snapshot(self) -> None:
+        """Drop the restored values that are not received from the device after it is connected"""
+        stale_properties = self._stale_properties
+        self._stale_properties = None
+        self.stale = False
+        if stale_properties is None:
+            return
+        for did in stale_properties:
+            self.data.pop(did, None)
+        if DreameVacuumProperty.AUTO_SWITCH_SETTINGS.value not in self.data:
+            self.auto_switch_data = None
+        if DreameVacuumProperty.AI_DETECTION.value not in self.data:
+            self.ai_data = None
+        self._property_changed(False)
+
+    def _get_property_routes(self) -> dict[tuple[int, int], PropertyRoute]:
+        """Property routing table by (siid, piid), rebuilt when the property mapping or listeners are changed"""
+        if self._property_routes is None or self._property_routes_mapping is not self.property_mapping:
+            mapping = self.property_mapping
+            default_properties = set(self._default_properties)
+            map_properties = {
+                DreameVacuumProperty.OBJECT_NAME,
+                DreameVacuumProperty.MAP_DATA,
+                DreameVacuumProperty.ROBOT_TIME,
+                DreameVacuumProperty.OLD_MAP_DATA,
+            }
+            # Do not call external listener when map and json properties changed
+            silent_properties = {
+                DreameVacuumProperty.MAP_LIST,
+                DreameVacuumProperty.RECOVERY_MAP_LIST,
+                DreameVacuumProperty.MAP_DATA,
+                DreameVacuumProperty.OBJECT_NAME,
+                DreameVacuumProperty.AUTO_SWITCH_SETTINGS,
+                DreameVacuumProperty.AI_DETECTION,
+            }
+            custom_properties = {
+                DreameVacuumProperty.AUTO_SWITCH_SETTINGS,
+                DreameVacuumProperty.AI_DETECTION,
+                DreameVacuumProperty.MAP_LIST,
+                DreameVacuumProperty.SERIAL_NUMBER,
+            }
+
+            routes = {}
+            routes_by_did = {}
+            for prop in DreameVacuumProperty:
+                route = PropertyRoute(
+                    prop,
+                    prop in default_properties,
+                    prop in map_properties,
+                    prop in silent_properties,
+                    prop in custom_properties,
+                    self._property_update_callback.get(prop.value),
+                )
+                routes_by_did[prop.value] = route
+                item = mapping.get(prop)
+                if item is not None and "piid" in item:
+                    routes.setdefault((item["siid"], item["piid"]), route)
+
+            self._property_routes_by_did = routes_by_did
+            self._property_routes_mapping = mapping
+            self._property_routes = routes
+        return self._property_routes
 
     def _handle_properties(self, properties) -> bool:
         changed = False
         callbacks = []
+        routes = self._get_property_routes()
+        routes_by_did = self._property_routes_by_did
         for prop in properties:
             if not isinstance(prop, dict):
                 continue
-            did = int(prop["did"])
-            if did not in DreameVacuumProperty._value2member_map_:
-                did = DID(prop["siid"], prop["piid"])
-                if did is None:
+            route = routes_by_did.get(int(prop["did"]))
+            if route is None:
+                route = routes.get((prop.get("siid"), prop.get("piid")))
+                if route is None:
                     continue
-                did = int(did.value)
+            did = route.prop.value
             if prop["code"] == 0 and "value" in prop:
                 value = prop["value"]
                 if did in self._dirty_data:
@@ -602,50 +804,49 @@ class DreameVacuumDevice:
                     del self._dirty_data[did]
 
                 current_value = self.data.get(did)
+                stale_properties = self._stale_properties
+                if stale_properties is not None and did in stale_properties:
+                    # Restored value is replaced as if it was never received so the change callbacks run like on
+                    # a normal startup and sub properties are parsed again
+                    stale_properties.discard(did)
+                    current_value = None
+                    if did == DreameVacuumProperty.AUTO_SWITCH_SETTINGS.value:
+                        self.auto_switch_data = None
+                    elif did == DreameVacuumProperty.AI_DETECTION.value:
+                        self.ai_data = None
+
                 if current_value != value:
-                    # Do not call external listener when map and json properties changed
-                    if not (
-                        did == DreameVacuumProperty.MAP_LIST.value
-                        or did == DreameVacuumProperty.RECOVERY_MAP_LIST.value
-                        or did == DreameVacuumProperty.MAP_DATA.value
-                        or did == DreameVacuumProperty.OBJECT_NAME.value
-                        or did == DreameVacuumProperty.AUTO_SWITCH_SETTINGS.value
-                        or did == DreameVacuumProperty.AI_DETECTION.value
-                        # or did == DreameVacuumProperty.SELF_TEST_STATUS.value
-                    ):
+                    if not route.silent:
                         changed = True
-                    custom_property = (
-                        did == DreameVacuumProperty.AUTO_SWITCH_SETTINGS.value
-                        or did == DreameVacuumProperty.AI_DETECTION.value
-                        or did == DreameVacuumProperty.MAP_LIST.value
-                        or did == DreameVacuumProperty.SERIAL_NUMBER.value
-                    )
+                    custom_property = route.custom
                     if not custom_property:
                         if current_value is not None:
                             _LOGGER.debug(
                                 "Property %s Changed: %s -> %s",
-                                DreameVacuumProperty(did).name,
+                                route.prop.name,
                                 current_value,
                                 value,
                             )
                         else:
                             _LOGGER.debug(
                                 "Property %s Added: %s",
-                                DreameVacuumProperty(did).name,
+                                route.prop.name,
                                 value,
                             )
                     self.data[did] = value
-                    if did in self._property_update_callback:
-                        for callback in self._property_update_callback[did]:
+                    self._record_change(did)
+                    if route.callbacks:
+                        for callback in route.callbacks:
                             if not self._ready and custom_property:
                                 callback(current_value)
                             else:
                                 callbacks.append([callback, current_value])
             else:
-                _LOGGER.debug("Property %s Not Available", DreameVacuumProperty(did).name)
+                _LOGGER.debug("Property %s Not Available", route.prop.name)
 
         if not self._ready:
-            self.capability.load(json.loads(zlib.decompress(base64.b64decode(DEVICE_INFO), zlib.MAX_WBITS | 32)))
+            self._load_capability()
+            self._property_routes = None
 
         for callback in callbacks:
             callback[0](callback[1])
@@ -653,7 +854,7 @@ class DreameVacuumDevice:
         if changed:
             self._last_change = time.time()
             if self._ready:
-                self._property_changed()
+                self._property_changed(partial=True)
 
         if not self._ready:
             if self._protocol.dreame_cloud:
@@ -784,15 +985,69 @@ class DreameVacuumDevice:
                 if "aiid" not in mapping and (not self._ready or prop.value in self.data):
                     property_list.append({"did": str(prop.value), **mapping})
 
-        props = property_list.copy()
+        chunks = [
+            property_list[i : i + self._property_chunk_size]
+            for i in range(0, len(property_list), self._property_chunk_size)
+        ]
+        concurrency = self._protocol.request_concurrency
+        # Requests are serialized until the connection is established to not trigger multiple cloud logins
+        if concurrency > 1 and len(chunks) > 1 and self._protocol.connected:
+            # Pool is sized for the current transport so it never exceeds the allowed requests in flight
+            if self._property_executor is None or self._property_executor_workers != concurrency:
+                if self._property_executor:
+                    self._property_executor.shutdown(wait=False)
+                self._property_executor = ThreadPoolExecutor(
+                    max_workers=concurrency, thread_name_prefix="dreame_vacuum_properties"
+                )
+                self._property_executor_workers = concurrency
+            futures = [self._property_executor.submit(self._request_property_chunk, chunk) for chunk in chunks]
+            responses = []
+            for future in futures:
+                try:
+                    responses.append(future.result())
+                except Exception as ex:
+                    responses.append(ex)
+        else:
+            responses = []
+            for chunk in chunks:
+                try:
+                    responses.append(self._request_property_chunk(chunk))
+                except Exception as ex:
+                    responses.append(ex)
+
+        # Merge results in request order and handle the received ones even when some of the chunks are failed
         results = []
-        while props:
-            result = self._protocol.get_properties(props[:15])
-            if result is not None:
-                results.extend(result)
-                props[:] = props[15:]
+        error = None
+        for response in responses:
+            if isinstance(response, Exception):
+                if error is None:
+                    error = response
+            else:
+                results.extend(response)
+
+        changed = self._handle_properties(results)
+        if error is not None:
+            raise error
+        return changed
+
+    def _request_property_chunk(self, chunk: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        """Request a chunk of properties from the device with a bounded retry budget."""
+        attempt = 0
+        while True:
+            attempt = attempt + 1
+            try:
+                result = self._protocol.get_properties(chunk)
+                if result is not None:
+                    return result
+                error = DeviceException("Get properties failed")
+            except Exception as ex:
+                error = ex
 
-        return self._handle_properties(results)
+            if attempt >= self._property_retry_count or self.disconnected:
+                raise error
+            delay = self._property_retry_delay * (2 ** (attempt - 1))
+            _LOGGER.debug("Get properties failed, retrying in %.1fs: %s", delay, error)
+            time.sleep(delay)
 
     def _update_status(self, task_status: DreameVacuumTaskStatus, status: DreameVacuumStatus) -> None:
         """Update status properties on memory for map renderer to update the image before action is sent to the device."""
@@ -824,6 +1079,7 @@ class DreameVacuumDevice:
             if current_value != value:
                 did = prop.value
                 self.data[did] = value
+                self._record_change(did)
                 if did in self._property_update_callback:
                     for callback in self._property_update_callback[did]:
                         callback(current_value)
@@ -833,7 +1089,7 @@ class DreameVacuumDevice:
                     and prop != DreameVacuumProperty.STATE
                     and prop != DreameVacuumProperty.AUTO_EMPTY_STATUS
                 ):
-                    self._property_changed(delay)
+                    self._property_changed(delay, True)
                 return current_value if current_value is not None else value
         return None
 
@@ -1632,6 +1888,63 @@ class DreameVacuumDevice:
         if self._map_manager and previous_battery_level is not None and self.status.battery_level == 100:
             self._map_manager.editor.refresh_map()
 
+    def _create_cleaning_history(self, payload: str) -> CleaningHistory:
+        history = CleaningHistory(json.loads(payload), self.property_mapping)
+        if history.cleanup_method == CleanupMethod.CUSTOMIZED_CLEANING and self.capability.cleangenius:
+            history.cleanup_method = CleanupMethod.DEFAULT_MODE
+        return history
+
+    def _create_cruising_history(self, payload: str) -> CleaningHistory:
+        return CleaningHistory(json.loads(payload), self.property_mapping)
+
+    def _history_events(self, result: list[dict[str, Any]]) -> dict[int, str]:
+        """Raw payloads of the history events keyed by their task start time"""
+        start_piid = PIID(DreameVacuumProperty.CLEANING_START_TIME, self.property_mapping)
+        events = {}
+        for data in result:
+            payload = data["history"] if "history" in data else data["value"]
+            for item in json.loads(payload):
+                if item.get(piid) == start_piid:
+                    events[int(item["value"] if "value" in item else item["val"])] = payload
+                    break
+        return events
+
+    def _sync_history(
+        self, store: DreameVacuumHistoryStore, prop: DreameVacuumProperty, limit: int, start: int
+    ) -> bool:
+        """Fetch history events into the store, only events after the latest stored task are requested if possible"""
+        key = DIID(prop, self.property_mapping)
+        latest = store.latest
+        if latest is not None:
+            result = self._protocol.cloud.get_device_event(key, HISTORY_SYNC_LIMIT, latest)
+            # A full page may be missing older events, fall back to requesting the whole window
+            if result is not None and len(result) < HISTORY_SYNC_LIMIT:
+                return store.add(self._history_events(result))
+
+        result = self._protocol.cloud.get_device_event(key, limit, start)
+        if result:
+            return store.add(self._history_events(result))
+        return False
+
+    def _restore_history(self) -> None:
+        """Show the persisted history before it is requested from the cloud"""
+        if self.status._cleaning_history is None:
+            cleaning_history = self._cleaning_history_store.history(self._create_cleaning_history, 25)
+            if cleaning_history:
+                self.status._cleaning_history = cleaning_history
+                self.status._cleaning_history_attrs = None
+                self.status._last_cleaning_time = cleaning_history[0].date.replace(
+                    tzinfo=datetime.now().astimezone().tzinfo
+                )
+        if self.status._cruising_history is None and self.capability.cruising:
+            cruising_history = self._cruising_history_store.history(self._create_cruising_history, 25)
+            if cruising_history:
+                self.status._cruising_history = cruising_history
+                self.status._cruising_history_attrs = None
+                self.status._last_cruising_time = cruising_history[0].date.replace(
+                    tzinfo=datetime.now().astimezone().tzinfo
+                )
+
     def _request_cleaning_history(self) -> None:
         """Get and parse the cleaning history from cloud event data and set it to memory"""
         if (
@@ -1646,6 +1959,8 @@ class DreameVacuumDevice:
                 )
             )
         ):
+            # History is reloaded on the first request after connecting even when no new events are received
+            reload = self._cleaning_history_update == -1
             self._cleaning_history_update = 0
 
             _LOGGER.debug("Get Cleaning History")
@@ -1667,76 +1982,63 @@ class DreameVacuumDevice:
 
                 changed = False
                 # Cleaning history is generated from events of status property that has been sent to cloud by the device when it changed
-                result = self._protocol.cloud.get_device_event(
-                    DIID(DreameVacuumProperty.STATUS, self.property_mapping),
-                    limit,
-                    start,
-                )
-                if result:
-                    cleaning_history = []
-                    history_size = 0
-                    for data in result:
-                        history = CleaningHistory(
-                            json.loads(data["history"] if "history" in data else data["value"]),
-                            self.property_mapping,
-                        )
-                        if history_size > 0 and cleaning_history[-1].date == history.date:
-                            continue
-
-                        if history.cleanup_method == CleanupMethod.CUSTOMIZED_CLEANING and self.capability.cleangenius:
-                            history.cleanup_method = CleanupMethod.DEFAULT_MODE
-
-                        cleaning_history.append(history)
-                        history_size = history_size + 1
-                        if history_size >= max or history_size >= total:
-                            break
-
-                    if self.status._cleaning_history != cleaning_history:
+                if (
+                    self._sync_history(self._cleaning_history_store, DreameVacuumProperty.STATUS, limit, start)
+                    or reload
+                    or self.status._cleaning_history is None
+                ):
+                    cleaning_history = self._cleaning_history_store.history(
+                        self._create_cleaning_history, min(max, total)
+                    )
+                    if cleaning_history:
                         _LOGGER.debug("Cleaning History Changed")
                         self.status._cleaning_history = cleaning_history
                         self.status._cleaning_history_attrs = None
-                        if cleaning_history:
-                            self.status._last_cleaning_time = cleaning_history[0].date.replace(
-                                tzinfo=datetime.now().astimezone().tzinfo
-                            )
+                        self.status._last_cleaning_time = cleaning_history[0].date.replace(
+                            tzinfo=datetime.now().astimezone().tzinfo
+                        )
                         changed = True
 
                 if self.capability.cruising:
                     # Cruising history is generated from events of water volume property that has been sent to cloud by the device when it changed
-                    result = self._protocol.cloud.get_device_event(
-                        DIID(DreameVacuumProperty.WATER_VOLUME, self.property_mapping),
-                        limit,
-                        start,
-                    )
-                    if result:
-                        cruising_history = []
-                        history_size = 0
-                        for data in result:
-                            history = CleaningHistory(
-                                json.loads(data["history"] if "history" in data else data["value"]),
-                                self.property_mapping,
-                            )
-                            if history_size > 0 and cruising_history[-1].date == history.date:
-                                continue
-                            cruising_history.append(history)
-                            history_size = history_size + 1
-                            if history_size >= max or history_size >= total:
-                                break
-
-                        if self.status._cruising_history != cruising_history:
+                    if (
+                        self._sync_history(
+                            self._cruising_history_store, DreameVacuumProperty.WATER_VOLUME, limit, start
+                        )
+                        or reload
+                        or self.status._cruising_history is None
+                    ):
+                        cruising_history = self._cruising_history_store.history(
+                            self._create_cruising_history, min(max, total)
+                        )
+                        if cruising_history:
                             _LOGGER.debug("Cruising History Changed")
                             self.status._cruising_history = cruising_history
                             self.status._cruising_history_attrs = None
-                            if cruising_history:
-                                self.status._last_cruising_time = cruising_history[0].date.replace(
-                                    tzinfo=datetime.now().astimezone().tzinfo
-                                )
+                            self.status._last_cruising_time = cruising_history[0].date.replace(
+                                tzinfo=datetime.now().astimezone().tzinfo
+                            )
                             changed = True
 
                 if changed:
                     if self.capability.auto_recleaning:
                         self.history_map(1)
 
+                    if self._map_manager and self.capability.map:
+                        self._map_manager.prefetch_history_maps(
+                            *(
+                                [
+                                    (item.object_name, item.key)
+                                    for item in history
+                                    if item.object_name not in self.status._history_map_data
+                                ]
+                                for history in (
+                                    self.status._cleaning_history or [],
+                                    self.status._cruising_history or [],
+                                )
+                            )
+                        )
+
                     if self._ready:
                         for k, v in copy.deepcopy(self.status._history_map_data).items():
                             found = False
@@ -1767,30 +2069,39 @@ class DreameVacuumDevice:
             except Exception as ex:
                 _LOGGER.warning("Get Cleaning History failed!: %s", ex)
 
-    def _property_changed(self, delay=True) -> None:
-        """Call external listener when a property changed"""
+    def _record_change(self, did: int) -> None:
+        """Track a changed property for the next listener update"""
+        self._data_generation = self._data_generation + 1
+        self._dispatcher.record(did)
+
+    def _property_changed(self, delay=True, partial=False, change_type=CHANGE_PROPERTY) -> None:
+        """Call external listener when a property changed.
+        Partial notifications only refresh the entities of the tracked changed properties.
+        """
+        self._data_generation = self._data_generation + 1
         if self._update_callback:
-            if self._callback_timer is not None:
-                self._callback_timer.cancel()
+            self._dispatcher.notify(change_type, delay, partial)
 
-            if delay:
-                self._callback_timer = Timer(0.1, self._update_callback)
-                self._callback_timer.start()
-            else:
-                self._update_callback()
+    def _dispatch_changes(self, changes: DreameVacuumChanges) -> None:
+        """Call external listener with a batch of changes"""
+        if self._update_callback:
+            self._update_callback(changes)
 
     def _map_updated(self) -> None:
         """Call external listener when a map updated from local"""
         self._last_map_change_time = time.time()
-        self._property_changed()
+        self._poll_scheduler.record("map", True)
+        self._property_changed(change_type=CHANGE_MAP)
 
     def _map_changed(self, saved_map) -> None:
         """Call external listener when a map changed"""
+        self._data_generation = self._data_generation + 1
         map_data = self.status.current_map
         if self._map_select_time:
             self._map_select_time = None
         if not saved_map:
             self._last_map_change_time = time.time()
+            self._poll_scheduler.record("map", True)
         if map_data and self.status.started:
             if self.status.go_to_zone is None and not self.status._capability.cruising and self.status.zone_cleaning:
                 if map_data.active_areas and len(map_data.active_areas) == 1:
@@ -1841,7 +2152,7 @@ class DreameVacuumDevice:
                 self.schedule_update(self._update_interval, True)
 
         if self._map_manager.ready:
-            self._property_changed()
+            self._property_changed(change_type=CHANGE_MAP)
 
     def _update_failed(self, ex) -> None:
         """Call external listener when update failed"""
@@ -1858,6 +2169,8 @@ class DreameVacuumDevice:
             self.update(force_request_properties)
             if self._ready:
                 self.available = True
+                if time.time() - self._last_snapshot >= self._snapshot_interval:
+                    self._save_snapshot()
             self._update_fail_count = 0
         except Exception as ex:
             self._update_fail_count = self._update_fail_count + 1
@@ -1875,7 +2188,44 @@ class DreameVacuumDevice:
                     self._update_failed(ex)
 
         if not self.disconnected:
-            self.schedule_update(self._update_interval)
+            wait = self._update_interval
+            circuit = self._protocol.circuit
+            if circuit.open:
+                # Retry as soon as the transport allows a probe request
+                wait = max(min(wait, circuit.retry_in), 1)
+            self.schedule_update(wait)
+
+    def _update_poll_schedule(self) -> None:
+        """Update poll period bounds and the device state used by the adaptive poll schedule"""
+        prefer_cloud = self._protocol.prefer_cloud
+        self._poll_scheduler.set_bounds("status", 5 if prefer_cloud else 3, 30 if prefer_cloud else 20)
+        self._poll_scheduler.set_bounds("map", 10 if self._protocol.dreame_cloud else 2.5, 30)
+
+        status = self.status
+        if status.has_error:
+            state = "error"
+        elif status.washing:
+            state = "washing"
+        elif status.drying:
+            state = "drying"
+        elif status.active or status.started:
+            state = "cleaning"
+        elif status.docked:
+            state = "docked"
+        else:
+            state = "idle"
+        self._poll_scheduler.set_state(state)
+
+    def _push_healthy(self) -> bool:
+        """Whether the property changes can be received from the push stream instead of polling"""
+        if not self._protocol.push_connected:
+            return False
+        if self.status.active:
+            # Robot reports progress regularly while active, a silent stream means pushes are stopped
+            idle_time = self._protocol.push_idle_time
+            if idle_time is None or idle_time > self._push_idle_timeout:
+                return False
+        return True
 
     def _update_cleaning_mode(self, cleaning_mode) -> int:
         if self.capability.self_wash_base:
@@ -2163,6 +2513,7 @@ class DreameVacuumDevice:
                     else:
                         self.update_map()
 
+                self._restore_history()
                 if self.cloud_connected:
                     self._cleaning_history_update = -1
                     self._request_cleaning_history()
@@ -2185,6 +2536,8 @@ class DreameVacuumDevice:
 
             if not self._ready:
                 self._ready = True
+                self._reconcile_snapshot()
+                self._save_snapshot()
             else:
                 self._property_changed(False)
 
@@ -2212,12 +2565,18 @@ class DreameVacuumDevice:
         self.disconnected = True
         self.schedule_update(-1)
         self._protocol.disconnect()
+        if self._property_executor:
+            self._property_executor.shutdown(wait=False)
+            self._property_executor = None
+            self._property_executor_workers = 0
         if self._map_manager:
             self._map_manager.disconnect()
         self._property_changed(False)
+        self._dispatcher.stop()
 
     def listen(self, callback, property: DreameVacuumProperty = None) -> None:
         """Set callback functions for external listeners"""
+        self._property_routes = None
         if callback is None:
             self._update_callback = None
             self._property_update_callback = {}
@@ -2230,6 +2589,10 @@ class DreameVacuumDevice:
                 self._property_update_callback[property.value] = []
             self._property_update_callback[property.value].append(callback)
 
+    def set_client_session(self, client_session, loop, isolated_client_session=None) -> None:
+        """Set aiohttp client sessions and event loop for cloud requests"""
+        self._protocol.set_client_session(client_session, loop, isolated_client_session)
+
     def listen_error(self, callback) -> None:
         """Set error callback function for external listeners"""
         self._error_callback = callback
@@ -2926,8 +3289,16 @@ class DreameVacuumDevice:
         if not self.device_connected:
             raise DeviceUpdateFailedException("Device cannot be reached") from None
 
+        circuit = self._protocol.circuit
+        if circuit.open:
+            raise DeviceUpdateFailedException(
+                f"Device cannot be reached, retrying in {circuit.retry_in:.0f}s"
+            ) from None
+
         # self._update_running = True
 
+        self._update_poll_schedule()
+
         # Read-only properties
         properties = [
             DreameVacuumProperty.STATE,
@@ -2967,6 +3338,8 @@ class DreameVacuumDevice:
         if self.status.active:
             # Only changed when robot is active
             properties.extend([DreameVacuumProperty.CLEANED_AREA, DreameVacuumProperty.CLEANING_TIME])
+        status_count = len(properties)
+        settings_start = None
 
         if self._consumable_change:
             # Consumable properties
@@ -3009,8 +3382,9 @@ class DreameVacuumDevice:
                     ]
                 )
 
-        if now - self._last_settings_request > 9.5:
+        if now - self._last_settings_request >= self._poll_scheduler.period("settings", now) - 0.5:
             self._last_settings_request = now
+            settings_start = len(properties)
 
             if not self._consumable_change and self.status.washing:
                 properties.extend(
@@ -3040,6 +3414,7 @@ class DreameVacuumDevice:
                         DreameVacuumProperty.DND_END,
                     ]
                 )
+            settings_end = len(properties)
 
         if self._map_manager and not self.status.running and now - self._last_map_list_request > 60:
             properties.extend([DreameVacuumProperty.MAP_LIST, DreameVacuumProperty.RECOVERY_MAP_LIST])
@@ -3049,8 +3424,23 @@ class DreameVacuumDevice:
             if self._protocol.dreame_cloud and (not self.device_connected or not self.cloud_connected):
                 force_request_properties = True
 
-            if not self._protocol.dreame_cloud or force_request_properties:
+            push_mode = self._push_healthy()
+            if self._push_mode != push_mode:
+                self._push_mode = push_mode
+                _LOGGER.info("Property push %s", "available, polling paused" if push_mode else "unavailable, polling")
+
+            if (
+                not push_mode
+                or force_request_properties
+                or now - self._last_property_sweep >= self._push_sweep_interval
+            ):
+                self._last_property_sweep = now
+                previous = [self.data.get(prop.value) for prop in properties]
                 self._request_properties(properties)
+                changed = [self.data.get(prop.value) != previous[i] for i, prop in enumerate(properties)]
+                self._poll_scheduler.record("status", any(changed[:status_count]), now)
+                if settings_start is not None:
+                    self._poll_scheduler.record("settings", any(changed[settings_start:settings_end]), now)
             elif self.status.map_backup_status:
                 self._request_properties([DreameVacuumProperty.MAP_BACKUP_STATUS])
             elif self.status.map_recovery_status:
@@ -3072,11 +3462,12 @@ class DreameVacuumDevice:
                                 value,
                             )
                             self.data[k] = v.previous_value
+                            self._record_change(k)
                             if k in self._property_update_callback:
                                 for callback in self._property_update_callback[k]:
                                     callback(v.previous_value)
 
-                            self._property_changed(False)
+                            self._property_changed(False, True)
                             self.schedule_update(1, True)
                     del self._dirty_data[k]
 
@@ -6072,24 +6463,36 @@ class DreameVacuumDevice:
             return 5 if now - self._last_update_failed <= 60 else 10 if now - self._last_update_failed <= 300 else 30
         if now - self._last_change <= 60:
             return 3 if self.status.active or not self._protocol.prefer_cloud else 5
-        if self.status.active or self.status.started:
-            return 3 if self.status.running or not self._protocol.prefer_cloud else 5
-        if self._map_manager:
-            return min(self._map_update_interval, 5 if not self._protocol.prefer_cloud else 10)
-        return 5 if not self._protocol.prefer_cloud else 10
+        if self.status.running:
+            return 3
+        return self._poll_scheduler.period("status", now)
 
     @property
     def _map_update_interval(self) -> float:
         """Dynamic map update interval for the map manager."""
         if self._map_manager:
-            if self._protocol.dreame_cloud:
-                return 10 if self.status.active else 30
             now = time.time()
-            if now - self._last_map_request <= 120 or now - self._last_change <= 60:
+            if not self._protocol.dreame_cloud and now - self._last_map_request <= 120:
+                # Map is being viewed
                 return 2.5 if self.status.active or self.status.started else 5
-            return 3 if self.status.running else 10 if self.status.active else 30
+            return self._poll_scheduler.period("map", now)
         return -1
 
+    @property
+    def poll_schedule(self) -> dict[str, Any]:
+        """Current adaptive poll periods of the property groups."""
+        return self._poll_scheduler.schedule
+
+    @property
+    def connection_stats(self) -> dict[str, Any] | None:
+        """Connection reuse of the cloud sessions."""
+        return self._protocol.cloud.connection_stats if self._protocol.cloud else None
+
+    @property
+    def object_cache_stats(self) -> dict[str, Any] | None:
+        """Hit rate and usage of the cloud object cache."""
+        return self._map_manager.object_cache.stats if self._map_manager else None
+
     @property
     def name(self) -> str:
         """Return the name of the device."""
@@ -6119,6 +6522,9 @@ class DreameVacuumDeviceStatus:
 
     def __init__(self, device):
         self._device: DreameVacuumDevice = device
+        # Derived value name -> [data generation, dependency values, value]
+        self._memo: dict[str, list] = {}
+        self._go_to_zone: GoToZoneSettings = None
         self._cleaning_history = None
         self._cleaning_history_attrs = None
         self._last_cleaning_time = None
@@ -6182,7 +6588,6 @@ class DreameVacuumDeviceStatus:
         self.self_clean_time_default = 25
         self.self_clean_value = None
         self.ai_policy_accepted = False
-        self.go_to_zone: GoToZoneSettings = None
         self.cleanup_completed: bool = False
         self.cleanup_started: bool = False
 
@@ -6198,6 +6603,31 @@ class DreameVacuumDeviceStatus:
         """Helper function for accessing a property from device"""
         return self._device.get_property(prop)
 
+    def _memoize(self, name: str, compute, *depends) -> Any:
+        """Return a derived value computed once per data generation.
+        When dependency values are given, the value is also reused across generations while they are unchanged.
+        """
+        generation = self._device._data_generation
+        item = self._memo.get(name)
+        if item is not None:
+            if item[0] == generation:
+                return item[2]
+            if depends and item[1] == depends:
+                item[0] = generation
+                return item[2]
+        value = compute()
+        self._memo[name] = [generation, depends, value]
+        return value
+
+    @property
+    def go_to_zone(self) -> GoToZoneSettings | None:
+        return self._go_to_zone
+
+    @go_to_zone.setter
+    def go_to_zone(self, value: GoToZoneSettings | None) -> None:
+        self._go_to_zone = value
+        self._device._data_generation = self._device._data_generation + 1
+
     @property
     def _capability(self) -> DreameVacuumDeviceCapability:
         """Helper property for accessing device capabilities"""
@@ -6289,6 +6719,16 @@ class DreameVacuumDeviceStatus:
     @property
     def status(self) -> DreameVacuumStatus:
         """Return status of the device."""
+        return self._memoize(
+            "status",
+            self._compute_status,
+            self._get_property(DreameVacuumProperty.STATUS),
+            self._get_property(DreameVacuumProperty.CHARGING_STATUS),
+            self._get_property(DreameVacuumProperty.BATTERY_LEVEL),
+            bool(self._go_to_zone),
+        )
+
+    def _compute_status(self) -> DreameVacuumStatus:
         value = self._get_property(DreameVacuumProperty.STATUS)
         if value is not None and value in DreameVacuumStatus._value2member_map_:
             if self.go_to_zone and value == DreameVacuumStatus.ZONE_CLEANING.value:
@@ -6308,6 +6748,14 @@ class DreameVacuumDeviceStatus:
     @property
     def task_status(self) -> DreameVacuumTaskStatus:
         """Return task status of the device."""
+        return self._memoize(
+            "task_status",
+            self._compute_task_status,
+            self._get_property(DreameVacuumProperty.TASK_STATUS),
+            bool(self._go_to_zone),
+        )
+
+    def _compute_task_status(self) -> DreameVacuumTaskStatus:
         value = self._get_property(DreameVacuumProperty.TASK_STATUS)
         if value is not None and value in DreameVacuumTaskStatus._value2member_map_:
             if self.go_to_zone:
@@ -6328,6 +6776,9 @@ class DreameVacuumDeviceStatus:
     @property
     def water_tank(self) -> DreameVacuumWaterTank:
         """Return water tank of the device."""
+        return self._memoize("water_tank", self._compute_water_tank)
+
+    def _compute_water_tank(self) -> DreameVacuumWaterTank:
         value = self._get_property(DreameVacuumProperty.WATER_TANK)
         if value is not None:
             if value == 3:
@@ -6474,6 +6925,9 @@ class DreameVacuumDeviceStatus:
     @property
     def state(self) -> DreameVacuumState:
         """Return state of the device."""
+        return self._memoize("state", self._compute_state)
+
+    def _compute_state(self) -> DreameVacuumState:
         value = self._get_property(DreameVacuumProperty.STATE)
         if (
             value is not None
@@ -8216,6 +8670,9 @@ class DreameVacuumDeviceStatus:
     @property
     def segments(self) -> dict[int, Segment] | None:
         """Return the segments of selected map"""
+        return self._memoize("segments", self._compute_segments)
+
+    def _compute_segments(self) -> dict[int, Segment] | None:
         current_map = self.selected_map
         if current_map and current_map.segments and not current_map.empty_map:
             return current_map.segments
@@ -8224,6 +8681,9 @@ class DreameVacuumDeviceStatus:
     @property
     def current_room(self) -> Segment | None:
         """Return the segment that device is currently on"""
+        return self._memoize("current_room", self._compute_current_room)
+
+    def _compute_current_room(self) -> Segment | None:
         if self._capability.lidar_navigation:
             current_map = self.current_map
             if current_map and current_map.segments and current_map.robot_segment and not current_map.empty_map:
@@ -8302,6 +8762,31 @@ class DreameVacuumDeviceStatus:
     @property
     def attributes(self) -> dict[str, Any] | None:
         """Return the attributes of the device."""
+        return self._memoize("attributes", self._compute_attributes)
+
+    def _compute_attributes(self) -> dict[str, Any] | None:
+        attributes = self._build_attributes()
+        item = self._memo.get("attributes")
+        # Previous attributes are kept when they are unchanged so state writes can compare them by identity
+        if item is not None and item[2] == attributes:
+            return item[2]
+        return attributes
+
+    def _room_attributes(self) -> dict[str, list[dict[str, Any]]]:
+        """Rooms of the saved maps, built again only when a map name or its segments are changed"""
+        map_data_list = self.map_data_list
+        return self._memoize(
+            "room_attributes",
+            lambda: {
+                v.map_name: [
+                    {ATTR_ID: j, ATTR_NAME: s.name, ATTR_ICON: s.icon} for (j, s) in sorted(v.segments.items())
+                ]
+                for v in map_data_list.values()
+            },
+            tuple((v.map_name, v.fingerprint(MapData.SEGMENTS)) for v in map_data_list.values()),
+        )
+
+    def _build_attributes(self) -> dict[str, Any] | None:
         properties = [
             DreameVacuumProperty.STATUS,
             DreameVacuumProperty.CLEANING_MODE,
@@ -8877,11 +9362,7 @@ class DreameVacuumDeviceStatus:
             attributes[ATTR_SELECTED_MAP] = self.selected_map.map_name if self.selected_map else None
             attributes[ATTR_SELECTED_MAP_ID] = self.selected_map.map_id if self.selected_map else None
             attributes[ATTR_SELECTED_MAP_INDEX] = self.current_map.map_index if self.current_map else None
-            attributes[ATTR_ROOMS] = {}
-            for k, v in self.map_data_list.items():
-                attributes[ATTR_ROOMS][v.map_name] = [
-                    {ATTR_ID: j, ATTR_NAME: s.name, ATTR_ICON: s.icon} for (j, s) in sorted(v.segments.items())
-                ]
+            attributes[ATTR_ROOMS] = self._room_attributes()
 
         if self._capability.carpet_recognition:
             attributes[ATTR_CARPET_AVOIDANCE] = self.carpet_avoidance
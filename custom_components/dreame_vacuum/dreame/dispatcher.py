@@ -0,0 +1,99 @@
+"""
+Batched change notifications for the device listener.
+
+Property, map and device info changes are gathered within a short window
+and delivered to the listener from a single long lived thread, so a burst
+of changes results in one listener call instead of a timer thread per
+change.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+import logging
+from threading import Condition, Thread, current_thread
+import time
+from typing import Final
+
+_LOGGER = logging.getLogger(__name__)
+
+CHANGE_PROPERTY: Final = "property"
+CHANGE_MAP: Final = "map"
+CHANGE_INFO: Final = "info"
+
+
+@dataclass
+class DreameVacuumChanges:
+    types: set[str] = field(default_factory=set)
+    properties: set[int] | None = None  # None when the changes are not tracked and everything needs to be refreshed
+
+
+class DreameVacuumDispatcher:
+    """Coalesces change notifications and hands them to the listener in batches"""
+
+    def __init__(self, callback, window: float = 0.1) -> None:
+        self._callback = callback
+        self._window = window  # Debounce window started by the first notification of a batch
+        self._condition = Condition()
+        self._thread: Thread = None
+        self._pending: bool = False
+        self._flush: bool = False
+        self._deadline: float = 0
+        self._types: set[str] = set()
+        self._properties: set[int] = set()
+        self._all: bool = True
+
+    def record(self, did: int) -> None:
+        """Track a changed property for the next batch"""
+        with self._condition:
+            self._properties.add(did)
+
+    def notify(self, change_type: str = CHANGE_PROPERTY, delay: bool = True, partial: bool = False) -> None:
+        """Queue a change notification, partial notifications only carry the recorded properties"""
+        with self._condition:
+            self._types.add(change_type)
+            if not partial:
+                self._all = True
+            if not self._pending:
+                self._pending = True
+                self._deadline = time.monotonic() + self._window
+            if not delay:
+                self._flush = True
+            if self._thread is None:
+                self._thread = Thread(target=self._dispatch_task, daemon=True)
+                self._thread.start()
+            self._condition.notify()
+
+    def stop(self) -> None:
+        """Deliver the pending changes and stop the dispatcher thread"""
+        with self._condition:
+            self._thread = None
+            self._flush = True
+            self._condition.notify()
+
+    def _dispatch_task(self) -> None:
+        thread = current_thread()
+        while True:
+            with self._condition:
+                while self._thread is thread and not (
+                    self._pending and (self._flush or time.monotonic() >= self._deadline)
+                ):
+                    self._condition.wait(max(self._deadline - time.monotonic(), 0) if self._pending else None)
+                # Stopped or replaced by a new dispatcher thread
+                stopped = self._thread is not thread
+                changes = None
+                if self._pending:
+                    changes = DreameVacuumChanges(self._types, None if self._all else self._properties)
+                    self._types = set()
+                    self._properties = set()
+                    self._all = False
+                    self._pending = False
+                    self._flush = False
+
+            if changes is not None:
+                try:
+                    self._callback(changes)
+                except Exception as ex:
+                    _LOGGER.warning("Change listener failed: %s", ex)
+            if stopped:
+                return
@@ -0,0 +1,116 @@
+"""
+Local store for cleaning and cruising history events.
+
+History is generated from status events uploaded by the device to the cloud.
+Raw event payloads are kept per device keyed by their task start timestamp
+and persisted to disk, so after a restart the history is available before the
+cloud is queried and only the events newer than the latest stored one need to
+be requested. History objects are only created when the history is read.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+import json
+import logging
+import os
+from threading import Lock
+from typing import Any, Final
+
+_LOGGER = logging.getLogger(__name__)
+
+HISTORY_STORE_VERSION: Final = 1
+# Page size of the incremental requests, a full page falls back to requesting the whole history window
+HISTORY_SYNC_LIMIT: Final = 5
+
+
+class DreameVacuumHistoryStore:
+    """Append only history event store with lazily created history objects"""
+
+    def __init__(self, path: str | None = None, max_items: int = 50) -> None:
+        self._path = path
+        self._max_items = max_items
+        self._lock = Lock()
+        # Task start timestamp -> raw event payload
+        self._events: dict[int, str] = {}
+        # Task start timestamp -> history object created from the payload
+        self._objects: dict[int, Any] = {}
+        self._loaded: bool = False
+
+    @property
+    def latest(self) -> int | None:
+        """Start timestamp of the newest stored event"""
+        self.load()
+        with self._lock:
+            return max(self._events) if self._events else None
+
+    def load(self) -> None:
+        """Read the persisted events once"""
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            self._loaded = True
+            if not self._path:
+                return
+            try:
+                with open(self._path, encoding="utf-8") as file:
+                    data = json.load(file)
+                if data.get("version") == HISTORY_STORE_VERSION:
+                    self._events = {int(k): v for k, v in data.get("events", {}).items()}
+                    _LOGGER.debug("Loaded %d history events from %s", len(self._events), self._path)
+            except (OSError, ValueError, AttributeError):
+                pass
+
+    def add(self, events: dict[int, str]) -> bool:
+        """Merge new or updated events, returns whether the store has changed"""
+        self.load()
+        changed = False
+        with self._lock:
+            for key, payload in events.items():
+                if self._events.get(key) != payload:
+                    self._events[key] = payload
+                    self._objects.pop(key, None)
+                    changed = True
+            if len(self._events) > self._max_items:
+                for key in sorted(self._events)[: len(self._events) - self._max_items]:
+                    del self._events[key]
+                    self._objects.pop(key, None)
+        if changed:
+            self._save()
+        return changed
+
+    def history(self, factory: Callable[[str], Any], limit: int | None = None) -> list[Any]:
+        """Newest first history objects, objects are only created for the events that are read for the first time"""
+        self.load()
+        with self._lock:
+            keys = sorted(self._events, reverse=True)
+            if limit is not None:
+                keys = keys[:limit]
+            items = []
+            for key in keys:
+                item = self._objects.get(key)
+                if item is None:
+                    try:
+                        item = factory(self._events[key])
+                    except Exception as ex:
+                        _LOGGER.debug("Invalid history event %s: %s", key, ex)
+                        continue
+                    self._objects[key] = item
+                items.append(item)
+            return items
+
+    def _save(self) -> None:
+        if not self._path:
+            return
+        with self._lock:
+            data = {"version": HISTORY_STORE_VERSION, "events": {str(k): v for k, v in self._events.items()}}
+        try:
+            os.makedirs(os.path.dirname(self._path), exist_ok=True)
+            temp_path = f"{self._path}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as file:
+                json.dump(data, file, separators=(",", ":"))
+            os.replace(temp_path, self._path)
+        except OSError as ex:
+            _LOGGER.debug("History cannot be stored: %s", ex)
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import base64
+import binascii
 import copy
 from functools import cmp_to_key
 import hashlib
@@ -9,9 +10,9 @@ from io import BytesIO
 import json
 import logging
 import math
-import re
+from queue import Empty, Queue
 import textwrap
-from threading import Timer
+from threading import Lock, Thread, Timer
 import time
 from time import sleep
 import traceback
@@ -33,6 +34,7 @@ from PIL import (
 )
 from py_mini_racer import MiniRacer
 
+from .cache import DreameVacuumObjectCache
 from .const import (
     MAP_DATA_JSON_CLASS,
     MAP_DATA_JSON_PARAMETER_ACTIVE,
@@ -90,7 +92,7 @@ from .const import (
     MAP_REQUEST_PARAMETER_TYPE,
 )
 from .exceptions import DeviceUpdateFailedException
-from .protocol import DreameVacuumProtocol
+from .protocol import DreameVacuumProtocol, DreameVacuumRateLimiter
 from .resources import *
 from .types import (
     DIID,
@@ -128,7 +130,7 @@ from .types import (
     Obstacle,
     ObstacleIgnoreStatus,
     ObstacleType,
-    Path,
+    PathList,
     Paths,
     PathType,
     Point,
@@ -146,7 +148,7 @@ _LOGGER = logging.getLogger(__name__)
 
 
 class DreameMapVacuumMapManager:
-    def __init__(self, _protocol: DreameVacuumProtocol) -> None:
+    def __init__(self, _protocol: DreameVacuumProtocol, cache_path: str | None = None) -> None:
         self._map_list_object_name: str = None
         self._map_list_md5: str = None
         self._recovery_map_list_object_name: str = None
@@ -156,6 +158,7 @@ class DreameMapVacuumMapManager:
         self._update_timer: Timer = None
         self._update_running: bool = False
         self._update_interval: float = 10
+        self._retry_update: bool = False  # Map was not available on last update, retry without waiting the interval
         self._device_running: bool = False
         self._device_docked: bool = False
         self._available: bool = False
@@ -167,6 +170,17 @@ class DreameMapVacuumMapManager:
         self._init_data()
 
         self._protocol = _protocol
+        # Cloud objects are immutable, keep them across map resets
+        self.object_cache = DreameVacuumObjectCache(cache_path)
+        # Background history map prefetching, only runs while device is idle
+        self._prefetch_queue: Queue = Queue()
+        self._prefetch_lock: Lock = Lock()
+        self._prefetch_workers: int = 0
+        self._prefetch_bytes: int = 0
+        self._prefetch_count: int = 6  # Most recent maps prefetched from each history list
+        self._prefetch_concurrency: int = 2
+        self._prefetch_max_bytes: int = 8 * 1024 * 1024
+        self._max_map_file_size: int = 32 * 1024 * 1024  # Map file downloads above this size are cancelled
         self.editor = DreameMapVacuumMapEditor(self)
         self.optimizer = DreameVacuumMapOptimizer()
 
@@ -250,13 +264,35 @@ class DreameMapVacuumMapManager:
             partial_map_data = []
             self._latest_map_data_time = map_data_result[0][MAP_PARAMETER_TIME] + 1
 
-            for data in map_data_result:
-                partial_map_data.append(
-                    self._decode_map_partial(
+            # Decode only the headers first, most of the frames in the result are already applied or belong to a previous map
+            headers = [
+                (
+                    DreameVacuumMapDecoder.decode_map_header(
                         json.loads(data[MAP_PARAMETER_VALUE if MAP_PARAMETER_VALUE in data else "val"])[0],
-                        data[MAP_PARAMETER_TIME] * 1000 if data.get(MAP_PARAMETER_TIME) else None,
-                    )
+                        self._aes_iv,
+                    ),
+                    data[MAP_PARAMETER_TIME] * 1000 if data.get(MAP_PARAMETER_TIME) else None,
                 )
+                for data in map_data_result
+            ]
+            # Results are sorted by time, newest frame holds the latest map id
+            latest_map_id = next((header.map_id for header, timestamp in headers if header is not None), None)
+            for partial_map, timestamp in headers:
+                if partial_map is None:
+                    continue
+
+                if self._stale_map_header(partial_map, latest_map_id):
+                    _LOGGER.debug(
+                        "Skip frame header %s, %s:%s",
+                        partial_map.frame_type,
+                        partial_map.map_id,
+                        partial_map.frame_id,
+                    )
+                    continue
+
+                partial_map = self._decode_map_body(partial_map, timestamp)
+                if partial_map is not None:
+                    partial_map_data.append(partial_map)
 
         object_name = None
         object_name_timestamp = None
@@ -274,6 +310,20 @@ class DreameMapVacuumMapManager:
         self._add_cloud_map_data(partial_map_data, object_name, object_name_timestamp)
         return len(map_data_result) or object_name is not None
 
+    def _stale_map_header(self, partial_map: MapDataPartial, latest_map_id: int | None) -> bool:
+        # I frames are always decoded because their timestamp is needed to detect the latest map
+        if partial_map.frame_type == MapFrameType.I.value:
+            return False
+
+        if latest_map_id is not None and partial_map.map_id != latest_map_id:
+            return True
+
+        return bool(
+            self._current_map_id == partial_map.map_id
+            and self._current_frame_id is not None
+            and partial_map.frame_id <= self._current_frame_id
+        )
+
     def _request_map(self, parameters: dict[str, Any] | None = None) -> dict[str, Any] | None:
         if parameters is None:
             parameters = {
@@ -467,8 +517,16 @@ class DreameMapVacuumMapManager:
             self._update_timer = None
 
         start = time.time()
-        self.update()
-        self.schedule_update(max(self._update_interval - (time.time() - start), 1))
+        with DreameVacuumRateLimiter.priority(DreameVacuumRateLimiter.MAP):
+            self.update()
+        wait = self._update_interval - (time.time() - start)
+        if self._retry_update:
+            self._retry_update = False
+            wait = min(wait, 1)
+        circuit = self._protocol.cloud.api_circuit
+        if circuit.open:
+            wait = min(wait, circuit.retry_in)
+        self.schedule_update(max(wait, 1))
 
     def _queue_partial_map(self, map_data) -> None:
         if map_data.map_id != self._latest_map_id:
@@ -600,8 +658,31 @@ class DreameMapVacuumMapManager:
                 url = self._file_urls[object_name][MAP_PARAMETER_URL]
         return url
 
+    def _get_map_file(self, object_name: str, interim: bool = True, key: str | None = None) -> bytes | None:
+        """Get decompressed contents of a map file, downloaded files are decoded while they are being received"""
+        response = self.object_cache.get(object_name, key)
+        if response is not None:
+            return DreameVacuumMapStreamDecoder(self._aes_iv, key, self._max_map_file_size).decode(response)
+
+        url = self._get_file_url(object_name, interim)
+        if url:
+            decoder = self._protocol.cloud.get_file_stream(
+                url,
+                lambda: DreameVacuumMapStreamDecoder(self._aes_iv, key, self._max_map_file_size, True),
+                self._max_map_file_size,
+            )
+            if decoder is not None:
+                raw_map = decoder.finish()
+                if raw_map:
+                    self.object_cache.set(object_name, bytes(decoder.source), key)
+                return raw_map
+        return None
+
     def _decode_map_partial(self, raw_map, timestamp=None, key=None) -> MapDataPartial | None:
-        partial_map = DreameVacuumMapDecoder.decode_map_partial(raw_map, self._aes_iv, key)
+        return self._decode_map_body(DreameVacuumMapDecoder.decode_map_header(raw_map, self._aes_iv, key), timestamp)
+
+    def _decode_map_body(self, partial_map: MapDataPartial | None, timestamp=None) -> MapDataPartial | None:
+        partial_map = DreameVacuumMapDecoder.decode_map_body(partial_map)
         if partial_map is not None:
             # After restart or unsuccessful start robot returns timestamp_ms as uptime and that messes up with the latest map/frame id detection.
             # I could not figure out how app handles with this issue but i have added this code to update time stamp as request/object time.
@@ -830,9 +911,9 @@ class DreameMapVacuumMapManager:
                     saved_map_data.recovery_map_list = self._saved_map_data[saved_map_data.map_id].recovery_map_list
 
                     saved_map_data.timestamp_ms = map_data.timestamp_ms
-                    if (
-                        saved_map_data != self._saved_map_data[saved_map_data.map_id]
-                        or saved_map_data.segments != self._saved_map_data[saved_map_data.map_id].segments
+                    if saved_map_data.changes(
+                        self._saved_map_data[saved_map_data.map_id],
+                        (MapData.GEOMETRY, MapData.SEGMENTS, MapData.SETTINGS),
                     ):
                         saved_map_data.last_updated = time.time()
                         if saved_map_data.wifi_map_data:
@@ -896,12 +977,8 @@ class DreameMapVacuumMapManager:
                     ):
                         map_data.robot_position = self._map_data.robot_position
 
-                changed = (
-                    self._current_frame_id is None
-                    or self._map_data is None
-                    or map_data != self._map_data
-                    or map_data.rotation != self._map_data.rotation
-                    or map_data.segments != self._map_data.segments
+                changed = self._current_frame_id is None or bool(
+                    map_data.changes(self._map_data, (MapData.GEOMETRY, MapData.SEGMENTS, MapData.SETTINGS))
                 )
 
                 if (
@@ -1038,7 +1115,11 @@ class DreameMapVacuumMapManager:
             timestamp = int(time.time() * 1000)
 
             if raw_map_data:
-                partial_map_data = [self._decode_map_partial(raw_map_data, timestamp)]
+                partial_map = DreameVacuumMapDecoder.decode_map_header(raw_map_data, self._aes_iv)
+                if partial_map is not None and not self._stale_map_header(partial_map, None):
+                    partial_map = self._decode_map_body(partial_map, timestamp)
+                    if partial_map is not None:
+                        partial_map_data = [partial_map]
             self._add_cloud_map_data(partial_map_data, object_name, timestamp)
 
     def get_map(self, map_index: int = 0) -> MapData | None:
@@ -1069,6 +1150,10 @@ class DreameMapVacuumMapManager:
                         "Obstacle image object name: %s",
                         object_name,
                     )
+                    image = self.object_cache.get(object_name, obstacle.key)
+                    if image:
+                        return (image, obstacle)
+
                     response = self._get_file_url(object_name, False)
                     if response:
                         response = self._protocol.cloud.get_file(response)
@@ -1084,16 +1169,15 @@ class DreameMapVacuumMapManager:
                             )
                             decryptor = cipher.decryptor()
                             unpadder = padding.PKCS7(128).unpadder()
-                            return (
-                                (
-                                    unpadder.update(
-                                        decryptor.update(base64.b64decode(response[response.find(",") + 1 :]))
-                                        + decryptor.finalize()
-                                    )
-                                    + unpadder.finalize()
-                                ),
-                                obstacle,
+                            image = (
+                                unpadder.update(
+                                    decryptor.update(base64.b64decode(response[response.find(",") + 1 :]))
+                                    + decryptor.finalize()
+                                )
+                                + unpadder.finalize()
                             )
+                            self.object_cache.set(object_name, image, obstacle.key)
+                            return (image, obstacle)
                 except:
                     _LOGGER.warning(
                         "Obstacle (%s) image decryption failed: %s",
@@ -1109,29 +1193,88 @@ class DreameMapVacuumMapManager:
                     "History map object name: %s",
                     object_name,
                 )
-                response = self._get_file_url(object_name, self._protocol.cloud.dreame_cloud)
-                if response:
-                    response = self._protocol.cloud.get_file(response)
-                    if response:
-                        map_data, saved_map_data = DreameVacuumMapDecoder.decode_map(
-                            response.decode(), self._vslam_map, None, self._aes_iv, key
-                        )
-                        if map_data:
-                            DreameVacuumMapDecoder.set_segment_cleanset(map_data, map_data.cleanset, self._capability)
-                            DreameVacuumMapDecoder.set_carpet_cleanset(
-                                map_data, map_data.carpet_cleanset, self._capability
-                            )
-                            map_data.history_map = True
-                            if map_data.need_optimization:
-                                map_data = self.optimizer.optimize(map_data, saved_map_data)
-                                map_data.need_optimization = False
-                            return map_data
+                map_data = self.object_cache.get_decoded(object_name, key)
+                if map_data is not None:
+                    return map_data
+
+                raw_map = self._get_map_file(object_name, self._protocol.cloud.dreame_cloud, key)
+                if raw_map:
+                    map_data, saved_map_data = DreameVacuumMapDecoder.decode_map_data_from_partial(
+                        DreameVacuumMapDecoder.decode_map_frame(raw_map), self._vslam_map, None
+                    )
+                    if map_data:
+                        DreameVacuumMapDecoder.set_segment_cleanset(map_data, map_data.cleanset, self._capability)
+                        DreameVacuumMapDecoder.set_carpet_cleanset(map_data, map_data.carpet_cleanset, self._capability)
+                        map_data.history_map = True
+                        if map_data.need_optimization:
+                            map_data = self.optimizer.optimize(map_data, saved_map_data)
+                            map_data.need_optimization = False
+                        self.object_cache.set_decoded(object_name, map_data, key)
+                        return map_data
             except Exception:
                 _LOGGER.warning(
                     "History map decoding failed: %s",
                     traceback.format_exc(),
                 )
 
+    def _prefetch_task(self) -> None:
+        with DreameVacuumRateLimiter.priority(DreameVacuumRateLimiter.BACKGROUND):
+            self._prefetch_queued_maps()
+
+        with self._prefetch_lock:
+            self._prefetch_workers = self._prefetch_workers - 1
+
+    def _prefetch_queued_maps(self) -> None:
+        while not self._disconnected:
+            try:
+                object_name, key = self._prefetch_queue.get(False)
+            except Empty:
+                break
+
+            # Wait for map update to complete so prefetching never competes with live map requests
+            while self._update_running and not self._disconnected:
+                sleep(0.5)
+
+            if self._disconnected or self._device_running or self._prefetch_bytes >= self._prefetch_max_bytes:
+                _LOGGER.debug("History map prefetch stopped")
+                with self._prefetch_queue.mutex:
+                    self._prefetch_queue.queue.clear()
+                break
+
+            try:
+                # Downloaded through the same streaming path as the history map requests so cache entries match
+                downloaded = not self.object_cache.contains(object_name, key)
+                self.get_history_map(object_name, key)
+                if downloaded:
+                    with self._prefetch_lock:
+                        self._prefetch_bytes = self._prefetch_bytes + self.object_cache.size(object_name, key)
+            except Exception:
+                _LOGGER.debug("History map prefetch failed: %s", traceback.format_exc())
+
+    def prefetch_history_maps(self, *histories: list[tuple[str, str | None]]) -> None:
+        """Download and decode most recent maps of each history list in background while device is idle"""
+        if self._disconnected or self._device_running or not any(histories):
+            return
+
+        pending = [
+            (object_name, key)
+            for items in histories
+            for object_name, key in items[: self._prefetch_count]
+            if object_name and not self.object_cache.contains(object_name, key, True)
+        ]
+        if not pending:
+            return
+
+        _LOGGER.debug("Prefetch %s history maps", len(pending))
+        with self._prefetch_lock:
+            if self._prefetch_workers == 0:
+                self._prefetch_bytes = 0
+            for item in pending:
+                self._prefetch_queue.put(item)
+            while self._prefetch_workers < min(self._prefetch_concurrency, len(pending)):
+                self._prefetch_workers = self._prefetch_workers + 1
+                Thread(target=self._prefetch_task, daemon=True).start()
+
     def get_recovery_map(self, map_id, index):
         if map_id in self._map_list:
             recovery_map_list = self._saved_map_data[map_id].recovery_map_list
@@ -1143,9 +1286,14 @@ class DreameMapVacuumMapManager:
                         and recovery_map_list[index].map_object_name is not None
                     ):
                         try:
-                            response = self._get_interim_file_data(recovery_map_list[index].map_object_name)
+                            object_name = recovery_map_list[index].map_object_name
+                            response = self.object_cache.get(object_name)
+                            if response is None:
+                                response = self._get_interim_file_data(object_name)
+                                if response:
+                                    self.object_cache.set(object_name, response)
                             if response:
-                                recovery_map_list[index].raw_map = response.decode()
+                                recovery_map_list[index].raw_map = response
                         except Exception as ex:
                             _LOGGER.warning("Get Recovery Map Object failed: %s", ex)
                             return None
@@ -1173,14 +1321,17 @@ class DreameMapVacuumMapManager:
                         "Recovery map object name: %s",
                         object_name,
                     )
-                    map_url = self._get_file_url(
-                        object_name,
-                        not (object_name.endswith("mb.tbz2") and not self._protocol.dreame_cloud),
-                    )
+                    interim = not (object_name.endswith("mb.tbz2") and not self._protocol.dreame_cloud)
+                    response = self.object_cache.get(object_name)
+                    map_url = self._get_file_url(object_name, interim)
                     _LOGGER.debug("Recovery map file url: %s = %s", object_name, map_url)
-                    if map_url:
+                    if response is None and map_url:
+                        response = self._protocol.cloud.get_file(map_url)
+                        if response:
+                            self.object_cache.set(object_name, response)
+                    if map_url or response is not None:
                         return (
-                            self._protocol.cloud.get_file(map_url),
+                            response,
                             map_url,
                             object_name,
                         )
@@ -1216,6 +1367,10 @@ class DreameMapVacuumMapManager:
         if self._update_running:
             return
 
+        if self._protocol.cloud.api_circuit.open:
+            # Cloud is not reachable, skip requests until the circuit allows a probe request
+            return
+
         self._update_running = True
 
         try:
@@ -1261,9 +1416,8 @@ class DreameMapVacuumMapManager:
                     if self._protocol.cloud.logged_in:
                         self._request_current_map()
                 elif not self._request_map_from_cloud() and self._device_running:
-                    sleep(1)
-                    if not self._request_map_from_cloud():
-                        self.schedule_update(1)
+                    # Map is not uploaded yet, retry shortly without blocking the update thread
+                    self._retry_update = True
             elif self._protocol.cloud.connected:
                 if not self._connected:
                     self._connected = True
@@ -1430,7 +1584,7 @@ class DreameMapVacuumMapManager:
                             try:
                                 response = self._get_interim_file_data(v["rismobj"])
                                 if response:
-                                    raw_map = response.decode()
+                                    raw_map = response
                             except Exception as ex:
                                 _LOGGER.warning("Get Saved Map Object failed: %s", ex)
                                 return
@@ -1640,6 +1794,10 @@ class DreameMapVacuumMapEditor:
             self.map_manager._map_data_updated()
 
     def refresh_map(self, map_id: int | None = None) -> None:
+        # Editor methods modify the map data in place, cached fingerprints are no longer valid
+        map_data = self._map_data if not map_id else (self._saved_map_data or {}).get(map_id)
+        if map_data is not None:
+            map_data.changed()
         timer = Timer(0.5, self._refresh_map, [map_id])
         timer.start()
 
@@ -2006,7 +2164,7 @@ class DreameMapVacuumMapEditor:
                 DreameVacuumMapDecoder.set_floor_material(map_data, self.map_manager._capability)
                 for k, v in map_data.segments.items():
                     if segments[1] in v.neighbors:
-                        map_data.segments[k].neighbors.remove(segments[1])
+                        map_data.segments[k].neighbors = [n for n in v.neighbors if n != segments[1]]
 
                 DreameVacuumMapDecoder.set_segment_color_index(map_data)
                 if self._map_data and map_id == self._selected_map_id:
@@ -2075,7 +2233,7 @@ class DreameMapVacuumMapEditor:
                 try:
                     response = self._get_interim_file_data(recovery_map_info.map_object_name)
                     if response:
-                        recovery_map_info.raw_map = response.decode()
+                        recovery_map_info.raw_map = response
                 except Exception as ex:
                     _LOGGER.warning("Get Recovery Map Object failed: %s", ex)
                     return
@@ -2666,8 +2824,119 @@ class DreameMapVacuumMapEditor:
         return self.map_manager._current_timestamp_ms
 
 
+class DreameVacuumMapStreamDecoder:
+    """Incremental base64 -> AES-CBC -> zlib decoder for map files"""
+
+    CHUNK_SIZE = 65536
+    # Url safe base64 characters are converted to the standard alphabet, whitespace is dropped
+    _BASE64_TABLE = bytes.maketrans(b"_-", b"/+")
+    _BASE64_IGNORED = b"\r\n\t "
+
+    def __init__(
+        self, iv: str | None = None, key: str | None = None, max_size: int | None = None, keep_source: bool = False
+    ) -> None:
+        self._iv = iv
+        self._key = key
+        self._max_size = max_size
+        self._pending = b""  # Base64 characters that are not aligned to a full quantum yet
+        self._trailer = None  # Characters after the separator, contains the key when it is not provided
+        # Decoded data is buffered until the end when key is not known, it may be sent after the map data
+        self._buffer = bytearray() if key is None else None
+        self._decryptor = self._create_decryptor(key) if key is not None else None
+        self._decompressor = zlib.decompressobj()
+        self._output = bytearray()
+        self.size = 0
+        self.source = bytearray() if keep_source else None
+
+    def _create_decryptor(self, key: str):
+        try:
+            return Cipher(
+                algorithms.AES(hashlib.sha256(key.encode()).hexdigest()[0:32].encode("utf8")),
+                modes.CBC((self._iv if self._iv else "").encode("utf8")),
+                backend=default_backend(),
+            ).decryptor()
+        except Exception as ex:
+            raise ValueError(f"Map data decryption failed: {ex}") from None
+
+    def _decompress(self, data: bytes) -> None:
+        if data:
+            self._output += self._decompressor.decompress(data)
+            if self._max_size and len(self._output) > self._max_size:
+                raise ValueError("Map data exceeds size limit")
+
+    def _feed(self, data: bytes) -> None:
+        if self._buffer is not None:
+            self._buffer += data
+        elif self._decryptor is not None:
+            self._decompress(self._decryptor.update(data))
+        else:
+            self._decompress(data)
+
+    def update(self, chunk: bytes) -> None:
+        chunk = bytes(chunk)
+        self.size = self.size + len(chunk)
+        if self._max_size and self.size > self._max_size:
+            raise ValueError("Map file exceeds size limit")
+        if self.source is not None:
+            self.source += chunk
+
+        if self._trailer is not None:
+            self._trailer += chunk
+            return
+
+        index = chunk.find(b",")
+        if index != -1:
+            self._trailer = bytearray(chunk[index + 1 :])
+            chunk = chunk[:index]
+
+        data = self._pending + chunk.translate(
+            DreameVacuumMapStreamDecoder._BASE64_TABLE, DreameVacuumMapStreamDecoder._BASE64_IGNORED
+        )
+        length = len(data) - len(data) % 4
+        self._pending = data[length:]
+        if length:
+            self._feed(binascii.a2b_base64(data[:length]))
+
+    def finish(self) -> bytes:
+        """Flush the decoders and return decompressed map data"""
+        if self._pending:
+            self._feed(binascii.a2b_base64(self._pending + b"=" * (-len(self._pending) % 4)))
+            self._pending = b""
+
+        if self._buffer is not None:
+            data = bytes(self._buffer)
+            self._buffer = None
+            if self._trailer:
+                self._decryptor = self._create_decryptor(self._trailer.split(b",")[0].decode("utf8").strip())
+            self._feed(data)
+
+        if self._decryptor is not None:
+            self._decompress(self._decryptor.finalize())
+            self._decryptor = None
+        self._output += self._decompressor.flush()
+        return bytes(self._output)
+
+    def decode(self, data: bytes | str) -> bytes:
+        """Decode a complete map file in chunks"""
+        if isinstance(data, str):
+            data = data.encode("utf8")
+        view = memoryview(data)
+        for i in range(0, len(view), DreameVacuumMapStreamDecoder.CHUNK_SIZE):
+            self.update(view[i : i + DreameVacuumMapStreamDecoder.CHUNK_SIZE])
+        return self.finish()
+
+
 class DreameVacuumMapDecoder:
     HEADER_SIZE = 27
+    # Data json sections that are only decoded with P frames when they are changed since the last applied frame
+    P_FRAME_SECTIONS = (
+        "ai_obstacle",
+        "carpet_polygon",
+        "carpet_info",
+        "sneak_areas",
+        "sneak_areas_end",
+        "pointinfo",
+    )
 
     @staticmethod
     def _read_int_8(data: bytes, offset: int = 0) -> int:
@@ -2807,7 +3076,8 @@ class DreameVacuumMapDecoder:
         return None
 
     @staticmethod
-    def decode_map_partial(raw_data, iv=None, key=None) -> MapDataPartial | None:
+    def decode_map_header(raw_data, iv=None, key=None) -> MapDataPartial | None:
+        """Decode only the header of a map frame, frame is decompressed and parsed with decode_map_body"""
         _LOGGER.debug("raw_map: %s", raw_data)
         raw_map = raw_data.replace("_", "/").replace("-", "+")
 
@@ -2839,18 +3109,55 @@ class DreameVacuumMapDecoder:
                 return None
 
         try:
-            raw_map = zlib.decompress(raw_map)
-            if not raw_map or len(raw_map) < DreameVacuumMapDecoder.HEADER_SIZE:
+            # Only decompress the header, rest of the frame may never be needed
+            header = zlib.decompressobj().decompress(raw_map, DreameVacuumMapDecoder.HEADER_SIZE)
+            if not header or len(header) < DreameVacuumMapDecoder.HEADER_SIZE:
                 _LOGGER.error("Wrong header size for map")
                 return None
         except Exception as ex:
             _LOGGER.error("Map data decompression failed: %s\n%s", ex, raw_data)
             return None
 
+        partial_map = MapDataPartial()
+        partial_map.map_id = DreameVacuumMapDecoder._read_int_16_le(header)
+        partial_map.frame_id = DreameVacuumMapDecoder._read_int_16_le(header, 2)
+        partial_map.frame_type = DreameVacuumMapDecoder._read_int_8(header, 4)
+        partial_map.compressed = raw_map
+        return partial_map
+
+    @staticmethod
+    def decode_map_body(partial_map: MapDataPartial | None) -> MapDataPartial | None:
+        """Decompress the frame decoded with decode_map_header and parse its data json"""
+        if partial_map is None or partial_map.compressed is None:
+            return partial_map
+
+        try:
+            raw_map = zlib.decompress(partial_map.compressed)
+            partial_map.compressed = None
+            if not raw_map or len(raw_map) < DreameVacuumMapDecoder.HEADER_SIZE:
+                _LOGGER.error("Wrong header size for map")
+                return None
+        except Exception as ex:
+            _LOGGER.error("Map data decompression failed: %s", ex)
+            return None
+
+        return DreameVacuumMapDecoder._decode_data_json(partial_map, raw_map)
+
+    @staticmethod
+    def decode_map_frame(raw_map: bytes) -> MapDataPartial | None:
+        """Parse a map frame that is already decompressed by DreameVacuumMapStreamDecoder"""
+        if not raw_map or len(raw_map) < DreameVacuumMapDecoder.HEADER_SIZE:
+            _LOGGER.error("Wrong header size for map")
+            return None
+
         partial_map = MapDataPartial()
         partial_map.map_id = DreameVacuumMapDecoder._read_int_16_le(raw_map)
         partial_map.frame_id = DreameVacuumMapDecoder._read_int_16_le(raw_map, 2)
         partial_map.frame_type = DreameVacuumMapDecoder._read_int_8(raw_map, 4)
+        return DreameVacuumMapDecoder._decode_data_json(partial_map, raw_map)
+
+    @staticmethod
+    def _decode_data_json(partial_map: MapDataPartial, raw_map: bytes) -> MapDataPartial:
         partial_map.raw = raw_map
         image_size = DreameVacuumMapDecoder.HEADER_SIZE + (
             DreameVacuumMapDecoder._read_int_16_le(raw_map, 19) * DreameVacuumMapDecoder._read_int_16_le(raw_map, 21)
@@ -2866,9 +3173,21 @@ class DreameVacuumMapDecoder:
                 pass
         return partial_map
 
+    @staticmethod
+    def decode_map_partial(raw_data, iv=None, key=None) -> MapDataPartial | None:
+        if isinstance(raw_data, (bytes, bytearray)):
+            # Downloaded files are decoded in chunks instead of creating decoded copies of the whole file
+            try:
+                raw_map = DreameVacuumMapStreamDecoder(iv, key).decode(raw_data)
+            except Exception as ex:
+                _LOGGER.error("Map data decoding failed: %s", ex)
+                return None
+            return DreameVacuumMapDecoder.decode_map_frame(raw_map)
+        return DreameVacuumMapDecoder.decode_map_body(DreameVacuumMapDecoder.decode_map_header(raw_data, iv, key))
+
     @staticmethod
     def decode_map(
-        raw_map: str,
+        raw_map: str | bytes,
         vslam_map: bool,
         rotation: int = 0,
         iv: str | None = None,
@@ -2881,14 +3200,23 @@ class DreameVacuumMapDecoder:
         )
 
     @staticmethod
-    def decode_saved_map(raw_map: str, vslam_map: bool, rotation: int = 0, iv: str | None = None) -> MapData | None:
+    def decode_saved_map(
+        raw_map: str | bytes, vslam_map: bool, rotation: int = 0, iv: str | None = None
+    ) -> MapData | None:
         return DreameVacuumMapDecoder.decode_map(raw_map, vslam_map, rotation, iv)[0]
 
     @staticmethod
-    def decode_map_data_from_partial(partial_map: MapDataPartial, vslam_map: bool, rotation: int = 0) -> MapData | None:
+    def decode_map_data_from_partial(
+        partial_map: MapDataPartial, vslam_map: bool, rotation: int = 0, current_map_data: MapData | None = None
+    ) -> MapData | None:
         if partial_map is None:
             return None
 
+        # When current map data is provided frame will be merged into it as a P frame, so sections that are not merged
+        # or not changed since the last applied frame are not decoded. Saved map changes are applied with the I frames.
+        p_frame = current_map_data is not None
+        fragments = (current_map_data.data_json_fragments if p_frame else None) or {}
+
         map_data = MapData()
         map_data.map_id = partial_map.map_id
         map_data.frame_id = partial_map.frame_id
@@ -2920,6 +3248,14 @@ class DreameVacuumMapDecoder:
 
         _LOGGER.debug("Map Data Json: %s", data_json)
 
+        def section_hash(key: str) -> int:
+            return hash(json.dumps(data_json[key], sort_keys=True, separators=(",", ":")))
+
+        section_hashes = {key: section_hash(key) for key in DreameVacuumMapDecoder.P_FRAME_SECTIONS if key in data_json}
+
+        def section_changed(key: str) -> bool:
+            return not p_frame or section_hashes.get(key) != fragments.get(key)
+
         saved_map_data = None
         try:
             if "origin" in data_json and data_json["origin"] and len(data_json["origin"]) > 1:
@@ -3001,31 +3337,9 @@ class DreameVacuumMapDecoder:
                     map_data.index = 0
 
                 if data_json.get("tr"):
-                    matches = [
-                        m.groupdict()
-                        for m in re.compile(r"(?P<operator>[MWSLl])(?P<x>-?\d+),(?P<y>-?\d+)").finditer(data_json["tr"])
-                    ]
-                    current_position = Point(0, 0)
-                    map_data.path = []
-                    for match in matches:
-                        operator = match["operator"]
-                        x = int(match["x"])
-                        y = int(match["y"])
-
-                        if operator == "L":
-                            current_position = Path(
-                                current_position.x + x,
-                                current_position.y + y,
-                                PathType.LINE,
-                            )
-                        else:
-                            # You will only get "l" paths with in a P frame.
-                            # It means path is connected with the path from previous frame and it should be rendered as a line.
-                            if operator == "l":
-                                operator = "L"
-                            current_position = Path(x, y, PathType(operator))
-
-                        map_data.path.append(current_position)
+                    # You will only get "l" paths with in a P frame.
+                    # It means path is connected with the path from previous frame and it should be rendered as a line.
+                    map_data.path = PathList.parse(data_json["tr"])
 
                 if data_json.get("sa") and isinstance(data_json["sa"], list):
                     map_data.active_segments = [sa[0] for sa in data_json["sa"]]
@@ -3217,7 +3531,7 @@ class DreameVacuumMapDecoder:
             saved_map_data = None
             restored_map = map_data.restored_map
 
-            if "whmp" in data_json:
+            if "whmp" in data_json and not p_frame:
                 router_position = data_json["whmp"]
                 if router_position and len(router_position) > 1:
                     map_data.router_position = Point(
@@ -3226,14 +3540,14 @@ class DreameVacuumMapDecoder:
                     )
 
             wifi_map = data_json.get("whm")
-            if map_data.saved_map and wifi_map and len(wifi_map) > 1:
+            if map_data.saved_map and wifi_map and len(wifi_map) > 1 and not p_frame:
                 wifi_map_data = DreameVacuumMapDecoder.decode_saved_map(data_json["whm"], False, map_data.rotation)
                 if wifi_map_data:
                     map_data.wifi_map_data = wifi_map_data
                     if map_data.wifi_map_data.router_position is None:
                         map_data.wifi_map_data.router_position = map_data.router_position
 
-            if "rism" in data_json:
+            if "rism" in data_json and not p_frame:
                 _LOGGER.debug("Decoding saved map: %s", map_data.map_id)
                 saved_map_data = DreameVacuumMapDecoder.decode_saved_map(
                     data_json["rism"],
@@ -3425,7 +3739,7 @@ class DreameVacuumMapDecoder:
                 if map_data.saved_map or next(iter(map_data.segments.values())).color_index is None:
                     DreameVacuumMapDecoder.set_segment_color_index(map_data)
 
-            if "funiture_info" in data_json:
+            if "funiture_info" in data_json and not p_frame:
                 map_data.furniture_version = 1
                 map_data.saved_furnitures = {}
                 index = 0
@@ -3456,7 +3770,7 @@ class DreameVacuumMapDecoder:
                         else:
                             pass
 
-            if map_data.furnitures is None:
+            if map_data.furnitures is None and not p_frame:
                 furniture_key = (
                     "ai_furniture_user"
                     if "ai_furniture_user" in data_json and len(data_json["ai_furniture_user"])
@@ -3512,7 +3826,7 @@ class DreameVacuumMapDecoder:
                                     scale,
                                 )
 
-            if "ai_obstacle" in data_json:
+            if "ai_obstacle" in data_json and section_changed("ai_obstacle"):
                 map_data.obstacles = {}
                 index = 1
                 for obstacle in data_json["ai_obstacle"]:
@@ -3572,13 +3886,14 @@ class DreameVacuumMapDecoder:
                                     ObstacleType(obstacle_type),
                                     possibility,
                                 )
+                            # Obstacles of a P frame are located on the segments after merged into current map data
                             if map_data.segments:
                                 map_data.obstacles[str(index)].set_segment(map_data)
                             index = index + 1
                         else:
                             pass
 
-            if "vw" in data_json:
+            if "vw" in data_json and not p_frame:
                 virtual_walls = data_json["vw"]
                 if virtual_walls.get("rect") and not map_data.no_go_areas:
                     map_data.no_go_areas = []
@@ -3665,7 +3980,7 @@ class DreameVacuumMapDecoder:
                             )
                         )
 
-            if "vws" in data_json:
+            if "vws" in data_json and not p_frame:
                 virtual_thresholds = data_json["vws"]
                 if "vwsl" in virtual_thresholds and not map_data.virtual_thresholds:
                     map_data.virtual_thresholds = []
@@ -3726,7 +4041,7 @@ class DreameVacuumMapDecoder:
                 #            )
                 #        )
 
-            if "ct" in data_json:
+            if "ct" in data_json and not p_frame:
                 curtains = data_json["ct"]
                 if isinstance(curtains, dict) and "line" in curtains and not map_data.curtains:
                     map_data.curtains = []
@@ -3740,7 +4055,12 @@ class DreameVacuumMapDecoder:
                             )
                         )
 
-            if "carpet_polygon" in data_json and len(data_json["carpet_polygon"]) and not map_data.detected_carpets:
+            if (
+                "carpet_polygon" in data_json
+                and len(data_json["carpet_polygon"])
+                and not map_data.detected_carpets
+                and section_changed("carpet_polygon")
+            ):
                 map_data.detected_carpets = []
                 for carpet_id in data_json["carpet_polygon"]:
                     carpet = data_json["carpet_polygon"][carpet_id]
@@ -3776,7 +4096,7 @@ class DreameVacuumMapDecoder:
                             )
                         )
 
-            if "carpet_info" in data_json and not map_data.detected_carpets:
+            if "carpet_info" in data_json and not map_data.detected_carpets and section_changed("carpet_info"):
                 map_data.detected_carpets = []
                 for carpet_id in data_json["carpet_info"]:
                     carpet = data_json["carpet_info"][carpet_id]
@@ -3798,7 +4118,11 @@ class DreameVacuumMapDecoder:
                         )
                     )
 
-            if ("sneak_areas_end" in data_json or "sneak_areas" in data_json) and not map_data.low_lying_areas:
+            if (
+                ("sneak_areas_end" in data_json or "sneak_areas" in data_json)
+                and not map_data.low_lying_areas
+                and (section_changed("sneak_areas_end") or section_changed("sneak_areas"))
+            ):
                 map_data.low_lying_areas = []
                 areas = data_json["sneak_areas_end" if "sneak_areas_end" in data_json else "sneak_areas"]
                 for area in areas:
@@ -3833,12 +4157,12 @@ class DreameVacuumMapDecoder:
                         )
                     )
 
-            if "pointinfo" in data_json:
+            if "pointinfo" in data_json and section_changed("pointinfo"):
                 points = data_json["pointinfo"]
                 if points:
                     if isinstance(points, list):
                         points = points[0]
-                    if "spoint" in points and not map_data.predefined_points:
+                    if "spoint" in points and not map_data.predefined_points and not p_frame:
                         map_data.predefined_points = {}
                         index = 0
                         for point in points["spoint"]:
@@ -3862,7 +4186,7 @@ class DreameVacuumMapDecoder:
                                 point[3],
                             )
 
-            if "tpointinfo" in data_json:
+            if "tpointinfo" in data_json and not p_frame:
                 map_data.task_cruise_points = {}
                 for point in data_json["tpointinfo"]:
                     index = index + 1
@@ -3873,7 +4197,7 @@ class DreameVacuumMapDecoder:
                         point[3],
                     )
 
-            if not map_data.saved_map:
+            if not map_data.saved_map and not p_frame:
                 if "decmap" in data_json or map_data.multiple_cleaning_time:
                     map_data.cleaning_map_data = DreameVacuumMapDecoder.decode_cleaning_map_data(
                         map_data, data_json.get("decmap")
@@ -3896,6 +4220,8 @@ class DreameVacuumMapDecoder:
 
             if vslam_map and not map_data.saved_map:
                 map_data.need_optimization = not restored_map
+
+            map_data.data_json_fragments = section_hashes
         except Exception:
             _LOGGER.error("Map Parse Failed: %s", traceback.format_exc())
 
@@ -3908,13 +4234,17 @@ class DreameVacuumMapDecoder:
         if partial_map.frame_type != MapFrameType.P.value:
             return None
 
-        map_data, saved_map_data = DreameVacuumMapDecoder.decode_map_data_from_partial(
-            partial_map,
-            vslam_map,
+        map_data, _ = DreameVacuumMapDecoder.decode_map_data_from_partial(
+            partial_map, vslam_map, current_map_data=current_map_data
         )
         if map_data is None:
             return None
 
+        if map_data.data_json_fragments:
+            if current_map_data.data_json_fragments is None:
+                current_map_data.data_json_fragments = {}
+            current_map_data.data_json_fragments.update(map_data.data_json_fragments)
+
         current_map_data.frame_id = map_data.frame_id
         current_map_data.robot_position = map_data.robot_position
         current_map_data.timestamp_ms = map_data.timestamp_ms
@@ -4032,6 +4362,8 @@ class DreameVacuumMapDecoder:
                 current_map_data.obstacles[k].set_segment(current_map_data)
 
         DreameVacuumMapDecoder.set_robot_segment(current_map_data)
+        # Current map data is updated in place
+        current_map_data.changed()
         return current_map_data
 
     @staticmethod
@@ -5059,32 +5391,27 @@ class DreameVacuumMapDataJsonRenderer:
             or len(self._map_data.path) != len(map_data.path)
             or not self._layers.get(MapRendererLayer.PATH)
         ):
-            points = []
             self._layers[MapRendererLayer.PATH] = []
-            if map_data.path and len(map_data.path) > 1:
-                s = map_data.path[0]
-                for point in map_data.path[1:]:
-                    if point.path_type == PathType.LINE:
-                        point = point
-                        a = DreameVacuumMapDataJsonRenderer._convert_coordinates(s.x, s.y)
-                        b = DreameVacuumMapDataJsonRenderer._convert_coordinates(point.x, point.y)
-
-                        points.extend([a[0], a[1], b[0], b[1]])
-                    else:
-                        self._layers[MapRendererLayer.PATH].append(
-                            {
-                                MAP_DATA_JSON_PARAMETER_TYPE: MAP_DATA_JSON_PARAMETER_PATH,
-                                MAP_DATA_JSON_PARAMETER_POINTS: points,
-                            }
+            # Same as _convert_coordinates for all points at once
+            coordinates = np.column_stack(
+                (
+                    np.round((map_data.path.x + DreameVacuumMapDataJsonRenderer.HALF_INT16) / 10),
+                    DreameVacuumMapDataJsonRenderer.MAX
+                    - np.round((map_data.path.y + DreameVacuumMapDataJsonRenderer.HALF_INT16) / 10),
+                )
+            ).astype(np.int64)
+            for path_type, start, end in map_data.path.runs():
+                # Every line point of a run is connected to its previous point
+                self._layers[MapRendererLayer.PATH].append(
+                    {
+                        MAP_DATA_JSON_PARAMETER_TYPE: MAP_DATA_JSON_PARAMETER_PATH,
+                        MAP_DATA_JSON_PARAMETER_POINTS: np.hstack(
+                            (coordinates[start : end - 1], coordinates[start + 1 : end])
                         )
-                        points = []
-                    s = point
-            self._layers[MapRendererLayer.PATH].append(
-                {
-                    MAP_DATA_JSON_PARAMETER_TYPE: MAP_DATA_JSON_PARAMETER_PATH,
-                    MAP_DATA_JSON_PARAMETER_POINTS: points,
-                }
-            )
+                        .ravel()
+                        .tolist(),
+                    }
+                )
             map_data_json[MAP_DATA_JSON_PARAMETER_ENTITIES].extend(self._layers[MapRendererLayer.PATH])
 
         floor_pixels = []
@@ -5966,20 +6293,11 @@ class DreameVacuumMapRenderer:
             path_types = {"S": 1, "W": 2, "M": 3}
             paths = None
             if map_data.path:
-                paths = []
-                coords = [
-                    path_types.get(map_data.path[0].path_type),
-                    map_data.path[0].x,
-                    map_data.path[0].y,
+                coordinates = map_data.path.data[:, :2].ravel().tolist()
+                paths = [
+                    [path_types.get(path_type), *coordinates[start * 2 : end * 2]]
+                    for path_type, start, end in map_data.path.runs()
                 ]
-                for path in map_data.path[1:]:
-                    if path.path_type.value != "L":
-                        paths.append(coords)
-                        coords = [path_types.get(path.path_type)]
-                    coords.extend([path.x, path.y])
-
-                if len(coords) > 2:
-                    paths.append(coords)
 
             map_data_json = MapRendererData(
                 data=pixels,
@@ -6646,11 +6964,7 @@ class DreameVacuumMapRenderer:
 
             if not self._low_memory and self.config.path and map_data.path and self._robot_type != RobotType.VSLAM:
                 if not self._cache or self._map_data is None or self._map_data.path != map_data.path:
-                    self._has_mask = False
-                    for path in map_data.path:
-                        if path.path_type == PathType.SWEEP_AND_MOP or path.path_type == PathType.MOP:
-                            self._has_mask = True
-                            break
+                    self._has_mask = map_data.path.contains_type(PathType.SWEEP_AND_MOP, PathType.MOP)
             else:
                 self._has_mask = False
 
@@ -8300,42 +8614,17 @@ class DreameVacuumMapRenderer:
         draw = ImageDraw.Draw(new_layer, "RGBA")
         sweep = []
         mop = []
-        sweep_path = []
-        mop_path = []
-        path_type = ""
-
-        for point in path:
-            p = point.to_img(dimensions)
-            if point.path_type == PathType.LINE:
-                l = [p.x * scale, p.y * scale]
-                if path_type == PathType.SWEEP_AND_MOP or (path_type == PathType.SWEEP or self._low_memory):
-                    sweep_path.extend(l)
-
-                if not self._low_memory and (path_type == PathType.SWEEP_AND_MOP or path_type == PathType.MOP):
-                    mop_path.extend(l)
-            else:
-                if mop_path:
-                    mop.append(mop_path)
-
-                if sweep_path:
-                    sweep.append(sweep_path)
-
-                path_type = point.path_type
-                if path_type == PathType.SWEEP_AND_MOP or (path_type == PathType.SWEEP or self._low_memory):
-                    sweep_path = [p.x * scale, p.y * scale]
-                else:
-                    sweep_path = []
-
-                if not self._low_memory and (path_type == PathType.SWEEP_AND_MOP or path_type == PathType.MOP):
-                    mop_path = [p.x * scale, p.y * scale]
-                else:
-                    mop_path = []
 
-        if sweep_path:
-            sweep.append(sweep_path)
+        x, y = path.to_img(dimensions)
+        coordinates = np.column_stack((x * scale, y * scale)).ravel().tolist()
+        for path_type, start, end in path.runs():
+            # Lines before the first sweep or mop point are only rendered on low memory mode
+            points = coordinates[start * 2 : end * 2]
+            if path_type == PathType.SWEEP_AND_MOP or (path_type == PathType.SWEEP or self._low_memory):
+                sweep.append(points)
 
-        if mop_path:
-            mop.append(mop_path)
+            if not self._low_memory and (path_type == PathType.SWEEP_AND_MOP or path_type == PathType.MOP):
+                mop.append(points)
 
         if mop and mask:
             mop_layer = Image.new("RGBA", layer_size, (255, 255, 255, 0))
@@ -1,4 +1,10 @@
+from __future__ import annotations
+
+import asyncio
 import base64
+from contextlib import contextmanager
+import copy
+from datetime import timedelta
 import hashlib
 import hmac
 import json
@@ -6,17 +12,20 @@ import locale
 import logging
 import queue
 import random
+import socket
 import ssl
-from threading import Thread, Timer
+from threading import Condition, Event, Lock, Thread, Timer, local
 import time
 from time import sleep
-from typing import Any, Final
+from typing import Any, ClassVar, Final
 import zlib
 
+import aiohttp
 from Crypto.Cipher import ARC4
 import paho.mqtt
 from paho.mqtt.client import Client
 import requests
+from requests.adapters import HTTPAdapter
 
 # Apply python-miio patch before importing miio to prevent FutureWarning on Python 3.13
 from .miio_patch import apply_miio_patch
@@ -24,6 +33,7 @@ from .miio_patch import apply_miio_patch
 apply_miio_patch()
 
 from miio.miioprotocol import MiIOProtocol
+from miio.protocol import Message
 
 from . import VERSION
 from .exceptions import DeviceException
@@ -36,24 +46,166 @@ _LOGGER = logging.getLogger(__name__)
 
 
 class DreameVacuumDeviceProtocol(MiIOProtocol):
+    BATCH_METHODS: Final = ("get_properties", "set_properties")
+
     def __init__(self, ip: str, token: str) -> None:
         super().__init__(ip, token, 0, 0, True, 2)
         self.ip = None
         self.token = None
         self._queue = queue.Queue()
         self._thread = None
+        self._batch_window: float = 0.05  # Time to wait for more queued calls that can be merged
+        self._batch_size: int = 15  # Maximum number of properties the device accepts in a single request
+        self._pipeline_depth: int = 3  # Maximum number of batched requests waiting for a response
         self.set_credentials(ip, token)
 
+    @staticmethod
+    def _property_key(item) -> tuple:
+        return (str(item.get("did")), item.get("siid"), item.get("piid"))
+
+    def _send_batch(self, method: str, items: list) -> None:
+        """Merge queued property calls into as few requests as possible and match results back by property id"""
+        parameters = {}
+        for item in items:
+            for parameter in item[2] or []:
+                parameters[self._property_key(parameter)] = parameter
+        parameters = list(parameters.values())
+
+        chunks = [parameters[i : i + self._batch_size] for i in range(0, len(parameters), self._batch_size)]
+        retry_count = max(item[3] for item in items)
+        responses = self._send_pipelined(method, chunks) if len(chunks) > 1 else [None]
+
+        results = {}
+        failed = False
+        for index, chunk in enumerate(chunks):
+            response = responses[index]
+            if response is None:
+                # Requests without a response are sent again one by one with retries
+                try:
+                    response = self.send(method, chunk, retry_count)
+                except Exception as ex:
+                    _LOGGER.debug("Batched %s failed: %s", method, ex)
+            if response is None:
+                failed = True
+                continue
+            for result in response:
+                results[self._property_key(result)] = result
+
+        for item in items:
+            if item[0]:
+                response = [results[k] for k in map(self._property_key, item[2] or []) if k in results]
+                item[0](response if response or not failed else None)
+
+    def _send_pipelined(self, method: str, chunks: list) -> list:
+        """Send requests without waiting for the previous responses and match responses back by request id"""
+        responses = [None] * len(chunks)
+        try:
+            if not self.lazy_discover or not self._discovered:
+                self.send_handshake()
+        except Exception as ex:
+            _LOGGER.debug("Handshake failed: %s", ex)
+            return responses
+
+        header = {
+            "length": 0,
+            "unknown": 0x00000000,
+            "device_id": self._device_id,
+            "ts": self._device_ts + timedelta(seconds=1),
+        }
+        # Request id -> chunk index
+        pending = {}
+        index = 0
+        s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        s.settimeout(self._timeout)
+        try:
+            while index < len(chunks) or pending:
+                while index < len(chunks) and len(pending) < self._pipeline_depth:
+                    request = self._create_request(method, chunks[index])
+                    pending[request["id"]] = index
+                    _LOGGER.debug("%s:%s >>: %s", self.ip, self.port, request)
+                    message = Message.build(
+                        {"data": {"value": request}, "header": {"value": header}, "checksum": 0}, token=self.token
+                    )
+                    s.sendto(message, (self.ip, self.port))
+                    index = index + 1
+
+                data, _ = s.recvfrom(4096)
+                try:
+                    message = Message.parse(data, token=self.token)
+                except Exception as ex:
+                    _LOGGER.debug("Invalid response: %s", ex)
+                    continue
+                payload = message.data.value
+                chunk = pending.pop(payload.get("id"), None)
+                if chunk is None:
+                    # Late response of a previous request
+                    continue
+                self._device_ts = message.header.value["ts"]
+                _LOGGER.debug("%s:%s << %s", self.ip, self.port, payload)
+                if "error" not in payload:
+                    responses[chunk] = payload.get("result")
+        except OSError as ex:
+            _LOGGER.debug("Pipelined %s failed: %s", method, ex)
+        finally:
+            s.close()
+        return responses
+
+    def _process(self, items: list) -> None:
+        index = 0
+        while index < len(items):
+            item = items[index]
+            if item[1] in DreameVacuumDeviceProtocol.BATCH_METHODS:
+                # Consecutive calls of the same method are merged, order of other calls are kept
+                end = index + 1
+                while end < len(items) and items[end][1] == item[1]:
+                    end = end + 1
+                if end - index > 1:
+                    self._send_batch(item[1], items[index:end])
+                    index = end
+                    continue
+            try:
+                response = self.send(item[1], item[2], item[3])
+            except Exception as ex:
+                _LOGGER.debug("Send %s failed: %s", item[1], ex)
+                response = None
+            if item[0]:
+                item[0](response)
+            index = index + 1
+
     def _api_task(self):
         while True:
             item = self._queue.get()
             if len(item) == 0:
                 self._queue.task_done()
+                self._thread = None
+                return
+
+            items = [item]
+            stop = False
+            if item[1] in DreameVacuumDeviceProtocol.BATCH_METHODS:
+                deadline = time.monotonic() + self._batch_window
+                while True:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        next_item = self._queue.get(timeout=remaining)
+                    except queue.Empty:
+                        break
+                    if len(next_item) == 0:
+                        stop = True
+                        break
+                    items.append(next_item)
+
+            try:
+                self._process(items)
+            except:
+                pass
+            for _ in range(len(items) + (1 if stop else 0)):
+                self._queue.task_done()
+            if stop:
+                self._thread = None
                 return
-            response = self.send(item[1], item[2], item[3])
-            if item[0]:
-                item[0](response)
-            self._queue.task_done()
 
     def send_async(self, callback, command, parameters=None, retry_count=2):
         if self._thread is None:
@@ -83,7 +235,516 @@ class DreameVacuumDeviceProtocol(MiIOProtocol):
             self._queue.put([])
 
 
-class DreameVacuumDreameHomeCloudProtocol:
+class DreameVacuumSingleFlight:
+    """Share a single call between identical concurrent requests with an optional short lived result cache"""
+
+    def __init__(self, timeout: float = 60) -> None:
+        self._timeout = timeout
+        self._lock = Lock()
+        # Request key -> [completed event, result, exception, follower count]
+        self._flights: dict[Any, list] = {}
+        # Request key -> (expire time, result)
+        self._results: dict[Any, tuple[float, Any]] = {}
+
+    @staticmethod
+    def key(*args) -> str:
+        return json.dumps(args, sort_keys=True, separators=(",", ":"), default=str)
+
+    def call(self, key: str, func, *args, ttl: float = 0) -> Any:
+        now = time.monotonic()
+        with self._lock:
+            if ttl:
+                cached = self._results.get(key)
+                if cached is not None:
+                    if cached[0] > now:
+                        return copy.deepcopy(cached[1])
+                    del self._results[key]
+
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = [Event(), None, None, 0]
+                self._flights[key] = flight
+            else:
+                flight[3] = flight[3] + 1
+
+        if not leader:
+            if not flight[0].wait(self._timeout):
+                # Leader is stuck, do not wait for it again
+                return func(*args)
+            if flight[2] is not None:
+                raise flight[2]
+            # Shared results are copied so callers can not modify each other's responses
+            return copy.deepcopy(flight[1])
+
+        try:
+            flight[1] = func(*args)
+        except Exception as ex:
+            flight[2] = ex
+            raise
+        finally:
+            with self._lock:
+                # Flight is dropped by clear when the result is invalidated while the request is in progress
+                current = self._flights.get(key) is flight
+                if current:
+                    del self._flights[key]
+                # No more followers can join after the flight is dropped
+                shared = bool(flight[3])
+                if ttl and current and flight[1] is not None:
+                    shared = True
+                    self._results[key] = (time.monotonic() + ttl, flight[1])
+                    # Drop expired results
+                    if len(self._results) > 64:
+                        now = time.monotonic()
+                        for k in [k for k, v in self._results.items() if v[0] <= now]:
+                            del self._results[k]
+            flight[0].set()
+        # Result is kept unchanged for the followers and the cache, leader gets its own copy
+        return copy.deepcopy(flight[1]) if shared else flight[1]
+
+    def clear(self) -> None:
+        """Drop cached results and let new calls start a new request instead of joining the ones in progress"""
+        with self._lock:
+            self._results.clear()
+            self._flights.clear()
+
+
+class DreameVacuumCircuitBreaker:
+    """Closed/open/half-open circuit breaker with jittered exponential backoff"""
+
+    CLOSED: Final = "closed"
+    OPEN: Final = "open"
+    HALF_OPEN: Final = "half_open"
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        min_backoff: float = 2.0,
+        max_backoff: float = 300.0,
+        probe_timeout: float = 30.0,
+    ) -> None:
+        self.name = name
+        self._failure_threshold = failure_threshold
+        self._min_backoff = min_backoff
+        self._max_backoff = max_backoff
+        self._probe_timeout = probe_timeout
+        self._lock = Lock()
+        self._state = DreameVacuumCircuitBreaker.CLOSED
+        self._failures = 0
+        self._backoff = 0
+        self._open_until = 0
+        self._probe_time = None
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == DreameVacuumCircuitBreaker.OPEN and time.monotonic() >= self._open_until:
+                return DreameVacuumCircuitBreaker.HALF_OPEN
+            return self._state
+
+    @property
+    def open(self) -> bool:
+        """Requests are rejected until the backoff time is elapsed"""
+        return self.state == DreameVacuumCircuitBreaker.OPEN
+
+    @property
+    def retry_in(self) -> float:
+        """Seconds until a probe request is allowed"""
+        with self._lock:
+            if self._state == DreameVacuumCircuitBreaker.CLOSED:
+                return 0
+            return max(self._open_until - time.monotonic(), 0)
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._state == DreameVacuumCircuitBreaker.CLOSED:
+                return True
+            now = time.monotonic()
+            if now < self._open_until:
+                return False
+            # Only a single probe request is allowed while half-open
+            if self._probe_time is not None and now - self._probe_time < self._probe_timeout:
+                return False
+            self._state = DreameVacuumCircuitBreaker.HALF_OPEN
+            self._probe_time = now
+            return True
+
+    def success(self) -> None:
+        with self._lock:
+            if self._state != DreameVacuumCircuitBreaker.CLOSED:
+                _LOGGER.info("Connection restored: %s", self.name)
+            self._state = DreameVacuumCircuitBreaker.CLOSED
+            self._failures = 0
+            self._backoff = 0
+            self._probe_time = None
+
+    def failure(self) -> None:
+        with self._lock:
+            self._failures = self._failures + 1
+            if self._state == DreameVacuumCircuitBreaker.HALF_OPEN or self._failures >= self._failure_threshold:
+                self._backoff = min(self._backoff * 2 if self._backoff else self._min_backoff, self._max_backoff)
+                delay = self._backoff * random.uniform(0.8, 1.2)
+                self._open_until = time.monotonic() + delay
+                self._probe_time = None
+                if self._state != DreameVacuumCircuitBreaker.OPEN:
+                    _LOGGER.warning("Too many failed requests, pausing %s requests for %.1fs", self.name, delay)
+                self._state = DreameVacuumCircuitBreaker.OPEN
+
+    @staticmethod
+    def retry_delay(attempt: int, base: float = 0.5, limit: float = 4.0) -> float:
+        """Jittered exponential delay between retries of a single request"""
+        return min(base * (2 ** max(attempt - 1, 0)), limit) * random.uniform(0.5, 1.5)
+
+
+class DreameVacuumRateLimiter:
+    """Account scoped token bucket that lets higher priority requests go first"""
+
+    ACTION: Final = 0  # User actions and setting changes
+    MAP: Final = 1  # Live map frames
+    PROPERTY: Final = 2  # Property polling
+    BACKGROUND: Final = 3  # History and recovery map prefetching
+
+    _limiters: ClassVar[dict[str, DreameVacuumRateLimiter]] = {}
+    _limiters_lock = Lock()
+    _context = local()
+
+    def __init__(self, rate: float = 8.0, burst: int = 8) -> None:
+        self._rate = rate
+        self._burst = burst
+        self._tokens: float = burst
+        self._updated = time.monotonic()
+        self._condition = Condition()
+        # Number of callers waiting for each priority class
+        self._waiting = [0, 0, 0, 0]
+
+    @staticmethod
+    def get(account: str) -> DreameVacuumRateLimiter:
+        """Get the limiter that is shared by all protocols using the same account"""
+        with DreameVacuumRateLimiter._limiters_lock:
+            limiter = DreameVacuumRateLimiter._limiters.get(account)
+            if limiter is None:
+                limiter = DreameVacuumRateLimiter()
+                DreameVacuumRateLimiter._limiters[account] = limiter
+            return limiter
+
+    @staticmethod
+    def current_priority() -> int:
+        priority = getattr(DreameVacuumRateLimiter._context, "priority", None)
+        return DreameVacuumRateLimiter.PROPERTY if priority is None else priority
+
+    @staticmethod
+    @contextmanager
+    def priority(priority: int):
+        """Set priority class of the requests sent from the current thread"""
+        previous = getattr(DreameVacuumRateLimiter._context, "priority", None)
+        DreameVacuumRateLimiter._context.priority = priority
+        try:
+            yield
+        finally:
+            DreameVacuumRateLimiter._context.priority = previous
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self._burst, self._tokens + (now - self._updated) * self._rate)
+        self._updated = now
+
+    def _take(self, priority: int) -> float:
+        """Take a token if it is available for the priority, otherwise return the time to wait"""
+        now = time.monotonic()
+        self._refill(now)
+        if any(self._waiting[:priority]):
+            # Higher priority requests are waiting
+            return 0.05
+        if self._tokens >= 1:
+            self._tokens = self._tokens - 1
+            return 0
+        return max((1 - self._tokens) / self._rate, 0.01)
+
+    def acquire(self, priority: int | None = None, timeout: float = 30) -> bool:
+        """Wait for a request token, returns False when it is not available within the timeout"""
+        if priority is None:
+            priority = DreameVacuumRateLimiter.current_priority()
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            self._waiting[priority] = self._waiting[priority] + 1
+            try:
+                while True:
+                    wait = self._take(priority)
+                    if not wait:
+                        return True
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        _LOGGER.warning("Request rate limit wait timed out, request is dropped")
+                        return False
+                    self._condition.wait(min(wait, remaining))
+            finally:
+                self._waiting[priority] = self._waiting[priority] - 1
+                self._condition.notify_all()
+
+    async def async_acquire(self, priority: int | None = None, timeout: float = 30) -> bool:
+        if priority is None:
+            priority = DreameVacuumRateLimiter.current_priority()
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            self._waiting[priority] = self._waiting[priority] + 1
+        try:
+            while True:
+                with self._condition:
+                    wait = self._take(priority)
+                if not wait:
+                    return True
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                await asyncio.sleep(min(wait, remaining))
+        finally:
+            with self._condition:
+                self._waiting[priority] = self._waiting[priority] - 1
+                self._condition.notify_all()
+
+
+class DreameVacuumCloudSession:
+    """Shared HTTP transport of the cloud protocols"""
+
+    def __init__(self, api_pool_size: int = 4, file_pool_size: int = 2, keep_alive_timeout: float = 50) -> None:
+        self._api_pool_size = api_pool_size
+        self._file_pool_size = file_pool_size
+        # Idle pooled connections are dropped before the server closes them to not fail requests on stale sockets
+        self._keep_alive_timeout = keep_alive_timeout
+        self._session_lock = Lock()
+        # Separate pools for api and object storage hosts so map downloads do not block api calls
+        self._session = self._create_session(api_pool_size)
+        self._file_session = self._create_session(file_pool_size)
+        self._session_used: dict[str, float] = {}
+        # Session name -> number of requests in flight, sessions are not closed while they are used
+        self._session_requests: dict[str, int] = {"api": 0, "file": 0}
+        # Session name -> [requests, connections] of the closed connection pools
+        self._session_stats: dict[str, list[int]] = {"api": [0, 0], "file": [0, 0]}
+        self._single_flight = DreameVacuumSingleFlight()
+        self._rate_limiter: DreameVacuumRateLimiter = None
+        self.api_circuit = DreameVacuumCircuitBreaker("cloud api")
+        self.file_circuit = DreameVacuumCircuitBreaker("cloud file")
+        self._client_session: aiohttp.ClientSession | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def set_client_session(
+        self, client_session: aiohttp.ClientSession | None, loop: asyncio.AbstractEventLoop | None
+    ) -> None:
+        """Use an aiohttp client session on the given event loop for cloud requests"""
+        self._client_session = client_session
+        self._loop = loop
+
+    @property
+    def _client_session_available(self) -> bool:
+        """Blocking calls can only be forwarded to the event loop from other threads"""
+        if (
+            self._client_session is None
+            or self._client_session.closed
+            or self._loop is None
+            or not self._loop.is_running()
+        ):
+            return False
+        try:
+            return asyncio.get_running_loop() is not self._loop
+        except RuntimeError:
+            return True
+
+    @staticmethod
+    def _create_session(pool_size: int) -> requests.Session:
+        session = requests.session()
+        # Failed requests are retried by the callers
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    @staticmethod
+    def _pool_stats(session: requests.Session) -> list[int]:
+        stats = [0, 0]
+        try:
+            for adapter in set(session.adapters.values()):
+                pools = adapter.poolmanager.pools
+                for key in list(pools.keys()):
+                    pool = pools.get(key)
+                    if pool is not None:
+                        stats[0] = stats[0] + pool.num_requests
+                        stats[1] = stats[1] + pool.num_connections
+        except:
+            pass
+        return stats
+
+    def _close_session(self, name: str, session: requests.Session) -> None:
+        requests_count, connections = self._pool_stats(session)
+        self._session_stats[name][0] = self._session_stats[name][0] + requests_count
+        self._session_stats[name][1] = self._session_stats[name][1] + connections
+        session.close()
+
+    def _reset_session(self) -> None:
+        """Replace api session to drop its cookies"""
+        with self._session_lock:
+            # Replaced session is left to be released by its requests in flight
+            if not self._session_requests["api"]:
+                self._close_session("api", self._session)
+            self._session = self._create_session(self._api_pool_size)
+            self._session_used.pop("api", None)
+
+    @contextmanager
+    def _use_session(self, file: bool = False):
+        """Session for a request, idle connection pools are closed only when the session is not in use"""
+        name = "file" if file else "api"
+        with self._session_lock:
+            session = self._file_session if file else self._session
+            last_used = self._session_used.get(name)
+            if (
+                last_used is not None
+                and not self._session_requests[name]
+                and time.monotonic() - last_used > self._keep_alive_timeout
+            ):
+                self._close_session(name, session)
+            self._session_requests[name] = self._session_requests[name] + 1
+        try:
+            yield session
+        finally:
+            with self._session_lock:
+                self._session_requests[name] = self._session_requests[name] - 1
+                self._session_used[name] = time.monotonic()
+
+    @property
+    def connection_stats(self) -> dict[str, Any]:
+        """Number of requests and new connections of the api and file sessions"""
+        stats = {}
+        with self._session_lock:
+            for name, session in (("api", self._session), ("file", self._file_session)):
+                current = self._pool_stats(session)
+                requests_count = self._session_stats[name][0] + current[0]
+                connections = self._session_stats[name][1] + current[1]
+                stats[name] = {
+                    "requests": requests_count,
+                    "connections": connections,
+                    "reuse_rate": (
+                        round(max(requests_count - connections, 0) / requests_count * 100, 1) if requests_count else 0
+                    ),
+                }
+        return stats
+
+    def _run_coroutine(self, coroutine, timeout: float, retry_count: int) -> Any:
+        """Run a request coroutine on the event loop and wait for it at most as long as all of its attempts take"""
+        # Each attempt can wait for the maximum retry delay and login can take another request timeout
+        timeout = (max(retry_count or 0, 0) + 2) * (timeout + 4)
+        future = asyncio.run_coroutine_threadsafe(coroutine, self._loop)
+        try:
+            return future.result(timeout)
+        except TimeoutError:
+            future.cancel()
+            _LOGGER.warning("Cloud request did not complete in %.0fs", timeout)
+            return None
+
+    async def _run_blocking(self, func, *args) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+
+    def _read_api_call(self, url, params, retry_count=2, ttl: float = 0) -> Any:
+        """Execute an idempotent api call, identical concurrent calls are sent only once"""
+        return self._single_flight.call(
+            DreameVacuumSingleFlight.key(url, params), self._api_call, url, params, retry_count, ttl=ttl
+        )
+
+    def get_file(self, url: str, retry_count: int = 4) -> Any:
+        return self._single_flight.call(DreameVacuumSingleFlight.key(url), self._get_file, url, retry_count)
+
+    def _get_file(self, url: str, retry_count: int = 4) -> Any:
+        if self._client_session_available:
+            return self._run_coroutine(self.async_get_file(url, retry_count), 6, retry_count)
+
+        if not self.file_circuit.allow():
+            return None
+
+        retries = 0
+        if not retry_count or retry_count < 0:
+            retry_count = 0
+        while retries < retry_count + 1:
+            try:
+                with self._use_session(True) as session:
+                    response = session.get(url, timeout=6)
+            except Exception as ex:
+                response = None
+                _LOGGER.warning("Unable to get file at %s: %s", url, ex)
+            if response is not None:
+                self.file_circuit.success()
+                if response.status_code == 200:
+                    return response.content
+            retries = retries + 1
+            if retries < retry_count + 1:
+                sleep(DreameVacuumCircuitBreaker.retry_delay(retries))
+        if response is None:
+            self.file_circuit.failure()
+        return None
+
+    def get_file_stream(
+        self, url: str, consumer_factory, max_size: int | None = None, retry_count: int = 2, chunk_size: int = 65536
+    ) -> Any:
+        """Download a file in chunks into a consumer created for each attempt, without keeping the whole response"""
+        if not self.file_circuit.allow():
+            return None
+
+        retries = 0
+        if not retry_count or retry_count < 0:
+            retry_count = 0
+        connected = False
+        while retries < retry_count + 1:
+            try:
+                with self._use_session(True) as session, session.get(url, timeout=6, stream=True) as response:
+                    connected = True
+                    if response.status_code == 200:
+                        length = response.headers.get("Content-Length")
+                        if max_size and length and int(length) > max_size:
+                            _LOGGER.warning("File at %s exceeds size limit: %s", url, length)
+                            return None
+                        size = 0
+                        consumer = consumer_factory()
+                        for chunk in response.iter_content(chunk_size):
+                            size = size + len(chunk)
+                            if max_size and size > max_size:
+                                _LOGGER.warning("File at %s exceeds size limit", url)
+                                return None
+                            consumer.update(chunk)
+                        self.file_circuit.success()
+                        return consumer
+            except requests.exceptions.RequestException as ex:
+                _LOGGER.warning("Unable to get file at %s: %s", url, ex)
+            retries = retries + 1
+            if retries < retry_count + 1:
+                sleep(DreameVacuumCircuitBreaker.retry_delay(retries))
+
+        if connected:
+            self.file_circuit.success()
+        else:
+            self.file_circuit.failure()
+        return None
+
+    async def async_get_file(self, url: str, retry_count: int = 4) -> Any:
+        if not self.file_circuit.allow():
+            return None
+
+        retries = 0
+        if not retry_count or retry_count < 0:
+            retry_count = 0
+        while retries < retry_count + 1:
+            try:
+                async with self._client_session.get(url, timeout=aiohttp.ClientTimeout(total=6)) as response:
+                    self.file_circuit.success()
+                    if response.status == 200:
+                        return await response.read()
+            except Exception as ex:
+                _LOGGER.warning("Unable to get file at %s: %s", url, ex)
+                if retries == retry_count:
+                    self.file_circuit.failure()
+            retries = retries + 1
+            if retries < retry_count + 1:
+                await asyncio.sleep(DreameVacuumCircuitBreaker.retry_delay(retries))
+        return None
+
+
+class DreameVacuumDreameHomeCloudProtocol(DreameVacuumCloudSession):
     def __init__(
         self,
         username: str,
@@ -93,12 +754,13 @@ class DreameVacuumDreameHomeCloudProtocol:
         auth_key: str | None = None,
         did: str | None = None,
     ) -> None:
+        super().__init__()
         self._username = username
         self._password = password
         self._account_type = account_type
         self._country = country
         self._did = did
-        self._session = requests.session()
+        self._rate_limiter = DreameVacuumRateLimiter.get(f"{account_type}:{country}:{username}")
         self._queue = queue.Queue()
         self._thread = None
         self._client_queue = queue.Queue()
@@ -113,6 +775,7 @@ class DreameVacuumDreameHomeCloudProtocol:
         self._client_connected = False
         self._client_connecting = False
         self._client = None
+        self._last_client_activity = None  # Last time a message is received or client is connected
         self._message_callback = None
         self._connected_callback = None
         self._logged_in = False
@@ -136,8 +799,8 @@ class DreameVacuumDreameHomeCloudProtocol:
                 self._thread = None
                 return
             try:
-                item[0](self._api_call(item[1], item[2], item[3]))
-                sleep(0.1)
+                with DreameVacuumRateLimiter.priority(item[4]):
+                    item[0](self._api_call(item[1], item[2], item[3]))
             except:
                 pass
             self._queue.task_done()
@@ -147,15 +810,26 @@ class DreameVacuumDreameHomeCloudProtocol:
             self._thread = Thread(target=self._api_task, daemon=True)
             self._thread.start()
 
-        self._queue.put((callback, url, params, retry_count))
+        self._queue.put((callback, url, params, retry_count, DreameVacuumRateLimiter.current_priority()))
 
     def _api_call(self, url, params=None, retry_count=2):
+        if not self._rate_limiter.acquire():
+            return None
         return self.request(
             f"{self.get_api_url()}/{url}",
             json.dumps(params, separators=(",", ":")) if params is not None else None,
             retry_count,
         )
 
+    async def _async_api_call(self, url, params=None, retry_count=2):
+        if not await self._rate_limiter.async_acquire():
+            return None
+        return await self.async_request(
+            f"{self.get_api_url()}/{url}",
+            json.dumps(params, separators=(",", ":")) if params is not None else None,
+            retry_count,
+        )
+
     def get_api_url(self) -> str:
         return f"https://{self._country}{self._strings[0]}:{self._strings[1]}"
 
@@ -183,6 +857,17 @@ class DreameVacuumDreameHomeCloudProtocol:
     def connected(self) -> bool:
         return self._connected and self._client_connected
 
+    @property
+    def client_connected(self) -> bool:
+        return self._client is not None and self._client_connected and not self._client_connecting
+
+    @property
+    def client_idle_time(self) -> float | None:
+        """Seconds since the last message received from the device client"""
+        if self._last_client_activity is None:
+            return None
+        return time.time() - self._last_client_activity
+
     @property
     def auth_key(self) -> str | None:
         return self._secondary_key
@@ -227,6 +912,7 @@ class DreameVacuumDreameHomeCloudProtocol:
         self._client_connecting = False
         self._reconnect_timer_cancel()
         if rc == 0:
+            self._last_client_activity = time.time()
             if not self._client_connected:
                 self._client_connected = True
                 _LOGGER.info("Connected to the device client")
@@ -254,6 +940,7 @@ class DreameVacuumDreameHomeCloudProtocol:
 
     @staticmethod
     def _on_client_message(client, self, message):
+        self._last_client_activity = time.time()
         ## Dirty patch for devices are stuck disconnected, will be refactored later...
         if not self._client_connected or not self._connected:
             self._client_connected = True
@@ -329,8 +1016,7 @@ class DreameVacuumDreameHomeCloudProtocol:
         return None
 
     def login(self) -> bool:
-        self._session.close()
-        self._session = requests.session()
+        self._reset_session()
 
         if self._strings is None:
             self._strings = json.loads(zlib.decompress(base64.b64decode(DREAME_STRINGS), zlib.MAX_WBITS | 32))
@@ -504,21 +1190,12 @@ class DreameVacuumDreameHomeCloudProtocol:
                 return " ", self._host
         return None, None
 
-    def send_async(self, callback, method, parameters, retry_count: int = 2):
+    def _send_request(self, method, parameters) -> tuple[str, dict[str, Any]]:
         host = ""
         if self._host and len(self._host):
             host = f"-{self._host.split('.')[0]}"
 
-        self._id = self._id + 1
-        self._api_call_async(
-            lambda api_response: callback(
-                None
-                if api_response is None
-                or "data" not in api_response
-                or api_response["data"] is None
-                or "result" not in api_response["data"]
-                else api_response["data"]["result"]
-            ),
+        return (
             f"{self._strings[37]}{host}/{self._strings[27]}/{self._strings[38]}",
             {
                 "did": str(self._did),
@@ -530,57 +1207,41 @@ class DreameVacuumDreameHomeCloudProtocol:
                     "params": parameters,
                 },
             },
-            retry_count,
         )
 
-    def send(self, method, parameters, retry_count: int = 2) -> Any:
-        host = ""
-        if self._host and len(self._host):
-            host = f"-{self._host.split('.')[0]}"
-
-        api_response = self._api_call(
-            f"{self._strings[37]}{host}/{self._strings[27]}/{self._strings[38]}",
-            {
-                "did": str(self._did),
-                "id": self._id,
-                "data": {
-                    "did": str(self._did),
-                    "id": self._id,
-                    "method": method,
-                    "params": parameters,
-                },
-            },
-            retry_count,
-        )
-        self._id = self._id + 1
+    @staticmethod
+    def _send_result(api_response, log: bool = True) -> Any:
         if (
             api_response is None
             or "data" not in api_response
             or api_response["data"] is None
             or "result" not in api_response["data"]
         ):
-            if api_response:
+            if api_response and log:
                 _LOGGER.error("Failed to execute api call: %s", api_response)
             return None
         return api_response["data"]["result"]
 
-    def get_file(self, url: str, retry_count: int = 4) -> Any:
-        retries = 0
-        if not retry_count or retry_count < 0:
-            retry_count = 0
-        while retries < retry_count + 1:
-            try:
-                response = self._session.get(url, timeout=6)
-            except Exception as ex:
-                response = None
-                _LOGGER.warning("Unable to get file at %s: %s", url, ex)
-            if response is not None and response.status_code == 200:
-                return response.content
-            retries = retries + 1
-        return None
+    def send_async(self, callback, method, parameters, retry_count: int = 2):
+        self._id = self._id + 1
+        self._api_call_async(
+            lambda api_response: callback(self._send_result(api_response, False)),
+            *self._send_request(method, parameters),
+            retry_count,
+        )
 
-    def get_file_url(self, object_name: str = "") -> Any:
-        api_response = self._api_call(
+    def send(self, method, parameters, retry_count: int = 2) -> Any:
+        api_response = self._api_call(*self._send_request(method, parameters), retry_count)
+        self._id = self._id + 1
+        return self._send_result(api_response)
+
+    async def async_send(self, method, parameters, retry_count: int = 2) -> Any:
+        request = self._send_request(method, parameters)
+        self._id = self._id + 1
+        return self._send_result(await self._async_api_call(*request, retry_count))
+
+    def _file_url_request(self, object_name: str) -> tuple[str, dict[str, Any]]:
+        return (
             f"{self._strings[23]}/{self._strings[39]}/{self._strings[56]}",
             {
                 "did": str(self._did),
@@ -590,13 +1251,23 @@ class DreameVacuumDreameHomeCloudProtocol:
                 self._strings[21]: self._country,
             },
         )
+
+    def get_file_url(self, object_name: str = "") -> Any:
+        api_response = self._read_api_call(*self._file_url_request(object_name), ttl=5)
+        if api_response is None or "data" not in api_response:
+            return None
+
+        return api_response["data"]
+
+    async def async_get_file_url(self, object_name: str = "") -> Any:
+        api_response = await self._async_api_call(*self._file_url_request(object_name))
         if api_response is None or "data" not in api_response:
             return None
 
         return api_response["data"]
 
     def get_interim_file_url(self, object_name: str = "") -> str:
-        api_response = self._api_call(
+        api_response = self._read_api_call(
             f"{self._strings[23]}/{self._strings[39]}/{self._strings[55]}",
             {
                 "did": str(self._did),
@@ -604,6 +1275,7 @@ class DreameVacuumDreameHomeCloudProtocol:
                 self._strings[40]: object_name,
                 self._strings[21]: self._country,
             },
+            ttl=5,
         )
         if api_response is None or "data" not in api_response:
             return None
@@ -612,7 +1284,19 @@ class DreameVacuumDreameHomeCloudProtocol:
 
     def get_properties(self, keys):
         params = {"did": str(self._did), "keys": keys}
-        api_response = self._api_call(f"{self._strings[23]}/{self._strings[25]}/{self._strings[41]}", params)
+        api_response = self._read_api_call(
+            f"{self._strings[23]}/{self._strings[25]}/{self._strings[41]}", params, ttl=1
+        )
+        if api_response is None or "data" not in api_response:
+            return None
+
+        return api_response["data"]
+
+    async def async_get_properties(self, keys):
+        params = {"did": str(self._did), "keys": keys}
+        api_response = await self._async_api_call(
+            f"{self._strings[23]}/{self._strings[25]}/{self._strings[41]}", params
+        )
         if api_response is None or "data" not in api_response:
             return None
 
@@ -624,7 +1308,7 @@ class DreameVacuumDreameHomeCloudProtocol:
     def get_device_event(self, key, limit=1, time_start=0, time_end=9999999999):
         return self.get_device_data(key, "event", limit, time_start, time_end)
 
-    def get_device_data(self, key, type, limit=1, time_start=0, time_end=9999999999):
+    def _device_data_request(self, key, type, limit, time_start) -> tuple[str, dict[str, Any]]:
         data_keys = key.split(".")
         params = {
             "uid": str(self._uid),
@@ -642,12 +1326,24 @@ class DreameVacuumDreameHomeCloudProtocol:
             param_name = "aiid"
 
         params[param_name] = data_keys[1]
-        api_response = self._api_call(f"{self._strings[23]}/{self._strings[25]}/{self._strings[43]}", params)
+        return (f"{self._strings[23]}/{self._strings[25]}/{self._strings[43]}", params)
+
+    def _device_data_result(self, api_response) -> Any:
         if api_response is None or "data" not in api_response or self._strings[33] not in api_response["data"]:
             return None
 
         return api_response["data"][self._strings[33]]
 
+    def get_device_data(self, key, type, limit=1, time_start=0, time_end=9999999999):
+        return self._device_data_result(
+            self._read_api_call(*self._device_data_request(key, type, limit, time_start), ttl=1)
+        )
+
+    async def async_get_device_data(self, key, type, limit=1, time_start=0, time_end=9999999999):
+        return self._device_data_result(
+            await self._async_api_call(*self._device_data_request(key, type, limit, time_start))
+        )
+
     def get_batch_device_datas(self, props) -> Any:
         api_response = self._api_call(
             f"{self._strings[23]}/{self._strings[26]}/{self._strings[44]}",
@@ -662,11 +1358,34 @@ class DreameVacuumDreameHomeCloudProtocol:
             f"{self._strings[23]}/{self._strings[26]}/{self._strings[45]}",
             {"did": self._did, self._strings[35]: props},
         )
+        self._single_flight.clear()
         if api_response is None or "result" not in api_response:
             return None
         return api_response["result"]
 
+    def _request_headers(self) -> dict[str, str]:
+        headers = {
+            "Accept": "*/*",
+            "Content-Type": "application/x-www-form-urlencoded",
+            "Accept-Language": "en-US;q=0.8",
+            "Accept-Encoding": "gzip, deflate",
+            self._strings[47]: self._strings[3],
+            self._strings[49]: self._strings[5],
+            self._strings[50]: self._ti if self._ti else self._strings[6],
+            self._strings[51]: self._strings[52],
+            self._strings[46]: self._key,
+        }
+        if self._country == "cn":
+            headers[self._strings[48]] = self._strings[4]
+        return headers
+
     def request(self, url: str, data, retry_count=2) -> Any:
+        if self._client_session_available:
+            return self._run_coroutine(self.async_request(url, data, retry_count), 6, retry_count)
+
+        if not self.api_circuit.allow():
+            return None
+
         retries = 0
         if not retry_count or retry_count < 0:
             retry_count = 0
@@ -677,20 +1396,9 @@ class DreameVacuumDreameHomeCloudProtocol:
                         response = None
                         break
 
-                headers = {
-                    "Accept": "*/*",
-                    "Content-Type": "application/x-www-form-urlencoded",
-                    "Accept-Language": "en-US;q=0.8",
-                    "Accept-Encoding": "gzip, deflate",
-                    self._strings[47]: self._strings[3],
-                    self._strings[49]: self._strings[5],
-                    self._strings[50]: self._ti if self._ti else self._strings[6],
-                    self._strings[51]: self._strings[52],
-                    self._strings[46]: self._key,
-                }
-                if self._country == "cn":
-                    headers[self._strings[48]] = self._strings[4]
-                response = self._session.post(url, headers=headers, data=data, timeout=6)
+                with self._use_session() as session:
+                    response = session.post(url, headers=self._request_headers(), data=data, timeout=6)
+                    response = (response.status_code, response.text)
                 break
             except requests.exceptions.Timeout:
                 retries = retries + 1
@@ -705,17 +1413,68 @@ class DreameVacuumDreameHomeCloudProtocol:
                 response = None
                 if self._connected:
                     _LOGGER.warning("Error while executing request: %s", str(ex))
+            if retries and retries < retry_count + 1:
+                sleep(DreameVacuumCircuitBreaker.retry_delay(retries))
+
+        return self._handle_response(response)
+
+    async def async_request(self, url: str, data, retry_count=2) -> Any:
+        if not self.api_circuit.allow():
+            return None
+
+        retries = 0
+        if not retry_count or retry_count < 0:
+            retry_count = 0
+        while retries < retry_count + 1:
+            try:
+                if self._key_expire and time.time() > self._key_expire:
+                    if not await self._run_blocking(self.login):
+                        response = None
+                        break
+
+                async with self._client_session.post(
+                    url, headers=self._request_headers(), data=data, timeout=aiohttp.ClientTimeout(total=6)
+                ) as resp:
+                    response = (resp.status, await resp.text())
+                break
+            except TimeoutError:
+                retries = retries + 1
+                response = None
+                if self._connected:
+                    _LOGGER.warning(
+                        "Error while executing request: Read timed out. (read timeout=6): %s",
+                        data,
+                    )
+            except Exception as ex:
+                retries = retries + 1
+                response = None
+                if self._connected:
+                    _LOGGER.warning("Error while executing request: %s", str(ex))
+            if retries and retries < retry_count + 1:
+                await asyncio.sleep(DreameVacuumCircuitBreaker.retry_delay(retries))
+
+        if response is not None and response[0] == 401 and self._secondary_key:
+            # Login is blocking
+            return await self._run_blocking(self._handle_response, response)
+        return self._handle_response(response)
+
+    def _handle_response(self, response: tuple[int, str] | None) -> Any:
+        if response is None or response[0] >= 500:
+            self.api_circuit.failure()
+        else:
+            self.api_circuit.success()
 
         if response is not None:
-            if response.status_code == 200:
+            status_code, text = response
+            if status_code == 200:
                 self._fail_count = 0
                 self._connected = True
-                return json.loads(response.text)
-            if response.status_code == 401 and self._secondary_key:
+                return json.loads(text)
+            if status_code == 401 and self._secondary_key:
                 _LOGGER.warning("Execute api call failed: Token Expired")
                 self.login()
             else:
-                _LOGGER.warning("Execute api call failed with response: %s", response.text)
+                _LOGGER.warning("Execute api call failed with response: %s", text)
 
         if self._fail_count == 5:
             self._connected = False
@@ -725,6 +1484,8 @@ class DreameVacuumDreameHomeCloudProtocol:
 
     def disconnect(self):
         self._session.close()
+        self._file_session.close()
+        self._single_flight.clear()
         self._connected = False
         self._logged_in = False
         self._auth_failed = False
@@ -748,15 +1509,16 @@ class DreameVacuumDreameHomeCloudProtocol:
         return result_str
 
 
-class DreameVacuumMiHomeCloudProtocol:
+class DreameVacuumMiHomeCloudProtocol(DreameVacuumCloudSession):
     def __init__(
         self, username: str, password: str, country: str, auth_key: str | None = None, device_id: str | None = None
     ) -> None:
+        super().__init__()
         self._username = username
         self._password = password
         self._country = country
         self._auth_key = auth_key
-        self._session = requests.session()
+        self._rate_limiter = DreameVacuumRateLimiter.get(f"mi:{country}:{username}")
         self._queue = queue.Queue()
         self._thread = None
         self._sign = None
@@ -801,14 +1563,14 @@ class DreameVacuumMiHomeCloudProtocol:
                 self._queue.task_done()
                 self._thread = None
                 return
-            response = self._api_call(item[1], item[2], item[3])
+            with DreameVacuumRateLimiter.priority(item[4]):
+                response = self._api_call(item[1], item[2], item[3])
             if not self.check_login(response):
                 self._logged_in = False
                 self._auth_failed = True
                 response = None
             item[0](response)
 
-            sleep(0.1)
             self._queue.task_done()
 
     def _api_call_async(self, callback, url, params=None, retry_count=2):
@@ -816,9 +1578,11 @@ class DreameVacuumMiHomeCloudProtocol:
             self._thread = Thread(target=self._api_task, daemon=True)
             self._thread.start()
 
-        self._queue.put((callback, url, params, retry_count))
+        self._queue.put((callback, url, params, retry_count, DreameVacuumRateLimiter.current_priority()))
 
     def _api_call(self, url, params, retry_count=2):
+        if not self._rate_limiter.acquire():
+            return None
         response = self.request(
             f"{self.get_api_url()}/{url}",
             {"data": json.dumps(params, separators=(",", ":"))},
@@ -831,6 +1595,21 @@ class DreameVacuumMiHomeCloudProtocol:
             response = None
         return response
 
+    async def _async_api_call(self, url, params, retry_count=2):
+        if not await self._rate_limiter.async_acquire():
+            return None
+        response = await self.async_request(
+            f"{self.get_api_url()}/{url}",
+            {"data": json.dumps(params, separators=(",", ":"))},
+            retry_count,
+        )
+
+        if not self.check_login(response):
+            self._logged_in = False
+            self._auth_failed = True
+            response = None
+        return response
+
     @property
     def logged_in(self) -> bool:
         return self._logged_in
@@ -862,6 +1641,9 @@ class DreameVacuumMiHomeCloudProtocol:
     def check_login(self, response=None) -> bool:
         try:
             if response is None:
+                if self.api_circuit.open:
+                    # Cloud is not reachable, login state cannot be checked
+                    return True
                 response = self.request(
                     f"{self.get_api_url()}/v2/message/v2/check_new_msg",
                     {
@@ -1000,8 +1782,7 @@ class DreameVacuumMiHomeCloudProtocol:
         return False
 
     def login(self) -> bool:
-        self._session.close()
-        self._session = requests.session()
+        self._reset_session()
         self._session.cookies.set("sdkVersion", "3.8.6", domain="mi.com")
         self._session.cookies.set("sdkVersion", "3.8.6", domain="xiaomi.com")
         self._session.cookies.set("deviceId", self._client_id, domain="mi.com")
@@ -1080,23 +1861,10 @@ class DreameVacuumMiHomeCloudProtocol:
         self._captcha_code = code
         return self.login() or self.captcha_img is None
 
-    def get_file(self, url: str, retry_count: int = 4) -> Any:
-        retries = 0
-        if not retry_count or retry_count < 0:
-            retry_count = 0
-        while retries < retry_count + 1:
-            try:
-                response = self._session.get(url, timeout=6)
-            except Exception as ex:
-                response = None
-                _LOGGER.warning("Unable to get file at %s: %s", url, ex)
-            if response is not None and response.status_code == 200:
-                return response.content
-            retries = retries + 1
-        return None
-
     def get_file_url(self, object_name: str = "") -> Any:
-        api_response = self._api_call(f"home/getfileurl{('_v3' if self._v3 else '')}", {"obj_name": object_name})
+        api_response = self._read_api_call(
+            f"home/getfileurl{('_v3' if self._v3 else '')}", {"obj_name": object_name}, ttl=5
+        )
         _LOGGER.debug("Get file url result: %s = %s", object_name, api_response)
         if api_response is None or "result" not in api_response or "url" not in api_response["result"]:
             if api_response and api_response.get("code") == -8 and self._v3:
@@ -1107,10 +1875,25 @@ class DreameVacuumMiHomeCloudProtocol:
 
         return api_response["result"]["url"]
 
+    async def async_get_file_url(self, object_name: str = "") -> Any:
+        api_response = await self._async_api_call(
+            f"home/getfileurl{('_v3' if self._v3 else '')}", {"obj_name": object_name}
+        )
+        _LOGGER.debug("Get file url result: %s = %s", object_name, api_response)
+        if api_response is None or "result" not in api_response or "url" not in api_response["result"]:
+            if api_response and api_response.get("code") == -8 and self._v3:
+                _LOGGER.debug("get_file_url fallback to V2")
+                self._v3 = False
+                return await self.async_get_file_url(object_name)
+            return None
+
+        return api_response["result"]["url"]
+
     def get_interim_file_url(self, object_name: str = "") -> str:
-        api_response = self._api_call(
+        api_response = self._read_api_call(
             f"v2/home/get_interim_file_url{('_pro' if self._v3 else '')}",
             {"obj_name": object_name},
+            ttl=5,
         )
         _LOGGER.debug("Get interim file url result: %s = %s", object_name, api_response)
         if api_response is None or not api_response.get("result") or "url" not in api_response["result"]:
@@ -1142,24 +1925,50 @@ class DreameVacuumMiHomeCloudProtocol:
             return None
         return api_response["result"]
 
+    async def async_send(self, method, parameters, retry_count: int = 2) -> Any:
+        api_response = await self._async_api_call(
+            f"v2/home/rpc/{self._did}",
+            {"method": method, "params": parameters},
+            retry_count,
+        )
+        if api_response is None or "result" not in api_response:
+            return None
+        return api_response["result"]
+
+    async def async_get_properties(self, parameters, retry_count: int = 1) -> Any:
+        return await self.async_send("get_properties", parameters, retry_count)
+
     def get_device_property(self, key, limit=1, time_start=0, time_end=9999999999):
         return self.get_device_data(key, "prop", limit, time_start, time_end)
 
     def get_device_event(self, key, limit=1, time_start=0, time_end=9999999999):
         return self.get_device_data(key, "event", limit, time_start, time_end)
 
+    def _device_data_params(self, key, type, limit, time_start, time_end) -> dict[str, Any]:
+        return {
+            "uid": str(self._uid),
+            "did": str(self._did),
+            "time_end": time_end,
+            "time_start": time_start,
+            "limit": limit,
+            "key": key,
+            "type": type,
+        }
+
     def get_device_data(self, key, type, limit=1, time_start=0, time_end=9999999999):
-        api_response = self._api_call(
+        api_response = self._read_api_call(
             "user/get_user_device_data",
-            {
-                "uid": str(self._uid),
-                "did": str(self._did),
-                "time_end": time_end,
-                "time_start": time_start,
-                "limit": limit,
-                "key": key,
-                "type": type,
-            },
+            self._device_data_params(key, type, limit, time_start, time_end),
+            ttl=1,
+        )
+        if api_response is None or "result" not in api_response:
+            return None
+
+        return api_response["result"]
+
+    async def async_get_device_data(self, key, type, limit=1, time_start=0, time_end=9999999999):
+        api_response = await self._async_api_call(
+            "user/get_user_device_data", self._device_data_params(key, type, limit, time_start, time_end)
         )
         if api_response is None or "result" not in api_response:
             return None
@@ -1316,14 +2125,14 @@ class DreameVacuumMiHomeCloudProtocol:
 
     def set_batch_device_datas(self, props) -> Any:
         api_response = self._api_call("v2/device/batch_set_props", [{"did": self._did, "props": props}])
+        self._single_flight.clear()
         if api_response is None or "result" not in api_response:
             return None
         return api_response["result"]
 
-    def request(self, url: str, params: dict[str, str], retry_count=2) -> Any:
-        retries = 0
-        if not retry_count or retry_count < 0:
-            retry_count = 0
+    def _request_fields(
+        self, url: str, params: dict[str, str]
+    ) -> tuple[dict[str, str], dict[str, str], dict[str, str]]:
         headers = {
             "User-Agent": self._useragent,
             "Accept-Encoding": "identity",
@@ -1345,24 +2154,76 @@ class DreameVacuumMiHomeCloudProtocol:
         nonce = self.generate_nonce()
         signed_nonce = self.signed_nonce(nonce)
         fields = self.generate_enc_params(url, "POST", signed_nonce, nonce, params, self._ssecurity)
+        return headers, cookies, fields
+
+    def request(self, url: str, params: dict[str, str], retry_count=2) -> Any:
+        if self._client_session_available:
+            return self._run_coroutine(self.async_request(url, params, retry_count), 5, retry_count)
+
+        if not self.api_circuit.allow():
+            return None
+
+        retries = 0
+        if not retry_count or retry_count < 0:
+            retry_count = 0
+        headers, cookies, fields = self._request_fields(url, params)
+
+        while retries < retry_count + 1:
+            try:
+                with self._use_session() as session:
+                    response = session.post(url, headers=headers, cookies=cookies, data=fields, timeout=5)
+                    response = (response.status_code, response.text)
+                break
+            except Exception as ex:
+                retries = retries + 1
+                response = None
+                if self._connected:
+                    _LOGGER.warning("Error while executing request: %s %s", url, str(ex))
+                if retries < retry_count + 1:
+                    sleep(DreameVacuumCircuitBreaker.retry_delay(retries))
+
+        return self._handle_response(response, fields)
+
+    async def async_request(self, url: str, params: dict[str, str], retry_count=2) -> Any:
+        if not self.api_circuit.allow():
+            return None
+
+        retries = 0
+        if not retry_count or retry_count < 0:
+            retry_count = 0
+        headers, cookies, fields = self._request_fields(url, params)
 
         while retries < retry_count + 1:
             try:
-                response = self._session.post(url, headers=headers, cookies=cookies, data=fields, timeout=5)
+                async with self._client_session.post(
+                    url, headers=headers, cookies=cookies, data=fields, timeout=aiohttp.ClientTimeout(total=5)
+                ) as resp:
+                    response = (resp.status, await resp.text())
                 break
             except Exception as ex:
                 retries = retries + 1
                 response = None
                 if self._connected:
                     _LOGGER.warning("Error while executing request: %s %s", url, str(ex))
+                if retries < retry_count + 1:
+                    await asyncio.sleep(DreameVacuumCircuitBreaker.retry_delay(retries))
+
+        return self._handle_response(response, fields)
+
+    def _handle_response(self, response: tuple[int, str] | None, fields: dict[str, str]) -> Any:
+        if response is None or response[0] >= 500:
+            self.api_circuit.failure()
+        else:
+            self.api_circuit.success()
 
         if response is not None:
-            if response.status_code == 200:
+            status_code, text = response
+            if status_code == 200:
                 self._fail_count = 0
                 self._connected = True
-                decoded = self.decrypt_rc4(self.signed_nonce(fields["_nonce"]), response.text)
+                decoded = self.decrypt_rc4(self.signed_nonce(fields["_nonce"]), text)
                 return json.loads(decoded) if decoded else None
-            _LOGGER.warning("Execute api call failed with response: %s", response.text)
+            _LOGGER.warning("Execute api call failed with response: %s", text)
 
         if self._fail_count == 5:
             self._connected = False
@@ -1379,6 +2240,8 @@ class DreameVacuumMiHomeCloudProtocol:
 
     def disconnect(self):
         self._session.close()
+        self._file_session.close()
+        self._single_flight.clear()
         self._connected = False
         self._logged_in = False
         self._auth_failed = False
@@ -1478,6 +2341,11 @@ class DreameVacuumProtocol:
         self._connected = False
         self._mac = None
         self._account_type = account_type
+        # Maximum number of requests that are allowed in flight at the same time for each transport
+        self.local_concurrency = 1
+        self.cloud_concurrency = 4
+        self._single_flight = DreameVacuumSingleFlight()
+        self.local_circuit = DreameVacuumCircuitBreaker("local")
 
         if ip and token:
             self.device = DreameVacuumDeviceProtocol(ip, token)
@@ -1547,6 +2415,18 @@ class DreameVacuumProtocol:
                 pass
         return info
 
+    def set_client_session(self, client_session, loop, isolated_client_session=None) -> None:
+        """Use aiohttp client sessions for cloud requests.
+
+        Mi cloud sends its own cookies with each request, so it only uses a session that does not store cookies to
+        not share them with other users of the client session.
+        """
+        for cloud in {self.cloud, self.device_cloud}:
+            if isinstance(cloud, DreameVacuumMiHomeCloudProtocol):
+                cloud.set_client_session(isolated_client_session, loop if isolated_client_session else None)
+            elif cloud is not None:
+                cloud.set_client_session(client_session, loop)
+
     def disconnect(self):
         if self.device is not None:
             self.device.disconnect()
@@ -1557,6 +2437,12 @@ class DreameVacuumProtocol:
         self._connected = False
 
     def send_async(self, callback, method, parameters: Any = None, retry_count: int = 2):
+        if method in ("action", "set_properties"):
+            with DreameVacuumRateLimiter.priority(DreameVacuumRateLimiter.ACTION):
+                return self._send_async(callback, method, parameters, retry_count)
+        return self._send_async(callback, method, parameters, retry_count)
+
+    def _send_async(self, callback, method, parameters: Any = None, retry_count: int = 2):
         if (self.prefer_cloud or not self.device) and self.device_cloud:
             if not self.device_cloud.logged_in:
                 # Use different session for device cloud
@@ -1585,6 +2471,12 @@ class DreameVacuumProtocol:
             self.device.send_async(callback, method, parameters=parameters, retry_count=retry_count)
 
     def send(self, method, parameters: Any = None, retry_count: int = 2) -> Any:
+        if method in ("action", "set_properties"):
+            with DreameVacuumRateLimiter.priority(DreameVacuumRateLimiter.ACTION):
+                return self._send(method, parameters, retry_count)
+        return self._send(method, parameters, retry_count)
+
+    def _send(self, method, parameters: Any = None, retry_count: int = 2) -> Any:
         if (self.prefer_cloud or not self.device) and self.device_cloud:
             if not self.device_cloud.logged_in:
                 # Use different session for device cloud
@@ -1607,10 +2499,59 @@ class DreameVacuumProtocol:
             return response
 
         if self.device:
-            return self.device.send(method, parameters=parameters, retry_count=retry_count)
+            return self._device_send(method, parameters, retry_count)
+
+    def _device_send(self, method, parameters: Any = None, retry_count: int = 2) -> Any:
+        if not self.local_circuit.allow():
+            raise DeviceException(f"Device is not reachable, retrying in {self.local_circuit.retry_in:.0f}s") from None
+        try:
+            response = self.device.send(method, parameters=parameters, retry_count=retry_count)
+        except Exception:
+            self.local_circuit.failure()
+            raise
+        self.local_circuit.success()
+        return response
+
+    def _clear_results(self) -> None:
+        """Device state is changed, do not return properties or device data that are requested before"""
+        self._single_flight.clear()
+        if self.cloud is not None:
+            self.cloud._single_flight.clear()
+        if self.device_cloud is not None and self.device_cloud is not self.cloud:
+            self.device_cloud._single_flight.clear()
+
+    async def async_send(self, method, parameters: Any = None, retry_count: int = 2) -> Any:
+        if (self.prefer_cloud or not self.device) and self.device_cloud:
+            if not self.device_cloud.logged_in:
+                # Login and device discovery are not async, fallback to blocking send
+                return await asyncio.get_running_loop().run_in_executor(
+                    None, self.send, method, parameters, retry_count
+                )
+
+            response = await self.device_cloud.async_send(method, parameters=parameters, retry_count=retry_count)
+            if response is None:
+                if method == "get_properties" or method == "set_properties":
+                    self._connected = False
+                raise DeviceException("Unable to discover the device over cloud") from None
+            self._connected = True
+            return response
+
+        if self.device:
+            return await asyncio.get_running_loop().run_in_executor(
+                None, self._device_send, method, parameters, retry_count
+            )
 
     def get_properties(self, parameters: Any = None, retry_count: int = 1) -> Any:
-        return self.send("get_properties", parameters=parameters, retry_count=retry_count)
+        return self._single_flight.call(
+            DreameVacuumSingleFlight.key("get_properties", parameters),
+            self.send,
+            "get_properties",
+            parameters,
+            retry_count,
+        )
+
+    async def async_get_properties(self, parameters: Any = None, retry_count: int = 1) -> Any:
+        return await self.async_send("get_properties", parameters=parameters, retry_count=retry_count)
 
     def set_property(self, siid: int, piid: int, value: Any = None, retry_count: int = 2) -> Any:
         return self.set_properties(
@@ -1626,15 +2567,23 @@ class DreameVacuumProtocol:
         )
 
     def set_properties(self, parameters: Any = None, retry_count: int = 2) -> Any:
-        return self.send("set_properties", parameters=parameters, retry_count=retry_count)
+        try:
+            return self.send("set_properties", parameters=parameters, retry_count=retry_count)
+        finally:
+            self._clear_results()
 
     def action_async(self, callback, siid: int, aiid: int, parameters=[], retry_count: int = 2):
         if parameters is None:
             parameters = []
 
         _LOGGER.debug("Send Action Async: %s.%s %s", siid, aiid, parameters)
+
+        def action_callback(response):
+            self._clear_results()
+            callback(response)
+
         self.send_async(
-            callback,
+            action_callback,
             "action",
             parameters={
                 "did": f"{siid}.{aiid}" if not self.dreame_cloud else str(self.cloud.device_id),
@@ -1650,16 +2599,19 @@ class DreameVacuumProtocol:
             parameters = []
 
         _LOGGER.debug("Send Action: %s.%s %s", siid, aiid, parameters)
-        return self.send(
-            "action",
-            parameters={
-                "did": f"{siid}.{aiid}" if not self.dreame_cloud else str(self.cloud.device_id),
-                "siid": siid,
-                "aiid": aiid,
-                "in": parameters,
-            },
-            retry_count=retry_count,
-        )
+        try:
+            return self.send(
+                "action",
+                parameters={
+                    "did": f"{siid}.{aiid}" if not self.dreame_cloud else str(self.cloud.device_id),
+                    "siid": siid,
+                    "aiid": aiid,
+                    "in": parameters,
+                },
+                retry_count=retry_count,
+            )
+        finally:
+            self._clear_results()
 
     @property
     def connected(self) -> bool:
@@ -1671,6 +2623,30 @@ class DreameVacuumProtocol:
 
         return False
 
+    @property
+    def push_connected(self) -> bool:
+        """Property changes are pushed by the device client"""
+        return bool(self.dreame_cloud and self.cloud.client_connected)
+
+    @property
+    def push_idle_time(self) -> float | None:
+        if self.dreame_cloud:
+            return self.cloud.client_idle_time
+        return None
+
+    @property
+    def circuit(self) -> DreameVacuumCircuitBreaker:
+        """Circuit breaker of the transport that is used for device requests"""
+        if (self.prefer_cloud or not self.device) and self.device_cloud:
+            return self.device_cloud.api_circuit
+        return self.local_circuit
+
+    @property
+    def request_concurrency(self) -> int:
+        if (self.prefer_cloud or not self.device) and self.device_cloud:
+            return self.cloud_concurrency
+        return self.local_concurrency
+
     @property
     def dreame_cloud(self) -> bool:
         if self.cloud:
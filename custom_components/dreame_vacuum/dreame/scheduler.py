@@ -0,0 +1,114 @@
+"""
+Adaptive polling schedule for property groups.
+
+Poll period of each property group is derived from how often the group has
+actually changed while the device was in the current state (docked idle,
+cleaning, washing, drying, error...). Groups that change frequently are
+polled near their lower bound, groups that did not change for a long time
+back off to their upper bound.
+"""
+
+from __future__ import annotations
+
+import logging
+from threading import Lock
+import time
+from typing import Any
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class DreameVacuumPollScheduler:
+    """Learns change intervals of property groups per device state and picks their poll periods"""
+
+    def __init__(self, bounds: dict[str, tuple[float, float]], resolution: float = 4, smoothing: float = 0.3) -> None:
+        self._bounds: dict[str, tuple[float, float]] = dict(bounds)
+        self._resolution = resolution  # Number of polls per expected change interval
+        self._smoothing = smoothing  # Weight of the latest change interval in the moving average
+        self._lock = Lock()
+        self._state: str = None
+        self._state_time: float = time.time()
+        # (group, state) -> [average change interval, last change time]
+        self._stats: dict[tuple[str, str], list] = {}
+        # Group -> last poll time
+        self._last_poll: dict[str, float] = {}
+
+    @property
+    def state(self) -> str:
+        return self._state
+
+    def set_bounds(self, group: str, min_period: float, max_period: float) -> None:
+        """Change lower and upper poll period of a group"""
+        with self._lock:
+            self._bounds[group] = (min_period, max(min_period, max_period))
+
+    def set_state(self, state: str, now: float | None = None) -> bool:
+        """Switch the learned statistics to a new device state"""
+        if now is None:
+            now = time.time()
+        with self._lock:
+            if self._state == state:
+                return False
+            _LOGGER.debug("Poll schedule state: %s -> %s", self._state, state)
+            self._state = state
+            self._state_time = now
+            # State transition is a change by itself, restart the unchanged time of the groups learned in this state
+            for group in self._bounds:
+                stats = self._stats.get((group, state))
+                if stats is not None:
+                    stats[1] = now
+            return True
+
+    def record(self, group: str, changed: bool, now: float | None = None) -> None:
+        """Record a poll or push result of a group"""
+        if now is None:
+            now = time.time()
+        with self._lock:
+            self._last_poll[group] = now
+            key = (group, self._state)
+            stats = self._stats.get(key)
+            if stats is None:
+                self._stats[key] = [None, now]
+            elif changed:
+                interval = now - stats[1]
+                stats[0] = interval if stats[0] is None else stats[0] + self._smoothing * (interval - stats[0])
+                stats[1] = now
+
+    def period(self, group: str, now: float | None = None) -> float:
+        """Poll period of a group in the current state"""
+        if now is None:
+            now = time.time()
+        with self._lock:
+            return self._period(group, now)
+
+    def _period(self, group: str, now: float) -> float:
+        min_period, max_period = self._bounds.get(group, (1, 60))
+        stats = self._stats.get((group, self._state))
+        if stats is None or stats[0] is None:
+            # Nothing learned yet for this state
+            return min_period
+        # A group that stays unchanged longer than its average interval is backed off without waiting for a change
+        interval = max(stats[0], now - stats[1])
+        return round(min(max(interval / self._resolution, min_period), max_period), 1)
+
+    @property
+    def schedule(self) -> dict[str, Any]:
+        """Chosen poll periods and learned change intervals for inspection"""
+        now = time.time()
+        with self._lock:
+            groups = {}
+            for group, bounds in self._bounds.items():
+                stats = self._stats.get((group, self._state))
+                last = self._last_poll.get(group)
+                groups[group] = {
+                    "period": self._period(group, now),
+                    "bounds": list(bounds),
+                    "change_interval": round(stats[0], 1) if stats and stats[0] is not None else None,
+                    "last_change": round(now - stats[1], 1) if stats else None,
+                    "last_poll": round(now - last, 1) if last else None,
+                }
+            return {
+                "state": self._state,
+                "state_time": round(now - self._state_time, 1),
+                "groups": groups,
+            }
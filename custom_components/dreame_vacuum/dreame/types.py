@@ -1,12 +1,18 @@
 from __future__ import annotations
 
+import base64
 from dataclasses import asdict, dataclass, field
 from datetime import datetime
 from enum import Enum, IntEnum
+import hashlib
 import json
 import math
+import re
 import time
 from typing import Any, Final
+import zlib
+
+import numpy as np
 
 SEGMENT_TYPE_CODE_TO_NAME: Final = {
     0: "Room",
@@ -1920,12 +1926,19 @@ def DIID(property: DreameVacuumProperty, mapping=DreameVacuumPropertyMapping) ->
         return f"{mapping[property][siid]}.{mapping[property][piid]}"
 
 
+_DID_INDEX: dict[tuple[int, int], DreameVacuumProperty] = None
+
+
 def DID(siid, piid) -> DreameVacuumProperty | None:
-    for prop in list(DreameVacuumProperty):
-        mapping = DreameVacuumPropertyMapping.get(prop)
-        if mapping is not None and siid == mapping["siid"] and piid == mapping["piid"]:
-            return prop
-    return None
+    global _DID_INDEX
+    if _DID_INDEX is None:
+        index = {}
+        for prop in DreameVacuumProperty:
+            mapping = DreameVacuumPropertyMapping.get(prop)
+            if mapping is not None and "piid" in mapping:
+                index.setdefault((mapping["siid"], mapping["piid"]), prop)
+        _DID_INDEX = index
+    return _DID_INDEX.get((siid, piid))
 
 
 class RobotType(IntEnum):
@@ -2147,6 +2160,54 @@ class DeviceCapability(IntEnum):
     LASER_OBSTACLE = 81
 
 
+_DEVICE_INFO: list = None
+_DEVICE_INFO_VERSION: str = None
+_CAPABILITY_INDEX: dict[str, tuple[list, str | None]] = None
+
+
+def device_info_database() -> list:
+    """Decoded device and capability database, decoded once per process"""
+    global _DEVICE_INFO
+    if _DEVICE_INFO is None:
+        from .const import DEVICE_INFO
+
+        _DEVICE_INFO = json.loads(zlib.decompress(base64.b64decode(DEVICE_INFO), zlib.MAX_WBITS | 32))
+    return _DEVICE_INFO
+
+
+def device_info_version() -> str:
+    """Hash of the device database for invalidating the data that is persisted from it"""
+    global _DEVICE_INFO_VERSION
+    if _DEVICE_INFO_VERSION is None:
+        from .const import DEVICE_INFO
+
+        _DEVICE_INFO_VERSION = hashlib.sha256(DEVICE_INFO.encode()).hexdigest()[:16]
+    return _DEVICE_INFO_VERSION
+
+
+def device_capability(model: str) -> tuple[list, str | None]:
+    """Capability vector and map key of a model from the indexed device database"""
+    global _CAPABILITY_INDEX
+    if _CAPABILITY_INDEX is None:
+        device_info = device_info_database()
+        index = {}
+        for name, i in device_info[3].items():
+            device = device_info[0][i]
+            if not device or not (len(device) == 3 or len(device) == 4) or device[2] < 0:
+                continue
+            key = None
+            if len(device) == 4:
+                # Empty key marks the devices with a missing key
+                key = device_info[2][device[3]] if 0 <= device[3] < len(device_info[2]) else ""
+            index[name] = (device_info[1][device[2]], key)
+        _CAPABILITY_INDEX = index
+
+    model = model[(model.rfind(".") + 1) :]
+    if model not in _CAPABILITY_INDEX:
+        raise Exception("Unsupported Device!")
+    return _CAPABILITY_INDEX[model]
+
+
 class DreameVacuumDeviceCapability:
     def __init__(self, device) -> None:
         self.key = None
@@ -2267,22 +2328,16 @@ class DreameVacuumDeviceCapability:
         self._capability = None
         self._device = device
 
-    def load(self, device_info):
-        model = self._device.info.model[(self._device.info.model.rfind(".") + 1) :]
-        if model not in device_info[3]:
-            raise Exception("Unsupported Device!")
-        device = device_info[0][device_info[3][model]]
-        if not device or not (len(device) == 3 or len(device) == 4) or device[2] < 0:
-            raise Exception("Unsupported Device!")
-        self._capability = device_info[1][device[2]]
+    def load(self, capability: list | None = None, key: str | None = None):
+        if capability is None:
+            capability, key = device_capability(self._device.info.model)
+        self._capability = capability
         if self._capability is None:
             raise Exception("Device capability missing!")
-        if len(device) == 4:
-            if device[3] < 0 or device[3] >= len(device_info[1] or device[3] < 0):
-                raise Exception("Device key missing!")
-            self.key = device_info[2][device[3]]
-            if not self.key or len(self.key) < 1:
+        if key is not None:
+            if not key or len(key) < 1:
                 raise Exception("Device Key missing!")
+            self.key = key
 
         self.lidar_navigation = bool(self._device.get_property(DreameVacuumProperty.MAP_SAVING) is None)
         self.multi_floor_map = bool(
@@ -2433,7 +2488,37 @@ class DreameVacuumDeviceCapability:
         return self.mop_pad_swing and self._device.mop_extend_frequency.value >= 0
 
 
+_SLOT_NAMES: dict[type, tuple[str, ...]] = {}
+
+
+def fingerprint(value: Any) -> Any:
+    """Hashable representation of a map value for computing content fingerprints"""
+    if value is None or isinstance(value, (bool, int, float, str, bytes)):
+        return value
+    if isinstance(value, Segment):
+        return value.fingerprint
+    if isinstance(value, (list, tuple)):
+        return tuple(fingerprint(v) for v in value)
+    if isinstance(value, dict):
+        return frozenset((k, fingerprint(v)) for k, v in value.items())
+    if isinstance(value, (set, frozenset)):
+        return frozenset(fingerprint(v) for v in value)
+    names = _SLOT_NAMES.get(type(value))
+    if names is None:
+        names = tuple(name for cls in type(value).__mro__ for name in cls.__dict__.get("__slots__", ()))
+        _SLOT_NAMES[type(value)] = names
+    if names:
+        return (type(value).__name__, *(fingerprint(getattr(value, name, None)) for name in names))
+    try:
+        hash(value)
+        return value
+    except TypeError:
+        return id(value)
+
+
 class Point:
+    __slots__ = ("a", "x", "y")
+
     def __init__(self, x: float, y: float, a=None) -> None:
         self.x = x
         self.y = y
@@ -2496,6 +2581,8 @@ class Point:
 
 
 class Path(Point):
+    __slots__ = ("path_type",)
+
     def __init__(self, x: float, y: float, path_type: PathType) -> None:
         super().__init__(x, y)
         self.path_type = path_type
@@ -2507,7 +2594,161 @@ class Path(Point):
         return attributes
 
 
+class PathList:
+    """Compact robot path storage backed by int32 numpy columns (x, y, path type code)"""
+
+    TYPES: Final = (PathType.LINE, PathType.SWEEP, PathType.SWEEP_AND_MOP, PathType.MOP)
+    OPERATOR_CODES: Final = {"L": 0, "l": 0, "S": 1, "W": 2, "M": 3}
+    PATTERN: Final = re.compile(r"([MWSLl])(-?\d+),(-?\d+)")
+
+    def __init__(self, data=None) -> None:
+        self._data = np.zeros((16, 3), dtype=np.int32) if data is None else data
+        self._size: int = 0 if data is None else len(data)
+
+    @staticmethod
+    def parse(value: str) -> PathList:
+        """Parse path string of the map data json (tr) without creating a Path object per point"""
+        tokens = PathList.PATTERN.findall(value)
+        if not tokens:
+            return PathList()
+
+        operators, x, y = zip(*tokens, strict=True)
+        x = np.array(x, dtype=np.int64)
+        y = np.array(y, dtype=np.int64)
+        codes = np.array([PathList.OPERATOR_CODES[operator] for operator in operators], dtype=np.int32)
+        # Only "L" points are relative to the previous point, "l" points are absolute lines connected to previous frame
+        absolute = np.array([operator != "L" for operator in operators])
+        # Index of the last absolute point for every point, -1 if path starts with relative points
+        index = np.maximum.accumulate(np.where(absolute, np.arange(len(codes)), -1))
+
+        data = np.empty((len(codes), 3), dtype=np.int32)
+        for column, values in ((0, x), (1, y)):
+            total = np.cumsum(values)
+            data[:, column] = total - np.where(index >= 0, total[index] - values[index], 0)
+        data[:, 2] = codes
+        return PathList(data)
+
+    def _reserve(self, size: int) -> None:
+        if size > len(self._data):
+            data = np.zeros((max(size, len(self._data) * 2), 3), dtype=np.int32)
+            data[: self._size] = self._data[: self._size]
+            self._data = data
+
+    def append(self, point: Path) -> None:
+        self._reserve(self._size + 1)
+        self._data[self._size] = (
+            point.x,
+            point.y,
+            PathList.OPERATOR_CODES[point.path_type.value],
+        )
+        self._size = self._size + 1
+
+    def extend(self, paths: PathList | list[Path]) -> None:
+        if not isinstance(paths, PathList):
+            for point in paths:
+                self.append(point)
+            return
+
+        size = len(paths)
+        self._reserve(self._size + size)
+        self._data[self._size : self._size + size] = paths.data
+        self._size = self._size + size
+
+    def contains_type(self, *path_types: PathType) -> bool:
+        return bool(np.isin(self.types, [PathList.TYPES.index(path_type) for path_type in path_types]).any())
+
+    def runs(self) -> list[tuple[PathType, int, int]]:
+        """Split path into runs starting with a path type change, returns path type, start and end index of each run"""
+        if not self._size:
+            return []
+        starts = np.flatnonzero(self.types[1:]).tolist()
+        starts = [0] + [start + 1 for start in starts]
+        ends = starts[1:] + [self._size]
+        return [
+            (PathList.TYPES[int(self._data[start, 2])], start, end) for start, end in zip(starts, ends, strict=True)
+        ]
+
+    def to_img(self, dimensions, offset=True) -> tuple[Any, Any]:
+        """Transform all points to image coordinates at once, same as Point.to_img"""
+        left = dimensions.left
+        top = dimensions.top
+        if not offset and (left % dimensions.grid_size != 0 or top % dimensions.grid_size != 0):
+            left = left + (dimensions.grid_size / 2)
+            top = top + (dimensions.grid_size / 2)
+
+        return (
+            ((self.x - left) / dimensions.grid_size) * dimensions.scale + dimensions.padding[0] - dimensions.crop[0],
+            (((dimensions.height * dimensions.grid_size - 1) - (self.y - top)) / dimensions.grid_size)
+            * dimensions.scale
+            + dimensions.padding[1]
+            - dimensions.crop[1],
+        )
+
+    def copy(self) -> PathList:
+        return PathList(self.data.copy())
+
+    @property
+    def data(self):
+        return self._data[: self._size]
+
+    @property
+    def x(self):
+        return self._data[: self._size, 0]
+
+    @property
+    def y(self):
+        return self._data[: self._size, 1]
+
+    @property
+    def types(self):
+        return self._data[: self._size, 2]
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return PathList(self.data[index].copy())
+        x, y, code = self.data[index].tolist()
+        return Path(x, y, PathList.TYPES[code])
+
+    def __iter__(self):
+        for x, y, code in self.data.tolist():
+            yield Path(x, y, PathList.TYPES[code])
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, PathList):
+            return self._size == other._size and np.array_equal(self.data, other.data)
+        if isinstance(other, list):
+            return list(self) == other
+        return False
+
+    def __deepcopy__(self, memo) -> PathList:
+        return self.copy()
+
+    def __repr__(self) -> str:
+        return f"PathList({list(self)})"
+
+
 class Obstacle(Point):
+    __slots__ = (
+        "color_index",
+        "file_name",
+        "height",
+        "id",
+        "ignore_status",
+        "key",
+        "object_id",
+        "object_name",
+        "picture_status",
+        "pos_x",
+        "pos_y",
+        "possibility",
+        "segment",
+        "type",
+        "width",
+    )
+
     def __init__(
         self,
         x: float,
@@ -2607,6 +2848,8 @@ class Obstacle(Point):
 
 
 class Zone:
+    __slots__ = ("x0", "x1", "y0", "y1")
+
     def __init__(self, x0: float, y0: float, x1: float, y1: float) -> None:
         self.x0 = x0
         self.y0 = y0
@@ -2649,6 +2892,39 @@ class Zone:
 
 
 class Segment(Zone):
+    __slots__ = (
+        "_attributes",
+        "_fingerprint",
+        "_outline_points",
+        "carpet_cleaning",
+        "carpet_settings",
+        "cleaning_mode",
+        "cleaning_route",
+        "cleaning_times",
+        "cleanset_type",
+        "color_index",
+        "custom_mopping_route",
+        "custom_name",
+        "floor_material",
+        "floor_material_direction",
+        "floor_material_rotated_direction",
+        "icon",
+        "index",
+        "mopping_settings",
+        "name",
+        "neighbors",
+        "order",
+        "segment_id",
+        "suction_level",
+        "type",
+        "unique_id",
+        "visibility",
+        "water_volume",
+        "wetness_level",
+        "x",
+        "y",
+    )
+
     def __init__(
         self,
         segment_id: int,
@@ -2703,6 +2979,57 @@ class Segment(Zone):
         self.carpet_settings = None
         self.set_name()
 
+    def __setattr__(self, name: str, value: Any) -> None:
+        object.__setattr__(self, name, value)
+        if name != "_fingerprint" and name != "_attributes":
+            object.__setattr__(self, "_fingerprint", None)
+            object.__setattr__(self, "_attributes", None)
+
+    def __getstate__(self) -> Any:
+        state = super().__getstate__()
+        # Cached attributes are not copied, copies build them again when needed
+        state[1].pop("_attributes", None)
+        return state
+
+    @property
+    def fingerprint(self) -> int:
+        """Hash of the compared fields, computed on first use after a change"""
+        if self._fingerprint is None:
+            object.__setattr__(
+                self,
+                "_fingerprint",
+                hash(
+                    (
+                        self.x0,
+                        self.y0,
+                        self.x1,
+                        self.y1,
+                        self.x,
+                        self.y,
+                        self.name,
+                        self.index,
+                        self.type,
+                        self.color_index,
+                        self.icon,
+                        fingerprint(self.neighbors),
+                        self.order,
+                        self.cleaning_times,
+                        self.suction_level,
+                        self.water_volume,
+                        self.wetness_level,
+                        self.cleaning_mode,
+                        self.floor_material,
+                        self.floor_material_direction,
+                        self.floor_material_rotated_direction,
+                        self.mopping_settings,
+                        self.visibility,
+                        fingerprint(self.carpet_cleaning),
+                        fingerprint(self.carpet_settings),
+                    )
+                ),
+            )
+        return self._fingerprint
+
     @property
     def mop_pad_humidity(self) -> int:
         return self.water_volume
@@ -2797,6 +3124,12 @@ class Segment(Zone):
         return {v: k for k, v in list.items()}
 
     def as_dict(self) -> dict[str, Any]:
+        """Room attributes, built once until a field of the segment is replaced"""
+        if self._attributes is None:
+            object.__setattr__(self, "_attributes", self._build_attributes())
+        return self._attributes
+
+    def _build_attributes(self) -> dict[str, Any]:
         # Always include parent attributes (x, y, etc.)
         attributes = {**super(Segment, self).as_dict()}
 
@@ -2853,34 +3186,7 @@ class Segment(Zone):
         return attributes
 
     def __eq__(self: Segment, other: Segment) -> bool:
-        return not (
-            other is None
-            or self.x0 != other.x0
-            or self.y0 != other.y0
-            or self.x1 != other.x1
-            or self.y1 != other.y1
-            or self.x != other.x
-            or self.y != other.y
-            or self.name != other.name
-            or self.index != other.index
-            or self.type != other.type
-            or self.color_index != other.color_index
-            or self.icon != other.icon
-            or self.neighbors != other.neighbors
-            or self.order != other.order
-            or self.cleaning_times != other.cleaning_times
-            or self.suction_level != other.suction_level
-            or self.water_volume != other.water_volume
-            or self.wetness_level != other.wetness_level
-            or self.cleaning_mode != other.cleaning_mode
-            or self.floor_material != other.floor_material
-            or self.floor_material_direction != other.floor_material_direction
-            or self.floor_material_rotated_direction != other.floor_material_rotated_direction
-            or self.mopping_settings != other.mopping_settings
-            or self.visibility != other.visibility
-            or self.carpet_cleaning != other.carpet_cleaning
-            or self.carpet_settings != other.carpet_settings
-        )
+        return other is not None and self.fingerprint == other.fingerprint
 
     def __str__(self) -> str:
         return f"{{room_id: {self.segment_id}, outline: {self.outline}}}"
@@ -2890,6 +3196,8 @@ class Segment(Zone):
 
 
 class Wall:
+    __slots__ = ("x0", "x1", "y0", "y1")
+
     def __init__(self, x0: float, y0: float, x1: float, y1: float) -> None:
         self.x0 = x0
         self.y0 = y0
@@ -2929,6 +3237,8 @@ class Wall:
 
 
 class Area:
+    __slots__ = ("angle", "x0", "x1", "x2", "x3", "y0", "y1", "y2", "y3")
+
     def __init__(
         self,
         x0: float,
@@ -3035,6 +3345,25 @@ class Area:
 
 
 class Furniture(Point):
+    __slots__ = (
+        "angle",
+        "furniture_id",
+        "height",
+        "scale",
+        "segment_id",
+        "size_type",
+        "type",
+        "width",
+        "x0",
+        "x1",
+        "x2",
+        "x3",
+        "y0",
+        "y1",
+        "y2",
+        "y3",
+    )
+
     def __init__(
         self,
         x: float,
@@ -3118,6 +3447,8 @@ class Furniture(Point):
 
 
 class Coordinate(Point):
+    __slots__ = ("completed", "type")
+
     def __init__(self, x: float, y: float, completed: bool, type: int) -> None:
         super().__init__(x, y)
         self.type = type
@@ -3142,6 +3473,17 @@ class Coordinate(Point):
 
 
 class Carpet(Area):
+    __slots__ = (
+        "carpet_cleaning",
+        "carpet_settings",
+        "carpet_type",
+        "ellipse",
+        "id",
+        "ignored_areas",
+        "polygon",
+        "segments",
+    )
+
     def __init__(
         self,
         id: int,
@@ -3195,6 +3537,8 @@ class Carpet(Area):
 
 
 class Polygon(Area):
+    __slots__ = ("area", "hidden", "id", "ms", "polygon", "type")
+
     def __init__(
         self,
         id: int,
@@ -3389,7 +3733,7 @@ class RecoveryMapInfo:
 
     def __init__(self, map_id, date, raw_map, map_object_name, object_name, map_type) -> None:
         self.date = date
-        self.raw_map: str = raw_map
+        self.raw_map: str | bytes = raw_map
         self.map_object_name: str = map_object_name
         self.object_name: str = object_name
         self.map_data: MapData = None
@@ -3489,10 +3833,68 @@ class MapDataPartial:
         self.timestamp_ms: int | None = None  # Data json: timestamp_ms
         self.raw: bytes | None = None  # Unzipped raw map
         self.data_json: object | None = {}  # Data json
+        self.compressed: bytes | None = None  # Decrypted raw map, only available until frame is decompressed
 
 
 class MapData:
+    PIXELS: Final = "pixels"
+    GEOMETRY: Final = "geometry"
+    SEGMENTS: Final = "segments"
+    SETTINGS: Final = "settings"
+    # Fields compared by equality grouped for fingerprinting, segments fingerprint is derived from the segment objects
+    FINGERPRINT_GROUPS: Final = {
+        PIXELS: ("pixel_type",),
+        GEOMETRY: (
+            "robot_position",
+            "charger_position",
+            "router_position",
+            "no_go_areas",
+            "no_mopping_areas",
+            "carpets",
+            "ignored_carpets",
+            "detected_carpets",
+            "virtual_walls",
+            "virtual_thresholds",
+            "passable_thresholds",
+            "impassable_thresholds",
+            "ramps",
+            "low_lying_areas",
+            "curtains",
+            "active_areas",
+            "active_points",
+            "active_cruise_points",
+            "predefined_points",
+            "furnitures",
+            "saved_furnitures",
+            "obstacles",
+        ),
+        SETTINGS: (
+            "map_id",
+            "custom_name",
+            "rotation",
+            "work_status",
+            "docked",
+            "active_segments",
+            "clean_log",
+            "saved_map_status",
+            "restored_map",
+            "frame_map",
+            "temporary_map",
+            "saved_map",
+            "new_map",
+            "cleanset",
+            "sequence",
+            "carpet_cleanset",
+            "hidden_segments",
+        ),
+    }
+    FINGERPRINT_FIELDS: Final = {name: group for group, names in FINGERPRINT_GROUPS.items() for name in names}
+
     def __init__(self) -> None:
+        # Cached content fingerprints of the field groups
+        self._fingerprints: dict[str, int] = {}
+        # Last built attributes with the fingerprint and the room attributes they are built from
+        self._attributes: tuple[Any, dict[int, dict[str, Any]] | None, dict[str, Any]] | None = None
         # Header
         self.map_id: int | None = None  # Map header: map_id
         self.frame_id: int | None = None  # Map header: frame_id
@@ -3519,7 +3921,7 @@ class MapData:
         self.impassable_thresholds: list[Wall] | None = None  # Data json: vws.npthrsd
         self.ramps: list[Area] | None = None  # Data json: vws.ramp
         self.curtains: list[Wall] | None = None  # Data json: ct.line
-        self.path: Path | None = None  # Data json: tr
+        self.path: PathList | None = None  # Data json: tr
         self.active_segments: int | None = None  # Data json: sa
         self.active_areas: list[Area] | None = None  # Data json: da2
         self.active_points: list[Point] | None = None  # Data json: sp
@@ -3603,131 +4005,105 @@ class MapData:
         self.ai_furniture_warning: Any | None = None
         self.walls_info: Any | None = None
         self.walls_info_new: Any | None = None
+        # Hashes of the data json sections of the last applied frame for skipping unchanged sections on P frames
+        self.data_json_fragments: dict[str, int] | None = None
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        object.__setattr__(self, name, value)
+        group = MapData.FINGERPRINT_FIELDS.get(name)
+        if group is not None:
+            self._fingerprints.pop(group, None)
+
+    def __getstate__(self) -> dict[str, Any]:
+        state = self.__dict__.copy()
+        # Cached attributes are not copied, copies build them again when needed
+        state["_attributes"] = None
+        return state
+
+    def fingerprint(self, group: str) -> int:
+        """Content hash of a field group, cached until one of its fields is replaced or changed() is called"""
+        if group == MapData.SEGMENTS:
+            # Segments keep their own fingerprints up to date
+            return hash(fingerprint(self.segments))
+        value = self._fingerprints.get(group)
+        if value is None:
+            if group == MapData.PIXELS:
+                pixels = self.pixel_type
+                value = hash(None if pixels is None else (pixels.shape, pixels.tobytes()))
+            else:
+                value = hash(tuple(fingerprint(getattr(self, name)) for name in MapData.FINGERPRINT_GROUPS[group]))
+            self._fingerprints[group] = value
+        if group == MapData.PIXELS and self.dimensions is not None:
+            # Dimensions are updated in place by the renderer
+            dimensions = self.dimensions
+            return hash(
+                (value, dimensions.top, dimensions.left, dimensions.height, dimensions.width, dimensions.grid_size)
+            )
+        return value
 
-    def __eq__(self: MapData, other: MapData) -> bool:
-        if other is None:
-            return False
-
-        if self.map_id != other.map_id:
-            return False
-
-        if self.custom_name != other.custom_name:
-            return False
-
-        if self.rotation != other.rotation:
-            return False
-
-        if self.work_status != other.work_status:
-            return False
-
-        if self.robot_position != other.robot_position:
-            return False
-
-        if self.charger_position != other.charger_position:
-            return False
-
-        if self.no_go_areas != other.no_go_areas:
-            return False
-
-        if self.no_mopping_areas != other.no_mopping_areas:
-            return False
-
-        if self.carpets != other.carpets:
-            return False
-
-        if self.ignored_carpets != other.ignored_carpets:
-            return False
-
-        if self.detected_carpets != other.detected_carpets:
-            return False
-
-        if self.virtual_walls != other.virtual_walls:
-            return False
-
-        if self.virtual_thresholds != other.virtual_thresholds:
-            return False
-
-        if self.passable_thresholds != other.passable_thresholds:
-            return False
-
-        if self.impassable_thresholds != other.impassable_thresholds:
-            return False
-
-        if self.ramps != other.ramps:
-            return False
-
-        if self.low_lying_areas != other.low_lying_areas:
-            return False
-
-        if self.curtains != other.curtains:
-            return False
-
-        if self.docked != other.docked:
-            return False
-
-        if self.active_segments != other.active_segments:
-            return False
-
-        if self.active_areas != other.active_areas:
-            return False
-
-        if self.active_points != other.active_points:
-            return False
-
-        if self.active_cruise_points != other.active_cruise_points:
-            return False
-
-        if self.clean_log != other.clean_log:
-            return False
-
-        if self.saved_map_status != other.saved_map_status:
-            return False
-
-        if self.restored_map != other.restored_map:
-            return False
-
-        if self.frame_map != other.frame_map:
-            return False
-
-        if self.temporary_map != other.temporary_map:
-            return False
-
-        if self.saved_map != other.saved_map:
-            return False
-
-        if self.new_map != other.new_map:
-            return False
-
-        if self.cleanset != other.cleanset:
-            return False
-
-        if self.sequence != other.sequence:
-            return False
-
-        if self.carpet_cleanset != other.carpet_cleanset:
-            return False
-
-        if self.furnitures != other.furnitures:
-            return False
-
-        if self.saved_furnitures != other.saved_furnitures:
-            return False
-
-        if self.obstacles != other.obstacles:
-            return False
-
-        if self.predefined_points != other.predefined_points:
-            return False
-
-        if self.router_position != other.router_position:
-            return False
+    def changed(self, *groups: str) -> None:
+        """Drop cached fingerprints after fields are modified in place"""
+        if groups:
+            for group in groups:
+                self._fingerprints.pop(group, None)
+        else:
+            self._fingerprints.clear()
 
-        if self.hidden_segments != other.hidden_segments:
-            return False
+    def changes(self, other: MapData | None, groups: tuple[str, ...] | None = None) -> set[str]:
+        """Field groups whose content differs from the other map data"""
+        if groups is None:
+            groups = (MapData.PIXELS, MapData.GEOMETRY, MapData.SEGMENTS, MapData.SETTINGS)
+        if other is None:
+            return set(groups)
+        return {group for group in groups if self.fingerprint(group) != other.fingerprint(group)}
 
-        return True
+    def __eq__(self: MapData, other: MapData) -> bool:
+        return (
+            other is not None
+            and self.fingerprint(MapData.SETTINGS) == other.fingerprint(MapData.SETTINGS)
+            and self.fingerprint(MapData.GEOMETRY) == other.fingerprint(MapData.GEOMETRY)
+        )
 
     def as_dict(self) -> dict[str, Any]:
+        """Map attributes, reused while the map fields and the room attributes are unchanged.
+        Returned dictionary is shared and needs to be copied before it is modified.
+        """
+        rooms = None
+        if self.segments is not None and (self.saved_map or self.saved_map_status == 2 or self.restored_map):
+            rooms = {k: v.as_dict() for k, v in sorted(self.segments.items())}
+        recovery_maps = None
+        if self.recovery_map_list:
+            recovery_maps = [v.as_dict() for v in reversed(self.recovery_map_list)]
+
+        key = (
+            self.fingerprint(MapData.GEOMETRY),
+            self.fingerprint(MapData.SETTINGS),
+            fingerprint(
+                (
+                    self.frame_id,
+                    self.last_updated,
+                    self.saved_map_id,
+                    self.map_name,
+                    self.map_index,
+                    self.empty_map,
+                    self.optimized_charger_position,
+                    self.startup_method,
+                    self.dust_collection_count,
+                    self.mop_wash_count,
+                    recovery_maps,
+                )
+            ),
+        )
+        attributes = self._attributes
+        # Room attributes are compared by identity first, they are only rebuilt when a segment is changed
+        if attributes is None or attributes[0] != key or attributes[1] != rooms:
+            attributes = (key, rooms, self._build_attributes(rooms, recovery_maps))
+            self._attributes = attributes
+        return attributes[2]
+
+    def _build_attributes(
+        self, rooms: dict[int, dict[str, Any]] | None, recovery_maps: list[dict[str, Any]] | None
+    ) -> dict[str, Any]:
         attributes_list = {}
         if self.charger_position is not None:
             attributes_list[ATTR_CHARGER] = (
@@ -3737,8 +4113,8 @@ class MapData:
             )
         if self.custom_name is not None:
             attributes_list[ATTR_CUSTOM_NAME] = self.custom_name
-        if self.segments is not None and (self.saved_map or self.saved_map_status == 2 or self.restored_map):
-            attributes_list[ATTR_ROOMS] = {k: v.as_dict() for k, v in sorted(self.segments.items())}
+        if rooms is not None:
+            attributes_list[ATTR_ROOMS] = rooms
         if not self.saved_map and self.robot_position is not None:
             attributes_list[ATTR_ROBOT_POSITION] = self.robot_position
         if self.map_id:
@@ -3805,8 +4181,8 @@ class MapData:
             attributes_list[ATTR_DUST_COLLECTION_COUNT] = self.dust_collection_count
         if self.mop_wash_count:
             attributes_list[ATTR_MOP_WASH_COUNT] = self.mop_wash_count
-        if self.recovery_map_list:
-            attributes_list[ATTR_RECOVERY_MAP_LIST] = [v.as_dict() for v in reversed(self.recovery_map_list)]
+        if recovery_maps:
+            attributes_list[ATTR_RECOVERY_MAP_LIST] = recovery_maps
         return attributes_list
 
     def check_point(self, x, y, absolute=False) -> bool:
@@ -3826,6 +4202,16 @@ class DirtyData:
     update_time: float = None
 
 
+@dataclass
+class PropertyRoute:
+    prop: DreameVacuumProperty = None
+    default: bool = False  # Handled as a device property
+    map: bool = False  # Forwarded to the map manager
+    silent: bool = False  # Changes do not trigger the external update listener
+    custom: bool = False  # JSON or custom value, changes are not logged
+    callbacks: list = None  # Property update callbacks
+
+
 @dataclass
 class Shortcut:
     id: int = -1
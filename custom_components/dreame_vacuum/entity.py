@@ -3,6 +3,7 @@ from __future__ import annotations
 from collections.abc import Callable
 from dataclasses import dataclass
 from functools import partial
+import time
 from typing import Any
 
 from homeassistant.core import callback
@@ -31,6 +32,33 @@ from .dreame import (
 )
 from .dreame.const import ATTR_VALUE
 
+# Entities are written on every update after this interval even when their dependencies are not changed
+FULL_REFRESH_INTERVAL = 60
+
+# Description functions that read device state, dependencies of entities using them cannot be inferred
+CUSTOM_STATE_FUNCTIONS = (
+    "value_fn",
+    "value_int_fn",
+    "format_fn",
+    "icon_fn",
+    "name_fn",
+    "attrs_fn",
+    "options",
+    "max_value_fn",
+    "min_value_fn",
+)
+
+# Properties that most of the derived values and availability checks depend on
+COMMON_DEPENDENCIES = {
+    DreameVacuumProperty.STATE.value,
+    DreameVacuumProperty.STATUS.value,
+    DreameVacuumProperty.TASK_STATUS.value,
+    DreameVacuumProperty.CHARGING_STATUS.value,
+    DreameVacuumProperty.SELF_WASH_BASE_STATUS.value,
+    DreameVacuumProperty.WATER_TANK.value,
+    DreameVacuumProperty.ERROR.value,
+}
+
 
 @dataclass
 class DreameVacuumEntityDescription:
@@ -66,6 +94,8 @@ class DreameVacuumEntityDescription:
     icon_fn: Callable[[str, object], str] = None
     name_fn: Callable[[str, object], str] = None
     attrs_fn: Callable[[object, dict]] = None
+    # Properties the entity state depends on, inferred from property_key only when the state is the raw property value
+    depends_on: set[int] | None = None
 
 
 class DreameVacuumEntity(CoordinatorEntity[DreameVacuumDataUpdateCoordinator]):
@@ -117,6 +147,22 @@ class DreameVacuumEntity(CoordinatorEntity[DreameVacuumDataUpdateCoordinator]):
                     elif description.key in ACTION_AVAILABILITY:
                         description.available_fn = ACTION_AVAILABILITY[description.key]
 
+            # Derived status values and custom functions read other properties, their dependencies cannot be inferred
+            if (
+                description.depends_on is None
+                and description.property_key is not None
+                and all(getattr(description, fn, None) is None for fn in CUSTOM_STATE_FUNCTIONS)
+            ):
+                if isinstance(description.property_key, DreameVacuumProperty):
+                    depends_on = description.property_key.value
+                elif isinstance(description.property_key, DreameVacuumAutoSwitchProperty):
+                    depends_on = DreameVacuumProperty.AUTO_SWITCH_SETTINGS.value
+                else:
+                    depends_on = DreameVacuumProperty.AI_DETECTION.value
+                description.depends_on = COMMON_DEPENDENCIES | {depends_on}
+
+        self._last_state_write: float = 0
+        self._last_available: bool = None
         super().__init__(coordinator=coordinator)
         if description:
             if description.key is not None:
@@ -142,8 +188,28 @@ class DreameVacuumEntity(CoordinatorEntity[DreameVacuumDataUpdateCoordinator]):
                 format, f"{self.device.name} {self.entity_description.key}", hass=self.coordinator.hass
             )
 
+    def _state_changed(self) -> bool:
+        """Whether any of the entity dependencies are changed since the last written state"""
+        now = time.monotonic()
+        changed = self.coordinator.changed_properties
+        depends_on = self.entity_description.depends_on if self.entity_description else None
+        available = self.available
+        if (
+            changed is None
+            or depends_on is None
+            or not changed.isdisjoint(depends_on)
+            or available != self._last_available
+            or now - self._last_state_write >= FULL_REFRESH_INTERVAL
+        ):
+            self._last_state_write = now
+            self._last_available = available
+            return True
+        return False
+
     @callback
     def _handle_coordinator_update(self) -> None:
+        if not self._state_changed():
+            return
         self._set_id()
         self.async_write_ha_state()
 
@@ -181,7 +247,7 @@ class DreameVacuumEntity(CoordinatorEntity[DreameVacuumDataUpdateCoordinator]):
     @property
     def available(self) -> bool:
         """Return True if entity is available."""
-        if not self.device.device_connected:
+        if not self.device.device_connected and not self.device.stale:
             return False
 
         if self.entity_description.available_fn is not None:
@@ -1122,7 +1122,9 @@ class DreameVacuumSegmentSelectEntity(DreameVacuumEntity, SelectEntity):
     @property
     def available(self) -> bool:
         """Return True if entity is available."""
-        if not self.device.device_connected or (self._attr_available and self.segment is None):
+        if (not self.device.device_connected and not self.device.stale) or (
+            self._attr_available and self.segment is None
+        ):
             return False
         if self.entity_description.segment_available_fn is not None:
             return self.entity_description.segment_available_fn(self.device, self.segment)
@@ -777,7 +777,7 @@ class DreameVacuum(DreameVacuumEntity, StateVacuumEntity):
     @property
     def available(self) -> bool:
         """Return True if entity is available."""
-        return self._attr_available and self.device.device_connected
+        return self._attr_available and (self.device.device_connected or self.device.stale)
 
     async def async_locate(self, **kwargs) -> None:
         """Locate the vacuum cleaner."""
@@ -0,0 +1,144 @@
+"""
+Memory footprint of decoded maps.
+
+Decodes recorded map payloads and reports the bytes retained per MapData with
+the slotted geometry types and with the same objects stored in instance
+dictionaries, which is how they were laid out before.
+
+Usage: python scripts/benchmark_map_memory.py [--vslam] [--key KEY] MAP_FILE [MAP_FILE ...]
+
+Map files contain the raw map payload as received from the device (text) or
+a downloaded saved map file (binary).
+"""
+
+from __future__ import annotations
+
+import argparse
+import copy
+import gc
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "custom_components", "dreame_vacuum"))
+
+from dreame.map import DreameVacuumMapDecoder
+from dreame.types import Area, MapData, Point, Wall, Zone
+
+GEOMETRY_TYPES = (Point, Zone, Wall, Area)
+
+
+class _DictBacked:
+    """Plain object that keeps the attributes of a geometry object in its instance dictionary"""
+
+
+def _slot_values(obj) -> dict:
+    values = {}
+    for cls in type(obj).__mro__:
+        for name in cls.__dict__.get("__slots__", ()):
+            if hasattr(obj, name):
+                values[name] = getattr(obj, name)
+    return values
+
+
+def _dict_backed(value, memo: dict):
+    """Copy of a value where every geometry object is replaced with a dictionary backed equivalent"""
+    key = id(value)
+    if key in memo:
+        return memo[key]
+    if isinstance(value, GEOMETRY_TYPES):
+        result = _DictBacked()
+        memo[key] = result
+        result.__dict__.update({k: _dict_backed(v, memo) for k, v in _slot_values(value).items()})
+    elif isinstance(value, list):
+        result = [_dict_backed(v, memo) for v in value]
+    elif isinstance(value, dict):
+        result = {k: _dict_backed(v, memo) for k, v in value.items()}
+    elif isinstance(value, MapData):
+        result = copy.copy(value)
+        memo[key] = result
+        for k, v in vars(value).items():
+            setattr(result, k, _dict_backed(v, memo))
+        return result
+    else:
+        return value
+    memo[key] = result
+    return result
+
+
+def _retained(factory) -> tuple[int, object]:
+    """Bytes still allocated after building an object"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        start = tracemalloc.get_traced_memory()[0]
+        result = factory()
+        gc.collect()
+        return tracemalloc.get_traced_memory()[0] - start, result
+    finally:
+        tracemalloc.stop()
+
+
+def _count(value, seen: set) -> int:
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+    if isinstance(value, GEOMETRY_TYPES):
+        return 1 + sum(_count(v, seen) for v in _slot_values(value).values())
+    if isinstance(value, (list, tuple)):
+        return sum(_count(v, seen) for v in value)
+    if isinstance(value, dict):
+        return sum(_count(v, seen) for v in value.values())
+    if isinstance(value, MapData):
+        return sum(_count(v, seen) for v in vars(value).values())
+    return 0
+
+
+def _read(path: str) -> str | bytes:
+    with open(path, "rb") as file:
+        data = file.read()
+    try:
+        return data.decode("ascii").strip()
+    except UnicodeDecodeError:
+        return data
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("files", nargs="+", metavar="MAP_FILE")
+    parser.add_argument("--vslam", action="store_true", help="maps are recorded from a vslam device")
+    parser.add_argument("--key", default=None, help="map encryption key")
+    args = parser.parse_args()
+
+    total_before = 0
+    total_after = 0
+    decoded = 0
+    print(f"{'map':<40} {'objects':>8} {'before':>10} {'after':>10} {'saved':>7}")
+    for path in args.files:
+        map_data = DreameVacuumMapDecoder.decode_map(_read(path), args.vslam, key=args.key)[0]
+        if map_data is None:
+            print(f"{os.path.basename(path):<40} decoding failed")
+            continue
+
+        after, _ = _retained(lambda source=map_data: copy.deepcopy(source))
+        before, _ = _retained(lambda source=_dict_backed(map_data, {}): copy.deepcopy(source))
+
+        total_before = total_before + before
+        total_after = total_after + after
+        decoded = decoded + 1
+        print(
+            f"{os.path.basename(path):<40} {_count(map_data, set()):>8} {before:>10} {after:>10}"
+            f" {(1 - after / before) * 100 if before else 0:>6.1f}%"
+        )
+
+    if not decoded:
+        return 1
+    print(
+        f"{'bytes per MapData':<40} {'':>8} {total_before // decoded:>10} {total_after // decoded:>10}"
+        f" {(1 - total_after / total_before) * 100 if total_before else 0:>6.1f}%"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
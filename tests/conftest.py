@@ -0,0 +1,11 @@
+"""Shared test setup."""
+
+import os
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+# Integration modules are imported from the custom_components package
+sys.path.append(ROOT)
+# Library modules are imported as the dreame package, appended so the platform modules do not shadow the stdlib
+sys.path.append(os.path.join(ROOT, "custom_components", "dreame_vacuum"))
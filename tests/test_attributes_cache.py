@@ -0,0 +1,48 @@
+"""Tests for reusing state attributes while their inputs are unchanged."""
+
+from datetime import UTC, datetime
+from types import SimpleNamespace
+
+from dreame.types import MapData, Point, Segment
+import pytest
+
+
+def create_map_data():
+    map_data = MapData()
+    map_data.map_id = 1
+    map_data.saved_map = True
+    map_data.robot_position = Point(100, 200)
+    map_data.charger_position = Point(0, 0)
+    map_data.segments = {1: Segment(1, 0, 0, 500, 500, name="Living Room")}
+    return map_data
+
+
+def test_map_attributes_are_reused():
+    map_data = create_map_data()
+    attributes = map_data.as_dict()
+    assert map_data.as_dict() is attributes
+
+
+def test_map_attributes_are_rebuilt_after_changes():
+    map_data = create_map_data()
+    attributes = map_data.as_dict()
+    map_data.charger_position = Point(10, 0)
+    changed = map_data.as_dict()
+    assert changed is not attributes
+    assert changed != attributes
+
+    map_data.segments[1].name = "Kitchen"
+    assert map_data.as_dict() is not changed
+
+
+def test_camera_history_key():
+    pytest.importorskip("homeassistant")
+    from custom_components.dreame_vacuum.camera import DreameVacuumCameraEntity
+
+    history = [SimpleNamespace(date=datetime(2026, 1, day, tzinfo=UTC)) for day in (3, 2, 1)]
+    key = DreameVacuumCameraEntity._history_key(history)
+    assert key == (3, datetime(2026, 1, 3, tzinfo=UTC), datetime(2026, 1, 1, tzinfo=UTC))
+    assert DreameVacuumCameraEntity._history_key(list(history)) == key
+    assert DreameVacuumCameraEntity._history_key(history[:2]) != key
+    assert DreameVacuumCameraEntity._history_key([]) == (0, None, None)
+    assert DreameVacuumCameraEntity._history_key(None) is None
@@ -0,0 +1,94 @@
+"""Tests for the cloud object cache."""
+
+import os
+
+from dreame.cache import DreameVacuumObjectCache
+
+
+class Decoded:
+    def __init__(self, value):
+        self.value = value
+
+
+def test_memory_hit_and_miss():
+    cache = DreameVacuumObjectCache()
+    assert cache.get("map/1") is None
+    cache.set("map/1", b"data")
+    assert cache.get("map/1") == b"data"
+    assert cache.get("map/1", "key") is None
+
+    stats = cache.stats
+    assert stats["hits"] == 1
+    assert stats["misses"] == 2
+    assert stats["memory_items"] == 1
+    assert stats["memory_bytes"] == 4
+
+
+def test_memory_eviction_keeps_recently_used():
+    cache = DreameVacuumObjectCache(max_memory_bytes=8)
+    cache.set("a", b"aaaa")
+    cache.set("b", b"bbbb")
+    assert cache.get("a") == b"aaaa"
+    cache.set("c", b"cccc")
+    assert cache.contains("a")
+    assert not cache.contains("b")
+    assert cache.contains("c")
+
+
+def test_disk_persistence(tmp_path):
+    cache = DreameVacuumObjectCache(str(tmp_path))
+    cache.set("map/1", b"data", "key")
+    assert len(os.listdir(tmp_path)) == 1
+
+    cache = DreameVacuumObjectCache(str(tmp_path))
+    assert cache.contains("map/1", "key")
+    assert cache.size("map/1", "key") == 4
+    assert cache.get("map/1", "key") == b"data"
+    assert cache.stats["disk_hits"] == 1
+
+    cache.clear()
+    assert not os.listdir(tmp_path)
+    assert cache.get("map/1", "key") is None
+
+
+def test_disk_eviction(tmp_path):
+    cache = DreameVacuumObjectCache(str(tmp_path), max_disk_bytes=8)
+    cache.set("a", b"aaaa")
+    cache.set("b", b"bbbb")
+    cache.set("c", b"cccc")
+    assert cache.stats["disk_items"] == 2
+    assert not DreameVacuumObjectCache(str(tmp_path)).contains("a")
+
+
+def test_expired_items_are_dropped():
+    cache = DreameVacuumObjectCache(max_age=-1)
+    cache.set("a", b"aaaa")
+    assert cache.get("a") is None
+    assert not cache.contains("a")
+
+
+def test_decoded_objects_are_copied():
+    cache = DreameVacuumObjectCache()
+    decoded = Decoded([1, 2])
+    cache.set_decoded("map/1", decoded)
+    assert cache.get_decoded("map/1") is None
+
+    cache.set("map/1", b"data")
+    cache.set_decoded("map/1", decoded)
+    decoded.value.append(3)
+
+    first = cache.get_decoded("map/1")
+    assert first is not decoded
+    assert first.value == [1, 2]
+    first.value.append(4)
+    assert cache.get_decoded("map/1").value == [1, 2]
+    assert cache.contains("map/1", decoded=True)
+
+
+def test_decoded_objects_are_dropped_with_contents():
+    cache = DreameVacuumObjectCache(max_memory_bytes=4, max_decoded_items=1)
+    cache.set("a", b"aaaa")
+    cache.set_decoded("a", Decoded(1))
+    cache.set("b", b"bbbb")
+    assert not cache.contains("a", decoded=True)
+    assert cache.get_decoded("a") is None
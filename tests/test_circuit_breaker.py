@@ -0,0 +1,62 @@
+"""Tests for the transport circuit breaker."""
+
+import random
+import time
+
+from dreame.protocol import DreameVacuumCircuitBreaker
+
+
+def test_opens_after_threshold(monkeypatch):
+    monkeypatch.setattr(random, "uniform", lambda a, b: 1)
+    breaker = DreameVacuumCircuitBreaker("test", failure_threshold=3, min_backoff=60)
+    for _ in range(2):
+        breaker.failure()
+        assert breaker.allow()
+        assert breaker.state == DreameVacuumCircuitBreaker.CLOSED
+    assert breaker.retry_in == 0
+
+    breaker.failure()
+    assert breaker.open
+    assert not breaker.allow()
+    assert 59 < breaker.retry_in <= 60
+
+
+def test_single_probe_when_half_open():
+    breaker = DreameVacuumCircuitBreaker("test", failure_threshold=1, min_backoff=0.01)
+    breaker.failure()
+    time.sleep(0.02)
+    assert breaker.state == DreameVacuumCircuitBreaker.HALF_OPEN
+    assert not breaker.open
+    assert breaker.allow()
+    assert not breaker.allow()
+
+    breaker.success()
+    assert breaker.state == DreameVacuumCircuitBreaker.CLOSED
+    assert breaker.allow()
+
+
+def test_failed_probe_doubles_backoff(monkeypatch):
+    monkeypatch.setattr(random, "uniform", lambda a, b: 1)
+    breaker = DreameVacuumCircuitBreaker("test", failure_threshold=1, min_backoff=0.01, max_backoff=0.03)
+    breaker.failure()
+    assert breaker._backoff == 0.01
+    time.sleep(0.02)
+    assert breaker.allow()
+    breaker.failure()
+    assert breaker.open
+    assert breaker._backoff == 0.02
+    breaker.failure()
+    assert breaker._backoff == 0.03
+
+
+def test_success_resets_failures():
+    breaker = DreameVacuumCircuitBreaker("test", failure_threshold=2)
+    breaker.failure()
+    breaker.success()
+    breaker.failure()
+    assert breaker.state == DreameVacuumCircuitBreaker.CLOSED
+
+
+def test_retry_delay(monkeypatch):
+    monkeypatch.setattr(random, "uniform", lambda a, b: 1)
+    assert [DreameVacuumCircuitBreaker.retry_delay(attempt) for attempt in range(6)] == [0.5, 0.5, 1, 2, 4, 4]
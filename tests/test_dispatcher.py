@@ -0,0 +1,81 @@
+"""Tests for the batched change notifications."""
+
+from threading import Event
+import time
+
+from dreame.dispatcher import CHANGE_INFO, CHANGE_MAP, CHANGE_PROPERTY, DreameVacuumDispatcher
+
+
+class Listener:
+    def __init__(self):
+        self.changes = []
+        self.called = Event()
+
+    def __call__(self, changes):
+        self.changes.append(changes)
+        self.called.set()
+
+    def wait(self):
+        assert self.called.wait(5)
+        self.called.clear()
+
+
+def test_changes_are_coalesced():
+    listener = Listener()
+    dispatcher = DreameVacuumDispatcher(listener, window=0.05)
+    dispatcher.notify(delay=False)
+    listener.wait()
+    dispatcher.record(1)
+    dispatcher.notify(partial=True)
+    dispatcher.record(2)
+    dispatcher.notify(CHANGE_MAP, partial=True)
+    listener.wait()
+    dispatcher.stop()
+
+    assert len(listener.changes) == 2
+    assert listener.changes[1].types == {CHANGE_PROPERTY, CHANGE_MAP}
+    assert listener.changes[1].properties == {1, 2}
+
+
+def test_full_notification_refreshes_everything():
+    listener = Listener()
+    dispatcher = DreameVacuumDispatcher(listener, window=0.05)
+    dispatcher.record(1)
+    dispatcher.notify(partial=True)
+    dispatcher.notify(CHANGE_INFO)
+    listener.wait()
+    dispatcher.stop()
+    assert listener.changes[0].properties is None
+
+
+def test_first_batch_refreshes_everything():
+    listener = Listener()
+    dispatcher = DreameVacuumDispatcher(listener, window=0.01)
+    dispatcher.record(1)
+    dispatcher.notify(partial=True)
+    listener.wait()
+    dispatcher.record(2)
+    dispatcher.notify(partial=True)
+    listener.wait()
+    dispatcher.stop()
+    assert listener.changes[0].properties is None
+    assert listener.changes[1].properties == {2}
+
+
+def test_notification_without_delay_is_delivered_at_once():
+    listener = Listener()
+    dispatcher = DreameVacuumDispatcher(listener, window=10)
+    start = time.monotonic()
+    dispatcher.notify(delay=False)
+    listener.wait()
+    dispatcher.stop()
+    assert time.monotonic() - start < 5
+
+
+def test_stop_delivers_pending_changes():
+    listener = Listener()
+    dispatcher = DreameVacuumDispatcher(listener, window=10)
+    dispatcher.notify()
+    dispatcher.stop()
+    listener.wait()
+    assert len(listener.changes) == 1
@@ -0,0 +1,85 @@
+"""Tests for skipping state writes of entities whose dependencies did not change."""
+
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from custom_components.dreame_vacuum.dreame.const import DreameVacuumAutoSwitchProperty, DreameVacuumProperty
+from custom_components.dreame_vacuum.entity import COMMON_DEPENDENCIES, DreameVacuumEntity
+from custom_components.dreame_vacuum.sensor import DreameVacuumSensorEntityDescription
+
+
+def create_entity(description, changed_properties=None):
+    if description.available_fn is None:
+        description.available_fn = lambda device: True
+    device = SimpleNamespace(
+        # Derived status value reading other properties
+        status=SimpleNamespace(water_volume="low"),
+        mac="00:00:00:00:00:00",
+        name="Vacuum",
+        device_connected=True,
+        stale=False,
+        get_property=lambda key: 1,
+    )
+    coordinator = SimpleNamespace(device=device, changed_properties=changed_properties)
+    return DreameVacuumEntity(coordinator, description)
+
+
+def test_raw_property_dependencies_are_inferred():
+    entity = create_entity(DreameVacuumSensorEntityDescription(property_key=DreameVacuumProperty.CLEANING_TIME))
+    description = entity.entity_description
+    assert description.value_fn is None
+    assert description.depends_on == COMMON_DEPENDENCIES | {DreameVacuumProperty.CLEANING_TIME.value}
+
+
+def test_settings_property_dependencies_are_inferred():
+    entity = create_entity(
+        DreameVacuumSensorEntityDescription(property_key=DreameVacuumAutoSwitchProperty.AUTO_DRYING, key="drying")
+    )
+    assert DreameVacuumProperty.AUTO_SWITCH_SETTINGS.value in entity.entity_description.depends_on
+
+
+def test_derived_status_dependencies_are_not_inferred():
+    entity = create_entity(DreameVacuumSensorEntityDescription(property_key=DreameVacuumProperty.WATER_VOLUME))
+    description = entity.entity_description
+    assert description.value_fn is not None
+    assert entity.native_value == "low"
+    assert description.depends_on is None
+
+
+def test_custom_function_dependencies_are_not_inferred():
+    entity = create_entity(
+        DreameVacuumSensorEntityDescription(
+            property_key=DreameVacuumProperty.CLEANING_TIME, icon_fn=lambda value, device: "mdi:timer"
+        )
+    )
+    assert entity.entity_description.depends_on is None
+
+
+def test_declared_dependencies_are_kept():
+    entity = create_entity(
+        DreameVacuumSensorEntityDescription(
+            property_key=DreameVacuumProperty.WATER_VOLUME, depends_on={DreameVacuumProperty.STATE.value}
+        )
+    )
+    assert entity.entity_description.depends_on == {DreameVacuumProperty.STATE.value}
+
+
+def test_state_is_written_only_when_dependencies_change():
+    entity = create_entity(DreameVacuumSensorEntityDescription(property_key=DreameVacuumProperty.CLEANING_TIME))
+    assert entity._state_changed()
+
+    entity.coordinator.changed_properties = {DreameVacuumProperty.CLEANED_AREA.value}
+    assert not entity._state_changed()
+    entity.coordinator.changed_properties = {DreameVacuumProperty.CLEANING_TIME.value}
+    assert entity._state_changed()
+    entity.coordinator.changed_properties = None
+    assert entity._state_changed()
+
+
+def test_entities_without_dependencies_are_always_written():
+    entity = create_entity(DreameVacuumSensorEntityDescription(property_key=DreameVacuumProperty.WATER_VOLUME), set())
+    assert entity._state_changed()
+    assert entity._state_changed()
@@ -0,0 +1,74 @@
+"""Tests for the local cleaning history store."""
+
+import json
+
+from dreame.history import HISTORY_STORE_VERSION, DreameVacuumHistoryStore
+
+
+class History:
+    def __init__(self, payload):
+        self.payload = payload
+
+
+def test_history_is_newest_first_and_limited():
+    store = DreameVacuumHistoryStore()
+    assert store.latest is None
+    assert store.add({1: "a", 3: "c", 2: "b"})
+    assert store.latest == 3
+    assert [item.payload for item in store.history(History)] == ["c", "b", "a"]
+    assert [item.payload for item in store.history(History, 2)] == ["c", "b"]
+
+
+def test_objects_are_created_once():
+    store = DreameVacuumHistoryStore()
+    store.add({1: "a", 2: "b"})
+    created = []
+
+    def factory(payload):
+        created.append(payload)
+        return History(payload)
+
+    first = store.history(factory)
+    second = store.history(factory)
+    assert created == ["b", "a"]
+    assert first[0] is second[0]
+
+    assert not store.add({1: "a"})
+    assert store.add({1: "updated"})
+    assert [item.payload for item in store.history(factory)] == ["b", "updated"]
+    assert created == ["b", "a", "updated"]
+
+
+def test_invalid_events_are_skipped():
+    store = DreameVacuumHistoryStore()
+    store.add({1: "a", 2: "invalid"})
+
+    def factory(payload):
+        if payload == "invalid":
+            raise ValueError(payload)
+        return History(payload)
+
+    assert [item.payload for item in store.history(factory)] == ["a"]
+
+
+def test_oldest_events_are_dropped():
+    store = DreameVacuumHistoryStore(max_items=2)
+    store.add({1: "a", 2: "b", 3: "c"})
+    assert [item.payload for item in store.history(History)] == ["c", "b"]
+
+
+def test_events_are_persisted(tmp_path):
+    path = str(tmp_path / "history" / "cleaning.json")
+    DreameVacuumHistoryStore(path).add({1: "a", 2: "b"})
+    with open(path, encoding="utf-8") as file:
+        assert json.load(file) == {"version": HISTORY_STORE_VERSION, "events": {"1": "a", "2": "b"}}
+
+    store = DreameVacuumHistoryStore(path)
+    assert store.latest == 2
+    assert [item.payload for item in store.history(History)] == ["b", "a"]
+
+
+def test_other_store_versions_are_ignored(tmp_path):
+    path = tmp_path / "cleaning.json"
+    path.write_text(json.dumps({"version": HISTORY_STORE_VERSION + 1, "events": {"1": "a"}}), encoding="utf-8")
+    assert DreameVacuumHistoryStore(str(path)).latest is None
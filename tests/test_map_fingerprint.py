@@ -0,0 +1,71 @@
+"""Tests for the map data content fingerprints."""
+
+import copy
+
+from dreame.types import Area, MapData, Point, Segment
+import numpy as np
+
+
+def create_map_data():
+    map_data = MapData()
+    map_data.map_id = 1
+    map_data.robot_position = Point(100, 200)
+    map_data.no_go_areas = [Area(0, 0, 100, 0, 100, 100, 0, 100)]
+    map_data.segments = {1: Segment(1, 0, 0, 500, 500, name="Living Room")}
+    map_data.pixel_type = np.zeros((4, 4), dtype=np.uint8)
+    return map_data
+
+
+def test_equal_contents_have_equal_fingerprints():
+    map_data = create_map_data()
+    other = create_map_data()
+    assert not map_data.changes(other)
+    assert map_data == other
+    assert map_data.changes(None) == {MapData.PIXELS, MapData.GEOMETRY, MapData.SEGMENTS, MapData.SETTINGS}
+
+
+def test_replaced_fields_change_their_group():
+    map_data = create_map_data()
+    other = create_map_data()
+    map_data.robot_position = Point(101, 200)
+    assert map_data.changes(other) == {MapData.GEOMETRY}
+
+    map_data = create_map_data()
+    map_data.map_id = 2
+    assert map_data.changes(other) == {MapData.SETTINGS}
+    assert map_data != other
+
+
+def test_in_place_changes_need_changed():
+    map_data = create_map_data()
+    other = create_map_data()
+    map_data.fingerprint(MapData.GEOMETRY)
+    map_data.no_go_areas.append(Area(200, 200, 300, 200, 300, 300, 200, 300))
+    assert not map_data.changes(other, (MapData.GEOMETRY,))
+    map_data.changed(MapData.GEOMETRY)
+    assert map_data.changes(other) == {MapData.GEOMETRY}
+
+
+def test_pixel_changes():
+    map_data = create_map_data()
+    other = create_map_data()
+    map_data.pixel_type[1, 1] = 1
+    map_data.changed(MapData.PIXELS)
+    assert map_data.changes(other) == {MapData.PIXELS}
+
+
+def test_segment_changes_are_tracked_by_segments():
+    map_data = create_map_data()
+    other = create_map_data()
+    map_data.fingerprint(MapData.SEGMENTS)
+    map_data.segments[1].name = "Kitchen"
+    assert map_data.changes(other) == {MapData.SEGMENTS}
+
+
+def test_copies_have_equal_fingerprints():
+    map_data = create_map_data()
+    map_data.fingerprint(MapData.GEOMETRY)
+    copied = copy.deepcopy(map_data)
+    assert not copied.changes(map_data)
+    copied.segments[1].name = "Kitchen"
+    assert copied.changes(map_data) == {MapData.SEGMENTS}
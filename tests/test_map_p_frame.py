@@ -0,0 +1,83 @@
+"""Tests for skipping unchanged data json sections of P frames."""
+
+import struct
+
+from dreame.map import DreameVacuumMapDecoder
+from dreame.types import MapDataPartial, MapFrameType, Obstacle, Segment
+
+OBSTACLES = [["100", "200", "142", "0.9", "1"]]
+
+
+def create_partial(frame_type, frame_id, data_json):
+    partial = MapDataPartial()
+    partial.map_id = 1
+    partial.frame_id = frame_id
+    partial.frame_type = frame_type.value
+    partial.timestamp_ms = 1000 + frame_id
+    # Header of an empty frame with robot position, charger position and grid size
+    partial.raw = struct.pack(
+        "<hhBhhhhhhhhhhh", 1, frame_id, frame_type.value, 100, 200, 0, 300, 400, 0, 50, 0, 0, 0, 0
+    )
+    partial.data_json = data_json
+    return partial
+
+
+def decode_i_frame(data_json):
+    map_data, _ = DreameVacuumMapDecoder.decode_map_data_from_partial(
+        create_partial(MapFrameType.I, 1, data_json), False
+    )
+    return map_data
+
+
+def test_section_hashes_are_stored():
+    map_data = decode_i_frame({"ai_obstacle": OBSTACLES})
+    assert list(map_data.data_json_fragments) == ["ai_obstacle"]
+    assert isinstance(map_data.data_json_fragments["ai_obstacle"], int)
+    assert len(map_data.obstacles) == 1
+
+
+def test_unchanged_sections_are_not_decoded():
+    map_data = decode_i_frame({"ai_obstacle": OBSTACLES})
+    obstacles = map_data.obstacles
+    fragments = dict(map_data.data_json_fragments)
+
+    partial = create_partial(MapFrameType.P, 2, {"ai_obstacle": [list(v) for v in OBSTACLES]})
+    result = DreameVacuumMapDecoder.decode_p_map_data_from_partial(partial, map_data, False)
+    assert result is map_data
+    assert result.frame_id == 2
+    assert result.obstacles is obstacles
+    assert result.data_json_fragments == fragments
+
+
+def test_changed_sections_are_decoded():
+    map_data = decode_i_frame({"ai_obstacle": OBSTACLES})
+    fragments = dict(map_data.data_json_fragments)
+
+    changed = [*OBSTACLES, ["300", "400", "142", "0.8", "2"]]
+    partial = create_partial(MapFrameType.P, 2, {"ai_obstacle": changed})
+    result = DreameVacuumMapDecoder.decode_p_map_data_from_partial(partial, map_data, False)
+    assert len(result.obstacles) == 2
+    assert result.data_json_fragments["ai_obstacle"] != fragments["ai_obstacle"]
+
+
+def test_p_frame_obstacles_are_located_once(monkeypatch):
+    map_data = decode_i_frame({})
+    map_data.segments = {1: Segment(1, 0, 0, 500, 500)}
+    located = []
+    monkeypatch.setattr(Obstacle, "set_segment", lambda self, map_data: located.append(self))
+
+    partial = create_partial(MapFrameType.P, 2, {"ai_obstacle": OBSTACLES})
+    DreameVacuumMapDecoder.decode_p_map_data_from_partial(partial, map_data, False)
+    assert len(located) == 1
+
+
+def test_saved_map_is_not_decoded_for_p_frames(monkeypatch):
+    map_data = decode_i_frame({})
+    decoded = []
+    monkeypatch.setattr(
+        DreameVacuumMapDecoder, "decode_saved_map", staticmethod(lambda *args, **kwargs: decoded.append(args))
+    )
+
+    partial = create_partial(MapFrameType.P, 2, {"rism": "saved map"})
+    DreameVacuumMapDecoder.decode_p_map_data_from_partial(partial, map_data, False)
+    assert not decoded
@@ -0,0 +1,60 @@
+"""Tests for the background history map prefetching."""
+
+import time
+
+from dreame.map import DreameMapVacuumMapManager
+
+
+def create_manager(monkeypatch, size=4):
+    manager = DreameMapVacuumMapManager(None)
+    requested = []
+
+    def get_history_map(object_name, key=None):
+        requested.append(object_name)
+        manager.object_cache.set(object_name, b"x" * size, key)
+        manager.object_cache.set_decoded(object_name, object_name, key)
+        return object_name
+
+    monkeypatch.setattr(manager, "get_history_map", get_history_map)
+    return manager, requested
+
+
+def wait_for_workers(manager):
+    deadline = time.monotonic() + 5
+    while manager._prefetch_workers and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert not manager._prefetch_workers
+
+
+def test_most_recent_missing_maps_are_prefetched(monkeypatch):
+    manager, requested = create_manager(monkeypatch)
+    manager._prefetch_count = 2
+    manager.object_cache.set("cleaning/1", b"data")
+    manager.object_cache.set_decoded("cleaning/1", "decoded")
+
+    manager.prefetch_history_maps(
+        [("cleaning/1", None), ("cleaning/2", None), ("cleaning/3", None)],
+        [("cruising/1", "key"), (None, None)],
+    )
+    wait_for_workers(manager)
+
+    assert sorted(requested) == ["cleaning/2", "cruising/1"]
+    assert manager.object_cache.contains("cruising/1", "key", True)
+
+
+def test_prefetch_is_skipped_while_device_is_running(monkeypatch):
+    manager, requested = create_manager(monkeypatch)
+    manager._device_running = True
+    manager.prefetch_history_maps([("cleaning/1", None)])
+    wait_for_workers(manager)
+    assert not requested
+
+
+def test_prefetch_stops_at_the_download_budget(monkeypatch):
+    manager, requested = create_manager(monkeypatch, size=8)
+    manager._prefetch_concurrency = 1
+    manager._prefetch_max_bytes = 8
+    manager.prefetch_history_maps([(f"cleaning/{i}", None) for i in range(4)])
+    wait_for_workers(manager)
+    assert requested == ["cleaning/0"]
+    assert manager._prefetch_queue.empty()
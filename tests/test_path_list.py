@@ -0,0 +1,57 @@
+"""Tests for the numpy backed robot path storage."""
+
+from dreame.types import Path, PathList, PathType
+
+
+def points(path):
+    return [(point.x, point.y, point.path_type) for point in path]
+
+
+def test_parse():
+    path = PathList.parse("M100,200L10,0L0,10S50,50L5,5l7,7")
+    assert points(path) == [
+        (100, 200, PathType.MOP),
+        (110, 200, PathType.LINE),
+        (110, 210, PathType.LINE),
+        (50, 50, PathType.SWEEP),
+        (55, 55, PathType.LINE),
+        (7, 7, PathType.LINE),
+    ]
+
+
+def test_parse_relative_start():
+    assert points(PathList.parse("L10,10L5,-5")) == [(10, 10, PathType.LINE), (15, 5, PathType.LINE)]
+    assert len(PathList.parse("")) == 0
+
+
+def test_append_and_extend():
+    path = PathList()
+    for i in range(20):
+        path.append(Path(i, -i, PathType.LINE))
+    path.extend(PathList.parse("W1,2L1,1"))
+    path.extend([Path(5, 5, PathType.SWEEP)])
+    assert len(path) == 23
+    assert path[19].x == 19
+    assert path[19].y == -19
+    assert points(path[20:]) == [(1, 2, PathType.SWEEP_AND_MOP), (2, 3, PathType.LINE), (5, 5, PathType.SWEEP)]
+
+
+def test_contains_type():
+    path = PathList.parse("S0,0L1,1")
+    assert path.contains_type(PathType.SWEEP)
+    assert path.contains_type(PathType.MOP, PathType.LINE)
+    assert not path.contains_type(PathType.MOP)
+
+
+def test_runs():
+    path = PathList.parse("M100,200L10,0L0,10S50,50L5,5l7,7")
+    assert path.runs() == [(PathType.MOP, 0, 3), (PathType.SWEEP, 3, 6)]
+    assert PathList().runs() == []
+
+
+def test_copy_is_independent():
+    path = PathList.parse("S0,0L1,1")
+    copy = path.copy()
+    copy.append(Path(3, 3, PathType.LINE))
+    assert len(path) == 2
+    assert len(copy) == 3
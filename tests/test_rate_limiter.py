@@ -0,0 +1,61 @@
+"""Tests for the account scoped request rate limiter."""
+
+import asyncio
+from threading import Thread
+import time
+
+from dreame.protocol import DreameVacuumRateLimiter
+
+
+def test_limiter_is_shared_per_account():
+    assert DreameVacuumRateLimiter.get("account") is DreameVacuumRateLimiter.get("account")
+    assert DreameVacuumRateLimiter.get("account") is not DreameVacuumRateLimiter.get("other")
+
+
+def test_burst_then_rate():
+    limiter = DreameVacuumRateLimiter(rate=20, burst=3)
+    start = time.monotonic()
+    for _ in range(3):
+        assert limiter.acquire(timeout=0)
+    assert time.monotonic() - start < 0.05
+    assert not limiter.acquire(timeout=0)
+    assert limiter.acquire(timeout=1)
+    assert time.monotonic() - start >= 0.04
+
+
+def test_priority_context():
+    assert DreameVacuumRateLimiter.current_priority() == DreameVacuumRateLimiter.PROPERTY
+    with DreameVacuumRateLimiter.priority(DreameVacuumRateLimiter.BACKGROUND):
+        assert DreameVacuumRateLimiter.current_priority() == DreameVacuumRateLimiter.BACKGROUND
+        with DreameVacuumRateLimiter.priority(DreameVacuumRateLimiter.ACTION):
+            assert DreameVacuumRateLimiter.current_priority() == DreameVacuumRateLimiter.ACTION
+        assert DreameVacuumRateLimiter.current_priority() == DreameVacuumRateLimiter.BACKGROUND
+    assert DreameVacuumRateLimiter.current_priority() == DreameVacuumRateLimiter.PROPERTY
+
+
+def test_higher_priority_goes_first():
+    limiter = DreameVacuumRateLimiter(rate=10, burst=1)
+    assert limiter.acquire(timeout=0)
+    order = []
+
+    def acquire(priority):
+        if limiter.acquire(priority, timeout=5):
+            order.append(priority)
+
+    background = Thread(target=acquire, args=(DreameVacuumRateLimiter.BACKGROUND,))
+    background.start()
+    while not limiter._waiting[DreameVacuumRateLimiter.BACKGROUND]:
+        time.sleep(0.001)
+    action = Thread(target=acquire, args=(DreameVacuumRateLimiter.ACTION,))
+    action.start()
+    background.join(5)
+    action.join(5)
+    assert order == [DreameVacuumRateLimiter.ACTION, DreameVacuumRateLimiter.BACKGROUND]
+
+
+def test_async_acquire():
+    limiter = DreameVacuumRateLimiter(rate=20, burst=1)
+    assert asyncio.run(limiter.async_acquire(timeout=0))
+    assert not asyncio.run(limiter.async_acquire(timeout=0))
+    assert asyncio.run(limiter.async_acquire(timeout=1))
+    assert limiter._waiting == [0, 0, 0, 0]
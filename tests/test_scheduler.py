@@ -0,0 +1,59 @@
+"""Tests for the adaptive poll schedule."""
+
+from dreame.scheduler import DreameVacuumPollScheduler
+
+
+def create_scheduler():
+    scheduler = DreameVacuumPollScheduler({"status": (3, 30)}, resolution=4, smoothing=0.5)
+    scheduler.set_state("docked", now=0)
+    return scheduler
+
+
+def test_lower_bound_until_changes_are_learned():
+    scheduler = create_scheduler()
+    assert scheduler.period("status", now=0) == 3
+    scheduler.record("status", False, now=0)
+    assert scheduler.period("status", now=0) == 3
+    assert scheduler.period("unknown", now=0) == 1
+
+
+def test_period_follows_change_interval():
+    scheduler = create_scheduler()
+    scheduler.record("status", False, now=0)
+    scheduler.record("status", True, now=40)
+    assert scheduler.period("status", now=40) == 10
+    scheduler.record("status", True, now=60)
+    # Moving average of 40 and 20 seconds
+    assert scheduler.period("status", now=60) == 7.5
+
+
+def test_period_backs_off_while_unchanged_and_is_bounded():
+    scheduler = create_scheduler()
+    scheduler.record("status", False, now=0)
+    scheduler.record("status", True, now=20)
+    assert scheduler.period("status", now=20) == 5
+    assert scheduler.period("status", now=80) == 15
+    assert scheduler.period("status", now=1000) == 30
+
+
+def test_statistics_are_kept_per_state():
+    scheduler = create_scheduler()
+    scheduler.record("status", False, now=0)
+    scheduler.record("status", True, now=40)
+    assert scheduler.set_state("cleaning", now=40)
+    assert not scheduler.set_state("cleaning", now=41)
+    assert scheduler.state == "cleaning"
+    assert scheduler.period("status", now=41) == 3
+
+    scheduler.set_state("docked", now=100)
+    # Unchanged time is restarted by the state transition
+    assert scheduler.period("status", now=100) == 10
+
+
+def test_set_bounds():
+    scheduler = create_scheduler()
+    scheduler.set_bounds("status", 5, 2)
+    assert scheduler.period("status", now=0) == 5
+    schedule = scheduler.schedule
+    assert schedule["state"] == "docked"
+    assert schedule["groups"]["status"]["bounds"] == [5, 5]
@@ -0,0 +1,85 @@
+"""Tests for sharing identical concurrent cloud requests."""
+
+from threading import Event, Thread
+
+from dreame.protocol import DreameVacuumSingleFlight
+import pytest
+
+
+def test_key_ignores_dict_order():
+    key = DreameVacuumSingleFlight.key
+    assert key("url", {"a": 1, "b": 2}) == key("url", {"b": 2, "a": 1})
+    assert key("url", {"a": 1}) != key("url", {"a": 2})
+
+
+def test_concurrent_calls_share_one_request():
+    single_flight = DreameVacuumSingleFlight()
+    started = Event()
+    release = Event()
+    calls = []
+
+    def request():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return {"result": [1, 2]}
+
+    results = []
+    leader = Thread(target=lambda: results.append(single_flight.call("key", request)))
+    leader.start()
+    started.wait(5)
+    followers = [Thread(target=lambda: results.append(single_flight.call("key", request))) for _ in range(3)]
+    for thread in followers:
+        thread.start()
+    while single_flight._flights["key"][3] < len(followers):
+        release.wait(0.01)
+    release.set()
+    for thread in [leader, *followers]:
+        thread.join(5)
+
+    assert len(calls) == 1
+    assert len(results) == 4
+    assert all(result == {"result": [1, 2]} for result in results)
+    # Every caller gets its own copy
+    assert len({id(result) for result in results}) == 4
+
+
+def test_results_are_cached_for_ttl():
+    single_flight = DreameVacuumSingleFlight()
+    calls = []
+
+    def request():
+        calls.append(1)
+        return {"result": len(calls)}
+
+    first = single_flight.call("key", request, ttl=60)
+    first["result"] = 10
+    second = single_flight.call("key", request, ttl=60)
+    assert second == {"result": 1}
+    assert len(calls) == 1
+
+    single_flight.clear()
+    assert single_flight.call("key", request, ttl=60) == {"result": 2}
+
+
+def test_results_without_ttl_are_not_cached():
+    single_flight = DreameVacuumSingleFlight()
+    calls = []
+
+    def request():
+        calls.append(1)
+        return len(calls)
+
+    assert single_flight.call("key", request) == 1
+    assert single_flight.call("key", request) == 2
+
+
+def test_exceptions_are_raised_and_not_cached():
+    single_flight = DreameVacuumSingleFlight()
+
+    def request():
+        raise ValueError("failed")
+
+    with pytest.raises(ValueError, match="failed"):
+        single_flight.call("key", request, ttl=60)
+    assert single_flight.call("key", lambda: 1, ttl=60) == 1
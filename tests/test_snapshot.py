@@ -0,0 +1,74 @@
+"""Tests for persisting and restoring the device state snapshot."""
+
+import json
+import os
+
+from dreame.const import DreameVacuumProperty
+from dreame.device import DreameVacuumDevice, DreameVacuumDeviceInfo
+import pytest
+
+BATTERY_LEVEL = DreameVacuumProperty.BATTERY_LEVEL.value
+STATE = DreameVacuumProperty.STATE.value
+
+
+def create_device(path, monkeypatch):
+    device = DreameVacuumDevice("Vacuum", "127.0.0.1", "0" * 32, cache_path=str(path))
+    monkeypatch.setattr(device, "_load_capability", lambda: None)
+    monkeypatch.setattr(device, "_property_changed", lambda *args: None)
+    return device
+
+
+@pytest.fixture
+def snapshot_path(tmp_path, monkeypatch):
+    device = create_device(tmp_path, monkeypatch)
+    device.info = DreameVacuumDeviceInfo({"mac": "AA:BB:CC:DD:EE:FF", "model": "dreame.vacuum.test"})
+    device.data = {BATTERY_LEVEL: 80, STATE: 1}
+    device._ready = True
+    device._data_generation = 1
+    device._save_snapshot()
+    return tmp_path
+
+
+def test_snapshot_is_restored(snapshot_path, monkeypatch):
+    device = create_device(snapshot_path, monkeypatch)
+    assert device.restore_snapshot()
+    assert device.stale
+    assert device.data == {BATTERY_LEVEL: 80, STATE: 1}
+    assert device.mac == "AA:BB:CC:DD:EE:FF"
+    assert device.info.model == "dreame.vacuum.test"
+
+
+def test_snapshot_of_other_version_is_ignored(snapshot_path, monkeypatch):
+    path = os.path.join(snapshot_path, "snapshot.json")
+    with open(path, encoding="utf-8") as file:
+        snapshot = json.load(file)
+    snapshot["version"] = "other"
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(snapshot, file)
+
+    device = create_device(snapshot_path, monkeypatch)
+    assert not device.restore_snapshot()
+    assert not device.stale
+    assert device.info is None
+
+
+def test_unchanged_state_is_not_written_again(snapshot_path, monkeypatch):
+    device = create_device(snapshot_path, monkeypatch)
+    device.restore_snapshot()
+    os.remove(os.path.join(snapshot_path, "snapshot.json"))
+    device._ready = True
+    device._save_snapshot()
+    assert not os.path.exists(os.path.join(snapshot_path, "snapshot.json"))
+    device._data_generation = device._data_generation + 1
+    device._save_snapshot()
+    assert os.path.exists(os.path.join(snapshot_path, "snapshot.json"))
+
+
+def test_restored_values_not_received_are_dropped(snapshot_path, monkeypatch):
+    device = create_device(snapshot_path, monkeypatch)
+    device.restore_snapshot()
+    # Battery level is received from the device after it is connected
+    device._stale_properties.discard(BATTERY_LEVEL)
+    device._reconcile_snapshot()
+    assert not device.stale
+    assert device.data == {BATTERY_LEVEL: 80}
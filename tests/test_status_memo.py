@@ -0,0 +1,48 @@
+"""Tests for memoizing derived status values."""
+
+from types import SimpleNamespace
+
+from dreame.device import DreameVacuumDeviceStatus
+
+
+def create_status():
+    device = SimpleNamespace(_data_generation=0)
+    return device, DreameVacuumDeviceStatus(device)
+
+
+def test_value_is_computed_once_per_generation():
+    device, status = create_status()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return len(calls)
+
+    assert status._memoize("value", compute) == 1
+    assert status._memoize("value", compute) == 1
+    device._data_generation = device._data_generation + 1
+    assert status._memoize("value", compute) == 2
+    assert len(calls) == 2
+
+
+def test_value_is_reused_while_dependencies_are_unchanged():
+    device, status = create_status()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return len(calls)
+
+    assert status._memoize("value", compute, 1, "a") == 1
+    device._data_generation = device._data_generation + 1
+    assert status._memoize("value", compute, 1, "a") == 1
+    assert status._memoize("value", compute, 2, "a") == 1
+    device._data_generation = device._data_generation + 1
+    assert status._memoize("value", compute, 2, "a") == 2
+    assert status._memoize("other", compute, 2, "a") == 3
+
+
+def test_go_to_zone_change_invalidates_values():
+    device, status = create_status()
+    status.go_to_zone = None
+    assert device._data_generation == 1